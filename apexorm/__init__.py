@@ -1,57 +1,245 @@
 # apexorm/__init__.py
+#
+# Importing `apexorm` stays cheap: SQLAlchemy and the model layer are imported on
+# first use (constructing ApexORM, or importing apexorm.models to define models),
+# so CLIs and serverless handlers that only touch config don't pay for them.
 import importlib
+from contextlib import contextmanager
 from apexorm.connection import DB
-from apexorm.models import Model, Manager, Base
-from apexorm.models.relations import finalize_backrefs
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
 
 __version__ = "0.1.0"
 
+# module path -> Model classes found there; shared by every ApexORM instance
+_DISCOVERY_CACHE: dict[str, list[type]] = {}
+
+_LAZY_ATTRS = {
+    "Model": "apexorm.models",
+    "Manager": "apexorm.models",
+    "Base": "apexorm.models",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    if name in ("models", "connection", "migrations", "testing"):
+        return importlib.import_module(f"apexorm.{name}")
+    raise AttributeError(f"module 'apexorm' has no attribute {name!r}")
+
+
 class ApexORM:
-    session: sessionmaker
-    def __init__(self, db: DB, models_paths: list[str]|None = None):
+    session: "sessionmaker"
+    def __init__(self, db: DB, models_paths: list[str]|None = None, auto_prefetch: bool = False,
+                 json_codec=None, shards: dict[str, DB]|None = None, gather_workers: int = 8):
+        from sqlalchemy.orm import sessionmaker
+
+        self.database = db
         self.db = db.get_connection_string()
         self.models_paths = models_paths
-        self.engine = create_engine(self.db)
-        self.models:list[Model] = []
+        # json_codec: "orjson"/"ujson"/"msgspec", or an object with dumps()/loads(), for every JSONField
+        self._json_codec = json_codec
+        self.engine = self._create_engine(db)
+        self.models:list["Model"] = []
 
-        self.Session = sessionmaker(bind=self.engine)
+        # auto_prefetch: batch lazy loads across every QuerySet result (see QuerySet.auto_prefetch)
+        session_info = {"apexorm_auto_prefetch": auto_prefetch}
+        self.Session = sessionmaker(bind=self.engine, info=session_info)
         self.session = self.Session()
+        self._instrumentation = None
+        self.gather_workers = gather_workers
+        self._gather_executor = None
+
+        # shards: name -> DB holding the rows of models with Meta.shard_key (see models.sharding)
+        self.shard_databases = dict(shards or {})
+        self.shards = None
+        if self.shard_databases:
+            from apexorm.models.sharding import ShardSet
+            self.shards = ShardSet({
+                name: sessionmaker(bind=self._create_engine(shard_db), info=dict(session_info))
+                for name, shard_db in self.shard_databases.items()
+            })
 
         if not self.check_connection():
             raise ConnectionError("Failed to connect to the database.")
 
-    def migrate(self):
+    def _create_engine(self, db: DB):
+        from sqlalchemy import create_engine
+        from apexorm.connection import json_codec_options
+
+        engine = create_engine(db.get_connection_string(), **db.get_engine_options(),
+                               **json_codec_options(self._json_codec))
+        db.configure_engine(engine)
+        return engine
+
+    def migrate(self, dry_run: bool = False, allow_drop: bool = False):
+        """
+        Bring the database schema in line with the registered models.
+        Returns the list of operations applied (or planned, with dry_run=True);
+        an unchanged schema returns [] after a single version lookup.
+        With shards, sharded models' tables are created on every shard instead.
+        """
+        from apexorm.migrations import MigrationEngine
+        from apexorm.models import Base
+        from apexorm.models.relations import finalize_backrefs
+        from apexorm.models.sharding import shard_tables
+
         # finalize relationships before creating tables
         finalize_backrefs(Base)
-        for model in self.models:
-            model.metadata.create_all(self.engine)
+        if self.shards is None:
+            return MigrationEngine(self.engine, Base.metadata, allow_drop=allow_drop).migrate(dry_run=dry_run)
+
+        sharded = shard_tables(self.models)
+        unsharded = {t.name for t in Base.metadata.sorted_tables} - sharded
+        operations = MigrationEngine(self.engine, Base.metadata, allow_drop=allow_drop,
+                                     tables=unsharded).migrate(dry_run=dry_run)
+        for engine in self.shards.engines.values():
+            operations += MigrationEngine(engine, Base.metadata, allow_drop=allow_drop,
+                                          tables=sharded).migrate(dry_run=dry_run)
+        return operations
+
+    def register_models(self, models: list["Model"]):
+        from apexorm.models import Model, Manager
 
-    def register_models(self, models: list[Model]):
         for model in models:
             if issubclass(model, Model):
                 model.__generate_table_name__(model.__name__)
                 self.models.append(model)
-                model._session = self.session
+                if model.__shard_key__:
+                    from apexorm.models.sharding import ShardRouter
+                    if self.shards is None:
+                        raise ValueError(f"{model.__name__} declares Meta.shard_key but ApexORM has no shards.")
+                    if model.__table__.autoincrement_column is not None:
+                        # each shard would count 1, 2, 3... and get(id=1) would match one row per shard
+                        raise ValueError(
+                            f"Sharded model {model.__name__} needs globally unique primary keys, not "
+                            f"autoincrement integers: use id = UUIDField(primary_key=True)."
+                        )
+                    model.__shards__ = self.shards
+                    model._session = ShardRouter(self.shards)
+                else:
+                    model._session = self.session
                 model.objects = Manager(model)
             else:
                 raise TypeError(f"{model} is not a subclass of Model")
 
     def register_model_paths(self, paths: list[str]):
+        """
+        Import each module and register the Model classes it defines or imports.
+        A module can skip the scan by listing its models in `__apexorm_models__`.
+        Results are cached per path, so later ApexORM instances don't rescan.
+        """
         for path in paths:
             try:
-                module = importlib.import_module(path)
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if isinstance(attr, type) and issubclass(attr, Model) and attr is not Model:
-                        self.register_models([attr])
+                self.register_models(discover_models(path))
             except ModuleNotFoundError as e:
                 print(f"Module {path} not found: {e}")
             except Exception as e:
                 print(f"Error importing module {path}: {e}")
 
+    def register_manifest(self, entries: list[str]):
+        """
+        Register models from an explicit manifest of "package.module:ClassName"
+        entries. Only the named attributes are looked up; nothing is scanned.
+        """
+        models = []
+        for entry in entries:
+            module_path, sep, class_name = entry.partition(":")
+            if not sep or not class_name:
+                raise ValueError(f"Manifest entry {entry!r} must look like 'package.module:ClassName'")
+            models.append(getattr(importlib.import_module(module_path), class_name))
+        self.register_models(models)
+
+    # ------------------- concurrent queries -------------------
+    def gather(self, *queries, timeout: float|None = None):
+        """
+        Evaluate independent queries concurrently and return their results in order:
+
+            books, n_authors = orm.gather(Book.objects.filter(...), Author.objects.all().count)
+
+        Takes QuerySets (evaluated with .all()), QuerySet methods (qs.count, qs.first)
+        and functools.partial(qs.values, "id"). Each runs in its own session on a pool
+        of `gather_workers` threads; the result's `.timings` has each one's seconds.
+        Uncommitted changes in orm.session are not visible to the queries, and are
+        kept: rows orm.session already holds come back as its own instances.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from apexorm.models.gather import gather
+
+        if self._gather_executor is None:
+            self._gather_executor = ThreadPoolExecutor(self.gather_workers, thread_name_prefix="apexorm-gather")
+        return gather(self._gather_executor, self.Session, self.session, queries, timeout=timeout)
+
+    # ------------------- instrumentation -------------------
+    def instrument(self, callback):
+        """
+        Call `callback(QueryEvent)` for every statement sent to the database.
+        Returns a function that unregisters the callback.
+        """
+        if self._instrumentation is None:
+            from apexorm.instrumentation import Instrumentation
+            self._instrumentation = Instrumentation(self.engine, self.Session)
+            for factory in (self.shards.factories.values() if self.shards else ()):
+                self._instrumentation.watch(factory.kw["bind"], factory)
+        return self._instrumentation.add(callback)
+
+    @contextmanager
+    def capture_queries(self):
+        """
+        with orm.capture_queries() as log:
+            ...
+        assert len(log) <= 3, str(log)
+        """
+        from apexorm.instrumentation import QueryLog
+
+        log = QueryLog()
+        remove = self.instrument(log.append)
+        try:
+            yield log
+        finally:
+            remove()
+
+    @contextmanager
+    def detect_n_plus_one(self, threshold: int = 3, raise_error: bool = False):
+        """
+        Flag relationships lazily loaded `threshold`+ times from the same line.
+        Yields the detector; its `.issues` name the select_related/prefetch_related fix.
+        """
+        from apexorm.instrumentation import NPlusOneDetector, NPlusOneError
+
+        detector = NPlusOneDetector(threshold=threshold)
+        remove = self.instrument(detector)
+        try:
+            yield detector
+        finally:
+            remove()
+        if raise_error and detector.issues:
+            raise NPlusOneError(detector.report())
+
+    # ------------------- stored files -------------------
+    def sweep_orphaned_files(self, dry_run: bool = False, grace_period: float = 3600):
+        """
+        Delete files in the registered models' FileField folders that no row
+        references. Returns a SweepReport; dry_run only lists the orphans.
+        """
+        from apexorm.models.storage.cleanup import sweep_orphans
+        return sweep_orphans(self.session, self.models, dry_run=dry_run, grace_period=grace_period)
+
+    def close(self):
+        """Close the session and every pooled connection (running any on-close PRAGMAs)."""
+        if self._gather_executor is not None:
+            self._gather_executor.shutdown(wait=True)
+            self._gather_executor = None
+        self.session.close()
+        self.engine.dispose()
+        self.database.close()
+        if self.shards is not None:
+            self.shards.close()
+            for shard_db in self.shard_databases.values():
+                shard_db.close()
+
     def check_connection(self) -> bool:
+        from sqlalchemy import text
+
         try:
             with self.engine.connect() as connection:
                 connection.execute(text("SELECT 1"))
@@ -59,3 +247,24 @@ class ApexORM:
         except Exception as e:
             print(f"Database connection error: {e}")
             return False
+
+
+def discover_models(path: str) -> list[type]:
+    """Return the Model classes exposed by module `path` (cached)."""
+    cached = _DISCOVERY_CACHE.get(path)
+    if cached is not None:
+        return list(cached)
+
+    from apexorm.models import Model
+
+    module = importlib.import_module(path)
+    manifest = getattr(module, "__apexorm_models__", None)
+    if manifest is not None:
+        found = list(manifest)
+    else:
+        found = [
+            attr for attr in vars(module).values()
+            if isinstance(attr, type) and issubclass(attr, Model) and attr is not Model
+        ]
+    _DISCOVERY_CACHE[path] = found
+    return list(found)
@@ -1,18 +1,167 @@
 # apexorm/connection/__init__.py
 
 
+import itertools
+
+
 class DB:
     def get_connection_string(self) -> str:
         raise NotImplementedError
 
+    def get_engine_options(self) -> dict:
+        """Extra keyword arguments for create_engine()."""
+        return {}
+
+    def configure_engine(self, engine):
+        """Called once with the new engine, e.g. to install connection events."""
+
+    def close(self):
+        """Called by ApexORM.close() after the engine's connections are closed."""
+
+
+# ------------------- JSON codec -------------------
+def _orjson():
+    import orjson
+    # SQLAlchemy's JSON type expects str from the serializer
+    return lambda value: orjson.dumps(value).decode(), orjson.loads
+
+def _ujson():
+    import ujson
+    return ujson.dumps, ujson.loads
+
+def _msgspec():
+    import msgspec
+    encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+    return lambda value: encoder.encode(value).decode(), decoder.decode
+
+def _stdlib_json():
+    import json
+    return json.dumps, json.loads
+
+JSON_CODECS = {"json": _stdlib_json, "orjson": _orjson, "ujson": _ujson, "msgspec": _msgspec}
+
+
+def json_codec_options(codec) -> dict:
+    """
+    create_engine() options that make every JSON column use `codec`: a name from
+    JSON_CODECS, an object with dumps()/loads() (a module, say), or a
+    (serializer, deserializer) pair.
+    """
+    if codec is None:
+        return {}
+    if isinstance(codec, str):
+        if codec not in JSON_CODECS:
+            raise ValueError(f"Unknown JSON codec {codec!r}; choose from {', '.join(JSON_CODECS)}")
+        try:
+            dumps, loads = JSON_CODECS[codec]()
+        except ImportError:
+            raise ImportError(f"json_codec={codec!r} requires the {codec} package: pip install {codec}") from None
+    elif isinstance(codec, tuple):
+        dumps, loads = codec
+    else:
+        dumps, loads = codec.dumps, codec.loads
+    return {"json_serializer": dumps, "json_deserializer": loads}
+
+
+# PRAGMA name -> value, applied to every new pooled connection
+SQLITE_PROFILES = {
+    "default": {},
+    # many readers alongside a writer: readers never block on the WAL writer, and
+    # writers wait for each other instead of failing with "database is locked"
+    "wal-concurrent": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,           # 64 MiB
+        "mmap_size": 268435456,         # 256 MiB
+        "temp_store": "MEMORY",
+    },
+    # (re)building a database: fastest writes, not crash-safe
+    "bulk-load": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "busy_timeout": 5000,
+        "cache_size": -262144,          # 256 MiB
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+# profiles that run PRAGMA optimize when a connection closes, unless told otherwise
+_OPTIMIZE_ON_CLOSE = {"wal-concurrent", "bulk-load"}
+
+_shared_memory_ids = itertools.count(1)
+
 
 class SQLiteDB(DB):
-    def __init__(self, name: str="databse.db"):
-        self.name = name if name.endswith(".db") else f"{name}.db"
+    """
+    SQLiteDB("app.db", profile="wal-concurrent")
+    SQLiteDB(":memory:", shared_cache=True)    # one in-memory database for every pooled connection
+
+    `profile` names a set of PRAGMAs from SQLITE_PROFILES ("default", "wal-concurrent",
+    "bulk-load"); `pragmas` adds to or overrides it. Both are applied to each new
+    connection. `optimize_on_close` runs PRAGMA optimize as connections close.
+    """
+    MEMORY = ":memory:"
+
+    def __init__(self, name: str="databse.db", profile: str="default", pragmas: dict|None=None,
+                 optimize_on_close: bool|None=None, shared_cache: bool=False):
+        if profile not in SQLITE_PROFILES:
+            raise ValueError(f"Unknown SQLite profile {profile!r}; choose from {', '.join(SQLITE_PROFILES)}")
+        # ":memory:" keeps the database in RAM for the life of the engine
+        self.name = name if name == self.MEMORY or name.endswith(".db") else f"{name}.db"
+        self.profile = profile
+        self.pragmas = {**SQLITE_PROFILES[profile], **(pragmas or {})}
+        self.optimize_on_close = profile in _OPTIMIZE_ON_CLOSE if optimize_on_close is None else optimize_on_close
+        self.shared_cache = shared_cache
+        self._memory_uri = None
+        self._keepalive = None
+        if self.name == self.MEMORY and shared_cache:
+            self._memory_uri = f"file:apexorm-memory-{next(_shared_memory_ids)}?mode=memory&cache=shared"
 
     def get_connection_string(self) -> str:
+        if self._memory_uri:
+            return f"sqlite:///{self._memory_uri}&uri=true"
+        if self.name == self.MEMORY:
+            return "sqlite://"
         return f"sqlite:///{self.name}"
 
+    def get_engine_options(self) -> dict:
+        if not self._memory_uri:
+            return {}
+        from sqlalchemy.pool import QueuePool
+        # a real pool shared by all threads; each connection opens the same named database
+        return {"poolclass": QueuePool, "connect_args": {"check_same_thread": False}}
+
+    def configure_engine(self, engine):
+        from sqlalchemy import event
+
+        if self._memory_uri and self._keepalive is None:
+            import sqlite3
+            # the shared in-memory database lives as long as one connection to it is open
+            self._keepalive = sqlite3.connect(self._memory_uri, uri=True, check_same_thread=False)
+
+        if self.pragmas:
+            event.listen(engine, "connect", self._apply_pragmas)
+        if self.optimize_on_close:
+            event.listen(engine, "close", self._optimize)
+
+    def _apply_pragmas(self, dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    def _optimize(self, dbapi_connection, _connection_record):
+        dbapi_connection.execute("PRAGMA optimize")
+
+    def close(self):
+        if self._keepalive is not None:
+            self._keepalive.close()
+            self._keepalive = None
+
 
 class MysqlDB(DB):
     def __init__(self, host: str, user: str, password: str, database: str):
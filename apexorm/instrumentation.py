@@ -0,0 +1,260 @@
+# apexorm/instrumentation.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from sqlalchemy import event
+
+
+_SQLALCHEMY_DIR = os.path.dirname(sys.modules["sqlalchemy"].__file__) + os.sep
+_APEXORM_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_STDLIB_DIR = os.path.dirname(contextmanager.__code__.co_filename) + os.sep
+_PACKAGE_DIRS = ("site-packages", "dist-packages")   # under the stdlib directory, but application code
+
+
+def _is_library_frame(filename: str) -> bool:
+    """SQLAlchemy and standard library frames, skipped when looking for the application caller."""
+    if filename.startswith(_SQLALCHEMY_DIR):
+        return True
+    if filename.startswith(_STDLIB_DIR):
+        return filename[len(_STDLIB_DIR):].split(os.sep, 1)[0] not in _PACKAGE_DIRS
+    return False
+
+
+@dataclass
+class QueryEvent:
+    """One statement sent to the database."""
+    statement: str
+    parameters: object
+    duration: float = 0.0           # seconds spent in cursor.execute()
+    rowcount: int|None = None       # rows affected (DML) or fetched so far (SELECT)
+    caller: str|None = None         # outermost ApexORM method, e.g. "Manager.get"
+    location: str|None = None       # "file.py:42" of the application code that triggered it
+    relationship: str|None = None   # "Post.author" when this is a lazy relationship load
+    collection: bool = False        # the lazily loaded relationship is a collection
+    executemany: bool = False
+    error: BaseException|None = None  # the DBAPI error, when the statement failed
+
+    def __str__(self):
+        origin = self.relationship and f"lazy load {self.relationship}" or self.caller or "?"
+        failed = f" [failed: {self.error}]" if self.error is not None else ""
+        return f"[{self.duration * 1000:.2f}ms] {origin} @ {self.location}: {self.statement}{failed}"
+
+
+class QueryLog(list):
+    """List of QueryEvent recorded by ApexORM.capture_queries()."""
+    @property
+    def statements(self) -> list[str]:
+        return [e.statement for e in self]
+
+    @property
+    def total_duration(self) -> float:
+        return sum(e.duration for e in self)
+
+    @property
+    def lazy_loads(self) -> list[QueryEvent]:
+        return [e for e in self if e.relationship]
+
+    def __str__(self):
+        return "\n".join(str(e) for e in self)
+
+
+class _CountingCursor:
+    """DBAPI cursor proxy that counts fetched rows onto a QueryEvent."""
+    def __init__(self, cursor, query_event: QueryEvent):
+        self._cursor = cursor
+        self._event = query_event
+
+    def _count(self, rows):
+        self._event.rowcount = (self._event.rowcount or 0) + len(rows)
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._event.rowcount = (self._event.rowcount or 0) + 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        return self._count(self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._count(self._cursor.fetchall())
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._event.rowcount = (self._event.rowcount or 0) + 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class Instrumentation:
+    """
+    Engine/session event hooks feeding QueryEvents to registered callbacks.
+    Installed on first use, so an ORM that never instruments pays nothing.
+    """
+    def __init__(self, engine, session_factory):
+        self._callbacks = ()
+        self._local = threading.local()
+        self.watch(engine, session_factory)
+
+    def watch(self, engine, session_factory):
+        """Also report the statements of another engine/sessionmaker (e.g. a shard)."""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+        event.listen(session_factory, "do_orm_execute", self._do_orm_execute)
+
+    def add(self, callback):
+        self._callbacks = self._callbacks + (callback,)
+
+        def remove():
+            self.remove(callback)
+        return remove
+
+    def remove(self, callback):
+        self._callbacks = tuple(cb for cb in self._callbacks if cb is not callback)
+
+    # ----- event handlers -----
+    def _do_orm_execute(self, orm_execute_state):
+        if not self._callbacks:
+            return
+        if orm_execute_state.is_select and orm_execute_state.lazy_loaded_from is not None:
+            path = orm_execute_state.loader_strategy_path.path
+            if path:
+                prop = path[-1]
+                self._local.relationship = (describe_relationship(prop.parent.class_, prop.key), prop.uselist)
+            return
+        # per-instance ManyToManyManager queries (group.members.all()...) and auto-prefetch batches
+        tagged = orm_execute_state.execution_options.get("apexorm_relationship")
+        if tagged is not None:
+            model_class, key = tagged
+            self._local.relationship = (describe_relationship(model_class, key), getattr(model_class, key).property.uselist)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not self._callbacks:
+            return
+        caller, location = find_caller()
+        relationship, collection = getattr(self._local, "relationship", None) or (None, False)
+        self._local.relationship = None
+        query_event = QueryEvent(
+            statement=statement,
+            parameters=parameters,
+            caller=caller,
+            location=location,
+            relationship=relationship,
+            collection=collection,
+            executemany=executemany,
+        )
+        conn.info.setdefault("apexorm_query_stack", []).append((query_event, time.perf_counter()))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("apexorm_query_stack")
+        if not stack:
+            return
+        query_event, started = stack.pop()
+        query_event.duration = time.perf_counter() - started
+        if cursor.description is None:
+            query_event.rowcount = cursor.rowcount if cursor.rowcount >= 0 else None
+        elif context is not None:
+            query_event.rowcount = 0
+            context.cursor = _CountingCursor(context.cursor, query_event)
+        for callback in self._callbacks:
+            callback(query_event)
+
+    def _handle_error(self, exception_context):
+        # a failed statement never reaches after_cursor_execute; the stack lives on
+        # the pooled DBAPI connection, so pop its entry here and report the failure
+        connection = exception_context.connection
+        stack = connection.info.get("apexorm_query_stack") if connection is not None else None
+        if not stack or stack[-1][0].statement != exception_context.statement:
+            return
+        query_event, started = stack.pop()
+        query_event.duration = time.perf_counter() - started
+        query_event.error = exception_context.original_exception
+        for callback in self._callbacks:
+            callback(query_event)
+
+
+def describe_relationship(model_class, key: str) -> str:
+    # report M2M private relationships ("_members_rel") under their public name
+    private_map = getattr(model_class, "__m2m_private_map__", {}) or {}
+    public = next((name for name, private in private_map.items() if private == key), key)
+    return f"{model_class.__name__}.{public}"
+
+
+def find_caller() -> tuple[str|None, str|None]:
+    """
+    Walk the stack to the application frame that caused the query.
+    Returns ("Manager.get", "views.py:42"): the outermost ApexORM method on the
+    way, and the first frame outside ApexORM/SQLAlchemy.
+    """
+    caller = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APEXORM_DIR):
+            owner = frame.f_locals.get("self")
+            if owner is not None and not filename.endswith("instrumentation.py"):
+                caller = f"{type(owner).__name__}.{frame.f_code.co_name}"
+        elif not _is_library_frame(filename):
+            return caller, f"{os.path.basename(filename)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return caller, None
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+@dataclass
+class NPlusOne:
+    relationship: str
+    location: str|None
+    count: int
+    collection: bool
+
+    @property
+    def hint(self) -> str:
+        model, attr = self.relationship.split(".", 1)
+        loader = "prefetch_related" if self.collection else "select_related"
+        return f"{model}.objects.{loader}('{attr}')"
+
+    def __str__(self):
+        return (
+            f"N+1: {self.relationship} lazily loaded {self.count} times at {self.location}; "
+            f"load it up front with {self.hint}"
+        )
+
+
+@dataclass
+class NPlusOneDetector:
+    """
+    QueryEvent callback flagging relationships lazily loaded `threshold` or more
+    times from the same line of code (i.e. inside a loop).
+    """
+    threshold: int = 3
+    counts: Counter = field(default_factory=Counter)
+    collections: dict = field(default_factory=dict)
+
+    def __call__(self, query_event: QueryEvent):
+        if query_event.relationship:
+            key = (query_event.relationship, query_event.location)
+            self.counts[key] += 1
+            self.collections[key] = query_event.collection
+
+    @property
+    def issues(self) -> list[NPlusOne]:
+        return [
+            NPlusOne(relationship, location, count, self.collections[(relationship, location)])
+            for (relationship, location), count in self.counts.items()
+            if count >= self.threshold
+        ]
+
+    def report(self) -> str:
+        return "\n".join(str(issue) for issue in self.issues)
@@ -0,0 +1,389 @@
+# apexorm/migrations.py
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, DateTime, Text,
+    inspect, insert, select, text, literal, null, func, table as sql_table, column as sql_column,
+)
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateTable, CreateIndex, CreateColumn, AddConstraint
+from apexorm.models.search import SearchIndex
+
+
+VERSION_TABLE = "apexorm_migrations"
+
+_version_metadata = MetaData()
+version_table = Table(
+    VERSION_TABLE,
+    _version_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", String(64), nullable=False, unique=True),
+    Column("applied_at", DateTime, nullable=False),
+    Column("operations", Text, nullable=True),
+)
+
+# Indexes following the ix_/ux_ naming used by SQLAlchemy and apexorm.models.Index
+# are owned by the models, so undeclared ones are dropped. Anything else is left alone.
+_MANAGED_INDEX_PREFIXES = ("ix_", "ux_")
+
+
+@dataclass
+class Operation:
+    """A single schema change, in the order it will be applied."""
+    kind: str   # drop_index | drop_search_index | create_table | add_column | alter_column | rebuild_table
+                # | create_index | create_search_index | drop_column | drop_table
+    table: str
+    name: str|None = None
+    obj: object = None
+
+    def __str__(self):
+        target = f"{self.table}.{self.name}" if self.name else self.table
+        return f"{self.kind.upper().replace('_', ' ')} {target}"
+
+
+class MigrationEngine:
+    """
+    Diff the registered models against the live database and apply the difference.
+
+    The live schema is reflected once per run, and each applied schema version is
+    recorded in `apexorm_migrations`, so a deploy with an unchanged schema costs a
+    single SELECT. Destructive changes (dropping columns/tables no longer declared)
+    only happen with allow_drop=True. On SQLite, changes ALTER TABLE can't express
+    (type/nullability changes, dropped columns, new NOT NULL or FK columns) rebuild
+    the table: create a copy, move the rows, swap it in, recreate its indexes.
+    """
+    def __init__(self, engine, metadata: MetaData, allow_drop: bool = False, tables: set[str]|None = None):
+        self.engine = engine
+        self.metadata = metadata
+        self.tables = tables   # names of the metadata's tables this database holds (None: all)
+        self.allow_drop = allow_drop
+        self.dialect = engine.dialect
+
+    def _tables(self) -> list[Table]:
+        return [t for t in self.metadata.sorted_tables if self.tables is None or t.name in self.tables]
+
+    # ------------------- versioning -------------------
+    def schema_version(self) -> str:
+        """Fingerprint of the declared schema as rendered for this dialect."""
+        ddl = []
+        for table in self._tables():
+            ddl.append(str(CreateTable(table).compile(dialect=self.dialect)).strip())
+            for index in sorted(table.indexes, key=lambda ix: ix.name or ""):
+                ddl.append(str(CreateIndex(index).compile(dialect=self.dialect)).strip())
+            search = table.info.get("apexorm_search")
+            if search is not None:
+                ddl.extend(search.create_statements(self.dialect))
+        return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+    def is_current(self, version: str|None = None) -> bool:
+        version = version or self.schema_version()
+        with self.engine.connect() as connection:
+            try:
+                row = connection.execute(
+                    select(version_table.c.id).where(version_table.c.version == version)
+                ).first()
+            except (OperationalError, ProgrammingError):
+                # no version table yet
+                return False
+        return row is not None
+
+    # ------------------- planning -------------------
+    def plan(self, connection) -> list[Operation]:
+        insp = inspect(connection)
+        existing_tables = set(insp.get_table_names())
+
+        drop_indexes, create_tables, alters, create_indexes, drop_columns, drop_tables = [], [], [], [], [], []
+
+        for table in self._tables():
+            if table.name not in existing_tables:
+                create_tables.append(Operation("create_table", table.name, obj=table))
+                continue
+
+            reflected = {c["name"]: c for c in insp.get_columns(table.name)}
+            missing = [c for c in table.columns if c.name not in reflected]
+            removed = [name for name in reflected if name not in table.c] if self.allow_drop else []
+            changed = [
+                c for c in table.columns
+                if c.name in reflected and self._column_changed(c, reflected[c.name])
+            ]
+
+            if self.dialect.name == "sqlite" and (
+                removed or changed or any(not self._sqlite_can_add(c) for c in missing)
+            ):
+                alters.append(Operation("rebuild_table", table.name, obj=table))
+                continue
+
+            alters.extend(Operation("add_column", table.name, c.name, c) for c in missing)
+            alters.extend(Operation("alter_column", table.name, c.name, c) for c in changed)
+            drop_columns.extend(Operation("drop_column", table.name, name) for name in removed)
+
+            existing_indexes = existing_index_names(connection, table.name)
+            declared = {ix.name for ix in table.indexes}
+            create_indexes.extend(
+                Operation("create_index", table.name, ix.name, ix)
+                for ix in table.indexes if ix.name not in existing_indexes
+            )
+            drop_indexes.extend(
+                Operation("drop_index", table.name, name)
+                for name in sorted(existing_indexes - declared)
+                if name.startswith(_MANAGED_INDEX_PREFIXES)
+            )
+
+        if self.allow_drop:
+            declared_tables = {t.name for t in self._tables()}
+            search_tables = [SearchIndex(t, []) for t in self._tables()]
+            for name in sorted(existing_tables - declared_tables):
+                if name == VERSION_TABLE or name.startswith("sqlite_"):
+                    continue
+                if any(search.owns_table(name) for search in search_tables):
+                    continue   # FTS tables are dropped with their search index
+                drop_tables.append(Operation("drop_table", name))
+
+        rebuilt = {op.table for op in alters if op.kind == "rebuild_table"}
+        search_indexes = [
+            op for table in self._tables()
+            for op in self._plan_search_index(connection, table, existing_tables, rebuilt)
+        ]
+        search_drops = [op for op in search_indexes if op.kind == "drop_search_index"]
+        search_creates = [op for op in search_indexes if op.kind == "create_search_index"]
+        return (search_drops + drop_indexes + create_tables + alters + create_indexes + search_creates
+                + drop_columns + drop_tables)
+
+    def _plan_search_index(self, connection, table, existing_tables, rebuilt) -> list[Operation]:
+        """(Re)create the full-text index of Meta.search_fields; drop it once undeclared."""
+        search = table.info.get("apexorm_search")
+        if search is None:
+            stale = SearchIndex(table, [])
+            if self.dialect.name == "sqlite":
+                exists = stale.fts_table in existing_tables
+            else:
+                exists = table.name in existing_tables and \
+                    stale.index_name in existing_index_names(connection, table.name)
+            return [Operation("drop_search_index", table.name, stale.index_name, stale)] if exists else []
+        if not search.supports(self.dialect.name):
+            return []
+        # a new or rebuilt table (its triggers are dropped with it) always needs one
+        if table.name in existing_tables and table.name not in rebuilt and search.is_current(connection):
+            return []
+        return [Operation("create_search_index", table.name, search.index_name, search)]
+
+    def _column_changed(self, col: Column, reflected: dict) -> bool:
+        if not col.primary_key and bool(col.nullable) != bool(reflected["nullable"]):
+            return True
+        try:
+            declared_type, live_type = col.type.python_type, reflected["type"].python_type
+        except NotImplementedError:
+            return False
+        if declared_type is not live_type and {declared_type, live_type} != {bool, int}:
+            return True
+        declared_length = getattr(col.type, "length", None)
+        live_length = getattr(reflected["type"], "length", None)
+        return declared_length is not None and live_length is not None and declared_length != live_length
+
+    @staticmethod
+    def _sqlite_can_add(col: Column) -> bool:
+        # SQLite's ADD COLUMN can't add PK/UNIQUE columns, NOT NULL without a server
+        # default, or (from CreateColumn) a REFERENCES clause
+        if col.primary_key or col.unique or col.foreign_keys:
+            return False
+        return col.nullable or col.server_default is not None
+
+    # ------------------- applying -------------------
+    def migrate(self, dry_run: bool = False) -> list[Operation]:
+        """Plan and apply pending operations. Returns the operations (applied or planned)."""
+        version = self.schema_version()
+        # allow_drop runs always diff: a version recorded earlier may have kept undeclared columns
+        if not self.allow_drop and self.is_current(version):
+            return []
+
+        with self.engine.connect() as connection:
+            # SQLite ignores PRAGMA foreign_keys inside a transaction, so table rebuilds
+            # (DROP TABLE of a referenced parent) need it switched off before BEGIN
+            foreign_keys = self._set_foreign_keys(connection, False) if not dry_run else None
+            try:
+                with connection.begin():
+                    operations = self.plan(connection)
+                    if dry_run:
+                        return operations
+                    for op in operations:
+                        getattr(self, f"_apply_{op.kind}")(connection, op)
+                    version_table.create(connection, checkfirst=True)
+                    if connection.execute(
+                        select(version_table.c.id).where(version_table.c.version == version)
+                    ).first():
+                        return operations
+                    connection.execute(
+                        insert(version_table).values(
+                            version=version,
+                            applied_at=datetime.now(timezone.utc).replace(tzinfo=None),
+                            operations="\n".join(str(op) for op in operations),
+                        )
+                    )
+            finally:
+                if foreign_keys:
+                    self._set_foreign_keys(connection, True)
+        return operations
+
+    def _set_foreign_keys(self, connection, enabled: bool):
+        """SQLite only, outside a transaction: set PRAGMA foreign_keys and return its previous value."""
+        if self.dialect.name != "sqlite":
+            return None
+        # on the DBAPI connection, so no BEGIN is emitted first (SQLAlchemy autobegins, and
+        # engines set up to issue BEGIN themselves would wrap the PRAGMA in a transaction)
+        raw = connection.connection.dbapi_connection
+        previous = raw.execute("PRAGMA foreign_keys").fetchone()[0]
+        raw.execute(f"PRAGMA foreign_keys={'ON' if enabled else 'OFF'}")
+        return previous
+
+    def _apply_create_table(self, connection, op):
+        op.obj.create(connection)  # also emits the table's CREATE INDEX statements
+
+    def _apply_create_index(self, connection, op):
+        op.obj.create(connection)
+
+    def _apply_drop_index(self, connection, op):
+        if self.dialect.name == "mysql":
+            connection.exec_driver_sql(f"DROP INDEX {self._quote(op.name)} ON {self._quote(op.table)}")
+        else:
+            connection.exec_driver_sql(f"DROP INDEX {self._quote(op.name)}")
+
+    def _apply_create_search_index(self, connection, op):
+        # replaces an outdated index (different fields) or the leftovers of a rebuilt table
+        self._apply_drop_search_index(connection, op)
+        for statement in op.obj.create_statements(self.dialect):
+            connection.exec_driver_sql(statement)
+
+    def _apply_drop_search_index(self, connection, op):
+        if self.dialect.name in ("mysql", "mariadb") and \
+                op.obj.index_name not in existing_index_names(connection, op.table):
+            return
+        for statement in op.obj.drop_statements(self.dialect):
+            connection.exec_driver_sql(statement)
+
+    def _apply_drop_table(self, connection, op):
+        connection.exec_driver_sql(f"DROP TABLE {self._quote(op.table)}")
+
+    def _apply_drop_column(self, connection, op):
+        connection.exec_driver_sql(f"ALTER TABLE {self._quote(op.table)} DROP COLUMN {self._quote(op.name)}")
+
+    def _apply_add_column(self, connection, op):
+        col = op.obj
+        backfill = self._scalar_default(col)
+        needs_backfill = not col.nullable and col.server_default is None
+        table_name = self._quote(op.table)
+
+        if needs_backfill:
+            # add as NULL, fill existing rows from the Python-side default, then tighten
+            col_sql = str(CreateColumn(col).compile(dialect=self.dialect)).replace(" NOT NULL", "")
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {col_sql}")
+            if backfill is not None:
+                tbl = sql_table(op.table, sql_column(col.name))
+                connection.execute(tbl.update().values({col.name: backfill}))
+            self._set_nullable(connection, col)
+        else:
+            col_sql = str(CreateColumn(col).compile(dialect=self.dialect))
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {col_sql}")
+
+        for fk in col.foreign_keys:
+            connection.execute(AddConstraint(fk.constraint))
+
+    def _apply_alter_column(self, connection, op):
+        col = op.obj
+        table_name, col_name = self._quote(op.table), self._quote(col.name)
+        col_type = col.type.compile(dialect=self.dialect)
+        if self.dialect.name == "mysql":
+            nullable = "NULL" if col.nullable else "NOT NULL"
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} MODIFY COLUMN {col_name} {col_type} {nullable}")
+            return
+        connection.exec_driver_sql(
+            f"ALTER TABLE {table_name} ALTER COLUMN {col_name} TYPE {col_type} USING {col_name}::{col_type}"
+        )
+        self._set_nullable(connection, col)
+
+    def _set_nullable(self, connection, col):
+        table_name, col_name = self._quote(col.table.name), self._quote(col.name)
+        if self.dialect.name == "mysql":
+            nullable = "NULL" if col.nullable else "NOT NULL"
+            col_type = col.type.compile(dialect=self.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} MODIFY COLUMN {col_name} {col_type} {nullable}")
+        else:
+            action = "DROP NOT NULL" if col.nullable else "SET NOT NULL"
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} ALTER COLUMN {col_name} {action}")
+
+    def _apply_rebuild_table(self, connection, op):
+        """SQLite 'generalized ALTER TABLE': copy rows into a new table and swap it in."""
+        table = op.obj
+        tmp_name = f"_apexorm_rebuild_{table.name}"
+        live = {c["name"]: c for c in inspect(connection).get_columns(table.name)}
+        live_columns = set(live)
+
+        tmp_table = table.to_metadata(MetaData(), name=tmp_name)
+        tmp_table.indexes.clear()  # index names are schema-global; recreate them after the swap
+        # columns the models no longer declare are only dropped with allow_drop (see plan())
+        kept = [] if self.allow_drop else [name for name in live if name not in table.c]
+        for name in kept:
+            reflected = live[name]
+            default = reflected.get("default")
+            tmp_table.append_column(Column(
+                name, reflected["type"], nullable=reflected["nullable"],
+                server_default=text(default) if default is not None else None,
+            ))
+
+        names, exprs = [], []
+        for col in table.columns:
+            default = self._scalar_default(col)
+            if col.name in live_columns:
+                expr = sql_column(col.name)
+                if default is not None and not col.nullable:
+                    expr = func.coalesce(expr, literal(default))
+            elif default is not None:
+                expr = literal(default)
+            elif col.nullable or col.primary_key:
+                expr = null()
+            else:
+                raise ValueError(
+                    f"Cannot add NOT NULL column {table.name}.{col.name} without a default to a populated table."
+                )
+            names.append(col.name)
+            exprs.append(expr)
+        names.extend(kept)
+        exprs.extend(sql_column(name) for name in kept)
+
+        # foreign keys were switched off before the transaction began (see migrate())
+        tmp_table.create(connection)
+        source = sql_table(table.name, *[sql_column(n) for n in live_columns])
+        connection.execute(insert(tmp_table).from_select(names, select(*exprs).select_from(source)))
+        connection.exec_driver_sql(f"DROP TABLE {self._quote(table.name)}")
+        connection.exec_driver_sql(f"ALTER TABLE {self._quote(tmp_name)} RENAME TO {self._quote(table.name)}")
+        for index in table.indexes:
+            index.create(connection)
+        violations = connection.exec_driver_sql(f"PRAGMA foreign_key_check({self._quote(table.name)})").fetchall()
+        if violations:
+            raise ValueError(f"Rebuilding {table.name} would violate foreign keys: {violations[:5]}")
+
+    # ------------------- helpers -------------------
+    def _quote(self, name: str) -> str:
+        return self.dialect.identifier_preparer.quote(name)
+
+    @staticmethod
+    def _scalar_default(col: Column):
+        default = col.default
+        if default is not None and getattr(default, "is_scalar", False):
+            return default.arg
+        return None
+
+
+def existing_index_names(connection, table_name: str) -> set[str]:
+    if connection.dialect.name == "sqlite":
+        # the inspector skips expression indexes on SQLite; read the catalog directly.
+        # sql IS NULL filters out the automatic indexes behind PK/UNIQUE constraints.
+        rows = connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL"),
+            {"t": table_name},
+        )
+        return {row[0] for row in rows}
+    return {
+        ix["name"] for ix in inspect(connection).get_indexes(table_name)
+        if ix["name"] and not ix.get("duplicates_constraint")
+    }
@@ -3,9 +3,13 @@ import re
 from sqlalchemy.orm import declarative_base, DeclarativeMeta, relationship
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, ForeignKey
 from .fields import *
+from .indexes import Index
+from .search import SearchIndex
+from .prefetch import Prefetch
+from .aggregates import Count, Sum, Avg, Min, Max
 from .manager import Manager
 from .relations import (
-    MODEL_REGISTRY, PENDING_BACKREFS, register_model,
+    MODEL_REGISTRY, PENDING_BACKREFS, PENDING_COUNTERS, register_model,
     camel_to_snake, get_tablename_for_classname, finalize_backrefs, ensure_m2m_table
 )
 from .m2m import ManyToManyDescriptor
@@ -27,16 +31,28 @@ class ModelMeta(DeclarativeMeta):
         fk_specs = []   # (field_name, ForeignKeyField, is_o2o)
         m2m_specs = []  # (field_name, ManyToManyField)
 
+        # Keep the Field declarations (types, validators, defaults) once they become Columns
+        fields = {}
+        for base in bases:
+            fields.update(getattr(base, "__fields__", {}))
+
         # Replace simple Field with Column; stash FK / M2M to wire after class exists
         for key, value in list(attrs.items()):
+            if isinstance(value, Field):
+                value.attr_name = key
+                fields[key] = value
             if isinstance(value, Field) and not isinstance(value, ForeignKeyField):
                 attrs[key] = Column(
                     value.get_column_type(),
                     primary_key=value.primary_key,
                     nullable=value.nullable,
                     unique=value.unique,
-                    default=value.default,
+                    index=value.db_index and not (value.unique or value.primary_key),
+                    # through the Field, so Core inserts get the same value as save() (str UUIDs)
+                    default=value.get_default_value if callable(value.default) else value.default,
                 )
+                if isinstance(value, FileField) and f"{key}_file" not in attrs:
+                    attrs[f"{key}_file"] = FieldFileDescriptor(value)
             elif isinstance(value, ForeignKeyField):
                 fk_specs.append((key, value, isinstance(value, OneToOneField)))
                 del attrs[key]
@@ -44,9 +60,7 @@ class ModelMeta(DeclarativeMeta):
                 m2m_specs.append((key, value))
                 del attrs[key]
 
-        for key, value in attrs.items():
-            if isinstance(value, Field):
-                value.attr_name = key
+        attrs["__fields__"] = fields
 
         # Create class first
         cls = super().__new__(mcls, name, bases, attrs)
@@ -66,16 +80,18 @@ class ModelMeta(DeclarativeMeta):
 
             target_table = camel_to_snake(target_simple)
 
-            # '<field>_id' column
+            # '<field>_id' column; no type given, so SQLAlchemy copies the target's
+            # primary key type (Integer, or String(36) for a UUIDField key) once it resolves
             col_name = f"{field_name}_id"
             setattr(
                 cls,
                 col_name,
                 Column(
-                    Integer,
                     ForeignKey(f"{target_table}.id"),
                     nullable=fk_field.nullable,
                     unique=fk_field.unique,
+                    # unique FKs (O2O) are already backed by their unique index
+                    index=fk_field.db_index and not fk_field.unique,
                 ),
             )
 
@@ -85,6 +101,11 @@ class ModelMeta(DeclarativeMeta):
                 rel_kwargs["back_populates"] = fk_field.related_name
             setattr(cls, field_name, relationship(target_fq, **rel_kwargs))
 
+            if fk_field.counter_cache:
+                counter = fk_field.counter_cache if isinstance(fk_field.counter_cache, str) else \
+                    f"{fk_field.related_name or attrs['__tablename__']}_count"
+                PENDING_COUNTERS.append((target_fq, counter, f"{cls.__module__}.{cls.__name__}", col_name))
+
             # schedule reverse
             if fk_field.related_name:
                 source_fq = f"{cls.__module__}.{cls.__name__}"
@@ -101,8 +122,9 @@ class ModelMeta(DeclarativeMeta):
                 target_fq = f"{mm_field.to.__module__}.{mm_field.to.__name__}"
 
             private_attr = f"_{field_name}_rel"
-            if not hasattr(cls, "__m2m_private_map__"):
-                cls.__m2m_private_map__ = {}
+            # own map per class; Model.__m2m_private_map__ is shared by every model
+            if "__m2m_private_map__" not in cls.__dict__:
+                cls.__m2m_private_map__ = dict(cls.__m2m_private_map__)
             cls.__m2m_private_map__[field_name] = private_attr
 
             source_fq = f"{cls.__module__}.{cls.__name__}"
@@ -115,6 +137,29 @@ class ModelMeta(DeclarativeMeta):
         # ✅ Make sure we return the class object
         return cls
 
+    def __init__(cls, name, bases, attrs):
+        super().__init__(name, bases, attrs)
+        if name == "Model":
+            return
+
+        # ---- Meta.indexes: __table__ only exists once DeclarativeMeta has mapped the class ----
+        for index in getattr(attrs.get("Meta"), "indexes", None) or []:
+            index.build(cls)
+
+        # ---- Meta.search_fields: full-text index, created by migrate() ----
+        search_fields = getattr(attrs.get("Meta"), "search_fields", None)
+        if search_fields:
+            config = getattr(attrs["Meta"], "search_config", "english")
+            SearchIndex(cls.__table__, search_fields, config).attach()
+
+        # ---- Meta.shard_key: rows spread over ApexORM(shards=...) (see sharding) ----
+        shard_key = getattr(attrs.get("Meta"), "shard_key", None)
+        if shard_key:
+            if shard_key not in cls.__table__.c:
+                raise ValueError(f"{name}.Meta.shard_key: unknown field '{shard_key}'")
+            cls.__shard_key__ = shard_key
+            cls.__shard_by__ = getattr(attrs["Meta"], "shard_by", None)
+
 
 
 class Model(Base, metaclass=ModelMeta):
@@ -123,6 +168,9 @@ class Model(Base, metaclass=ModelMeta):
     _session = None
     objects:Manager = None
     __m2m_private_map__ = {}
+    __fields__ = {}  # attribute name -> declared Field
+    __shard_key__ = None
+    __shard_by__ = None
 
     def __init__(self, **kwargs):
         super().__init__()
@@ -187,9 +235,10 @@ class Model(Base, metaclass=ModelMeta):
             val = getattr(self, col.name)
             field_obj = getattr(self.__class__, col.name, None)
 
-            if val is None and getattr(field_obj, "default", None) is not None:
-                default = field_obj.default
-                val = default() if callable(default) else default
+            # the declared Field (field_obj is the mapped attribute, whose .default is SQLAlchemy's)
+            declared = self.__fields__.get(col.name)
+            if val is None and declared is not None and declared.default is not None:
+                val = declared.get_default_value()
                 setattr(self, col.name, val)
 
             if hasattr(field_obj, "validators"):
@@ -0,0 +1,98 @@
+# apexorm/models/aggregates.py
+#
+# Aggregates for QuerySet.aggregate(). Each one is computed from partial
+# results (Avg as SUM and COUNT), so the partials of several databases - the
+# shards of a sharded model - combine into the same answer one database gives.
+from sqlalchemy import func
+
+
+class Aggregate:
+    def __init__(self, field: str):
+        self.field = field
+
+    def partials(self, column) -> list:
+        """SQL expressions whose values merge() combines."""
+        raise NotImplementedError
+
+    def merge(self, partials: list[tuple]):
+        """Combine one tuple of partial values per database."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.field!r})"
+
+
+def _present(values):
+    return [v for v in values if v is not None]
+
+
+class Count(Aggregate):
+    """Count("*") counts rows; Count("field") its non-NULL values."""
+    def __init__(self, field: str = "*"):
+        super().__init__(field)
+
+    def partials(self, column):
+        return [func.count() if column is None else func.count(column)]
+
+    def merge(self, partials):
+        return sum(p[0] or 0 for p in partials)
+
+
+class Sum(Aggregate):
+    def partials(self, column):
+        return [func.sum(column)]
+
+    def merge(self, partials):
+        values = _present(p[0] for p in partials)
+        return sum(values) if values else None
+
+
+class Min(Aggregate):
+    def partials(self, column):
+        return [func.min(column)]
+
+    def merge(self, partials):
+        values = _present(p[0] for p in partials)
+        return min(values) if values else None
+
+
+class Max(Aggregate):
+    def partials(self, column):
+        return [func.max(column)]
+
+    def merge(self, partials):
+        values = _present(p[0] for p in partials)
+        return max(values) if values else None
+
+
+class Avg(Aggregate):
+    def partials(self, column):
+        return [func.sum(column), func.count(column)]
+
+    def merge(self, partials):
+        total = sum(_present(p[0] for p in partials))
+        count = sum(p[1] or 0 for p in partials)
+        return total / count if count else None
+
+
+def aggregate_columns(model_class, aggregates: dict):
+    """(columns to select, (start, stop) of each aggregate's partials in the row)."""
+    if not aggregates:
+        raise ValueError("aggregate() needs at least one keyword, e.g. total=Sum('price').")
+    columns, spans = [], []
+    for alias, agg in aggregates.items():
+        if not isinstance(agg, Aggregate):
+            raise TypeError(f"aggregate({alias}=...) expects Count/Sum/Avg/Min/Max, got {agg!r}")
+        column = None if agg.field == "*" else getattr(model_class, agg.field)
+        parts = agg.partials(column)
+        spans.append((len(columns), len(columns) + len(parts)))
+        columns.extend(parts)
+    return columns, spans
+
+
+def merge_aggregates(aggregates: dict, spans, rows: list[tuple]) -> dict:
+    """{alias: value} from one row of partials per database."""
+    return {
+        alias: agg.merge([row[start:stop] for row in rows])
+        for (alias, agg), (start, stop) in zip(aggregates.items(), spans)
+    }
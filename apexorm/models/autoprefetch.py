@@ -0,0 +1,113 @@
+# apexorm/models/autoprefetch.py
+#
+# Auto-prefetch: instances returned together by QuerySet.all() remember their
+# siblings. The first lazy load of a relationship on any of them loads that
+# relationship for every sibling in one IN query, turning
+#
+#     for book in Book.objects.auto_prefetch().all():
+#         book.author.name
+#
+# into two queries instead of N+1. Works for FK, O2O (both sides), reverse FK and
+# M2M, since all of them reach the database through SQLAlchemy's lazy loader.
+from collections import defaultdict
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import IteratorResult
+from sqlalchemy.engine.result import SimpleResultMetaData
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+OPTION = "apexorm_auto_prefetch"
+_SIBLINGS = "apexorm_siblings"
+_installed = False
+
+
+def is_enabled(query, session) -> bool:
+    """Per-QuerySet setting wins; otherwise the ORM-wide default in session.info."""
+    return query.get_execution_options().get(OPTION, session.info.get(OPTION, False))
+
+
+def link_siblings(instances):
+    """Tag every instance of a result set with the (shared) list of its siblings."""
+    if len(instances) < 2:
+        return
+    _install()
+    # InstanceStates only hold weak references to their objects, so the group
+    # doesn't keep a large result set alive after the caller drops it
+    states = [inspect(obj) for obj in instances]
+    for state in states:
+        state.info[_SIBLINGS] = states
+
+
+def _install():
+    global _installed
+    if not _installed:
+        event.listen(Session, "do_orm_execute", _on_lazy_load)
+        _installed = True
+
+
+def _on_lazy_load(orm_execute_state):
+    if not orm_execute_state.is_select:
+        return None
+    state = orm_execute_state.lazy_loaded_from
+    if state is None or not orm_execute_state.loader_strategy_path.path:
+        return None
+    siblings = state.info.get(_SIBLINGS)
+    if not siblings:
+        return None
+
+    prop = orm_execute_state.loader_strategy_path.path[-1]
+    session = orm_execute_state.session
+    local_attr = _local_key_attr(prop)
+
+    batch = [
+        s for s in siblings
+        if s.obj() is not None and s.session is session
+        and prop.key in s.unloaded and local_attr in s.dict
+    ]
+    if state not in batch or len(batch) < 2:
+        return None
+
+    related = _load_related(session, prop, {s.dict[local_attr] for s in batch})
+    rows = []
+    for s in batch:
+        found = related.get(s.dict[local_attr], [])
+        if s is state:
+            rows = found
+            continue
+        value = found if prop.uselist else (found[0] if found else None)
+        set_committed_value(s.obj(), prop.key, value)
+
+    # answer the lazy load that triggered the batch; the loader sets the attribute itself
+    return IteratorResult(SimpleResultMetaData(["entity"]), iter([(obj,) for obj in rows]))
+
+
+def _join_columns(prop):
+    """(column on the parent holding the join key, column it is matched against)."""
+    if prop.secondary is not None:
+        (parent_col, secondary_col), = prop.synchronize_pairs
+        return parent_col, secondary_col
+    (local_col, remote_col), = prop.local_remote_pairs
+    return local_col, remote_col
+
+
+def _local_key_attr(prop) -> str:
+    parent_col, _ = _join_columns(prop)
+    return prop.parent.get_property_by_column(parent_col).key
+
+
+def _load_related(session, prop, keys) -> dict:
+    """Load the targets of `prop` for every parent join key, grouped by key."""
+    target = prop.mapper.class_
+    _, match_col = _join_columns(prop)
+    stmt = select(target, match_col)
+    if prop.secondary is not None:
+        (target_col, secondary_col), = prop.secondary_synchronize_pairs
+        stmt = stmt.join(prop.secondary, target_col == secondary_col)
+    stmt = stmt.where(match_col.in_([k for k in keys if k is not None]))
+    # report the batch as a load of this relationship to query instrumentation
+    stmt = stmt.execution_options(apexorm_relationship=(prop.parent.class_, prop.key))
+
+    grouped = defaultdict(list)
+    for obj, key in session.execute(stmt):
+        grouped[key].append(obj)
+    return grouped
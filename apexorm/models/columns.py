@@ -0,0 +1,108 @@
+# apexorm/models/columns.py
+#
+# Columnar results for analytics: each projected field is accumulated straight
+# into a typed buffer (array.array, optionally viewed as a NumPy array) instead
+# of one Python tuple and one model instance per row.
+from array import array
+from dataclasses import dataclass
+from sqlalchemy import Boolean, Float, Integer
+from .export import DEFAULT_CHUNK_SIZE, iter_chunks
+
+# column type -> (array typecode, NumPy dtype name, Python type of the items)
+_TYPECODES = (
+    (Boolean, "b", "bool", bool),
+    (Integer, "q", "int64", int),
+    (Float, "d", "float64", float),
+)
+
+
+@dataclass
+class ColumnArray:
+    """
+    One column of a to_columns() result.
+    `values` is an array.array (or NumPy array) for integer/float/boolean fields
+    and a list otherwise; `mask` marks NULL rows (None when there are none).
+    NULL entries hold 0 in a typed `values` buffer. Items are returned as
+    `item_type` (booleans are stored as 0/1 in an array.array).
+    """
+    values: object
+    mask: object = None
+    item_type: type|None = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        if self.mask is not None and self.mask[i]:
+            return None
+        value = self.values[i]
+        return value if self.item_type is None else self.item_type(value)
+
+    def tolist(self) -> list:
+        return [self[i] for i in range(len(self))]
+
+
+class _TypedBuffer:
+    def __init__(self, typecode: str, dtype: str, item_type: type):
+        self.dtype = dtype
+        self.item_type = item_type
+        self.values = array(typecode)
+        self.mask = None
+
+    def extend(self, chunk: tuple):
+        if None in chunk:
+            if self.mask is None:
+                self.mask = array("b", bytes(len(self.values)))
+            self.mask.extend([v is None for v in chunk])
+            self.values.extend([0 if v is None else v for v in chunk])
+            return
+        if self.mask is not None:
+            self.mask.extend(bytes(len(chunk)))
+        self.values.extend(chunk)
+
+    def finish(self, np) -> ColumnArray:
+        if np is None:
+            return ColumnArray(self.values, self.mask, self.item_type)
+        # zero-copy views over the array buffers; 0/1 bytes are valid NumPy booleans
+        mask = None if self.mask is None else np.frombuffer(self.mask, dtype=bool)
+        return ColumnArray(np.frombuffer(self.values, dtype=self.dtype), mask, self.item_type)
+
+
+class _ListBuffer:
+    def __init__(self):
+        self.values = []
+
+    def extend(self, chunk: tuple):
+        self.values.extend(chunk)
+
+    def finish(self, np) -> ColumnArray:
+        return ColumnArray(self.values)
+
+
+def _buffer_for(column):
+    for sa_type, typecode, dtype, item_type in _TYPECODES:
+        if isinstance(column.type, sa_type):
+            return _TypedBuffer(typecode, dtype, item_type)
+    return _ListBuffer()
+
+
+def _load_numpy(use_numpy: bool|None):
+    if use_numpy is False:
+        return None
+    try:
+        import numpy
+    except ImportError:
+        if use_numpy:
+            raise ImportError("to_columns(numpy=True) requires NumPy: pip install apexorm[numpy]") from None
+        return None
+    return numpy
+
+
+def to_columns(queryset, fields=(), chunk_size: int = DEFAULT_CHUNK_SIZE, use_numpy: bool|None = None) -> dict:
+    np = _load_numpy(use_numpy)
+    names, columns, chunks = iter_chunks(queryset, fields, chunk_size)
+    buffers = [_buffer_for(column) for column in columns]
+    for chunk in chunks:
+        for buffer, values in zip(buffers, zip(*chunk)):
+            buffer.extend(values)
+    return {name: buffer.finish(np) for name, buffer in zip(names, buffers)}
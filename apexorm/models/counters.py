@@ -0,0 +1,181 @@
+# apexorm/models/counters.py
+#
+# Counter caches: an integer column on the target of a ForeignKeyField that
+# holds how many rows point at it, so listing authors with their book counts
+# reads a column instead of counting or loading the books:
+#
+#     class Book(Model):
+#         author = ForeignKeyField("Author", related_name="books", counter_cache=True)
+#
+#     Author.books_count       # added by migrate(); "<related_name>_count" by default
+#
+# The column is changed in SQL (books_count = books_count + 1), in the same
+# transaction as the write: on save/delete/reassignment through the session,
+# and on bulk_upsert, get_or_create, update_or_create and load_csv/load_jsonl.
+# Manager.recount() repairs drift (rows changed outside the ORM).
+from collections import Counter
+from sqlalchemy import Column, Integer, bindparam, event, func, inspect, select, tuple_, update
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.util import identity_key
+
+_STALE = "apexorm_stale_counters"
+_installed = False
+
+
+class CounterCache:
+    """`column` on `target` counts the `source` rows whose `fk_key` points at it."""
+    def __init__(self, source, fk_key: str, target, column: str):
+        self.source = source
+        self.fk_key = fk_key
+        self.target = target
+        self.column = column
+
+    def __repr__(self):
+        return f"<CounterCache {self.target.__name__}.{self.column} <- {self.source.__name__}.{self.fk_key}>"
+
+    def adjust(self, connection, deltas: dict):
+        """Add deltas[parent_id] to each parent's counter, in SQL."""
+        deltas = {parent: n for parent, n in deltas.items() if parent is not None and n}
+        if not deltas:
+            return
+        table = self.target.__table__
+        stmt = update(table).where(table.c.id == bindparam("_parent")).values(
+            {self.column: table.c[self.column] + bindparam("_delta")}
+        )
+        connection.execute(stmt, [{"_parent": p, "_delta": n} for p, n in deltas.items()])
+
+    def recount(self, connection, parent_ids=None) -> int:
+        """Set counters to the real counts (all parents, or `parent_ids`); returns how many were off."""
+        table = self.target.__table__
+        source = self.source.__table__.alias()   # an alias also keeps self-referencing FKs unambiguous
+        count = select(func.count()).select_from(source).where(source.c[self.fk_key] == table.c.id)
+        count = count.scalar_subquery()
+        stmt = update(table).values({self.column: count}).where(table.c[self.column] != count)
+        if parent_ids is not None:
+            parent_ids = [p for p in parent_ids if p is not None]
+            if not parent_ids:
+                return 0
+            stmt = stmt.where(table.c.id.in_(parent_ids))
+        return connection.execute(stmt).rowcount
+
+
+def caches_of(model_class) -> list[CounterCache]:
+    return model_class.__dict__.get("__counter_caches__", [])
+
+
+def counter_columns(model_class) -> set[str]:
+    """Columns of model_class maintained as counters (never written from instance values)."""
+    return {cache.column for cache in model_class.__dict__.get("__counted_by__", [])}
+
+
+def attach(source, fk_key: str, target, column: str) -> CounterCache:
+    """Add the counter column to `target` and keep it in sync with `source` (called by finalize_backrefs)."""
+    if column not in target.__table__.c:
+        # no Python-side default: Model() leaves it None, which the INSERT omits, so the server default applies
+        setattr(target, column, Column(Integer, nullable=False, server_default="0"))
+    cache = CounterCache(source, fk_key, target, column)
+    if "__counter_caches__" not in source.__dict__:
+        source.__counter_caches__ = []
+        event.listen(source, "after_insert", _after_insert)
+        event.listen(source, "after_delete", _after_delete)
+        event.listen(source, "after_update", _after_update)
+    # load the old FK value before it is overwritten, so reassignment knows whom to decrement
+    event.listen(getattr(source, fk_key), "set", _keep_history, active_history=True)
+    if "__counted_by__" not in target.__dict__:
+        target.__counted_by__ = []
+    source.__counter_caches__.append(cache)
+    target.__counted_by__.append(cache)
+    _install()
+    return cache
+
+
+# ------------------- session writes -------------------
+def _keep_history(obj, value, oldvalue, initiator):
+    """No-op: registering with active_history=True is what matters."""
+    return value
+
+
+def _after_insert(mapper, connection, obj):
+    for cache in caches_of(mapper.class_):
+        parent = getattr(obj, cache.fk_key)
+        cache.adjust(connection, {parent: 1})
+        _mark_stale(object_session(obj), cache, [parent])
+
+
+def _after_delete(mapper, connection, obj):
+    for cache in caches_of(mapper.class_):
+        history = inspect(obj).attrs[cache.fk_key].history
+        stored = history.deleted or history.unchanged   # the value in the row, even if changed since
+        parent = stored[0] if stored else None
+        if parent is None:
+            continue
+        cache.adjust(connection, {parent: -1})
+        _mark_stale(object_session(obj), cache, [parent])
+
+
+def _after_update(mapper, connection, obj):
+    for cache in caches_of(mapper.class_):
+        history = inspect(obj).attrs[cache.fk_key].history
+        if not history.added or not history.deleted:
+            continue   # unchanged
+        old, new = history.deleted[0], history.added[0]
+        if old == new:
+            continue
+        cache.adjust(connection, {old: -1, new: 1})
+        _mark_stale(object_session(obj), cache, [old, new])
+
+
+def _mark_stale(session, cache, parents):
+    if session is not None:
+        session.info.setdefault(_STALE, set()).update((cache, p) for p in parents if p is not None)
+
+
+def _install():
+    global _installed
+    if not _installed:
+        event.listen(Session, "after_flush_postexec", _expire_stale)
+        _installed = True
+
+
+def _expire_stale(session, flush_context):
+    """Loaded parents re-read their counter on next access."""
+    for cache, parent in session.info.pop(_STALE, ()):
+        obj = session.identity_map.get(identity_key(cache.target, (parent,)))
+        if obj is not None:
+            session.expire(obj, [cache.column])
+
+
+# ------------------- bulk writes -------------------
+def after_bulk_insert(connection, model_class, rows):
+    """Count rows inserted outside the unit of work (executemany INSERTs)."""
+    for cache in caches_of(model_class):
+        cache.adjust(connection, Counter(row.get(cache.fk_key) for row in rows))
+
+
+def parents_before(session, model_class, conflict: list[str], rows) -> dict:
+    """
+    For writes that may update existing rows (upserts): the parents those rows
+    point at now, to recount together with the new ones afterwards.
+    """
+    caches = caches_of(model_class)
+    if not caches or not rows:
+        return {}
+    table = model_class.__table__
+    columns = [table.c[c] for c in conflict]
+    keys = list({tuple(row[c] for c in conflict) for row in rows})
+    condition = columns[0].in_([k[0] for k in keys]) if len(columns) == 1 else tuple_(*columns).in_(keys)
+    found = session.execute(select(*(table.c[c.fk_key] for c in caches)).where(condition)).all()
+    return {cache: {row[i] for row in found} for i, cache in enumerate(caches)}
+
+
+def recount_after(session, model_class, before: dict, rows):
+    """Recount the parents rows pointed at before (see parents_before) and now point at."""
+    for cache in caches_of(model_class):
+        parents = set(before.get(cache, ())) | {row.get(cache.fk_key) for row in rows}
+        parents.discard(None)
+        if parents:
+            cache.recount(session.connection(), parents)
+            for parent in parents:
+                obj = session.identity_map.get(identity_key(cache.target, (parent,)))
+                if obj is not None:
+                    session.expire(obj, [cache.column])
@@ -0,0 +1,195 @@
+# apexorm/models/explain.py
+import json
+import time
+from dataclasses import dataclass, field
+from sqlalchemy import Column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, ClauseElement
+from sqlalchemy.sql.expression import Executable
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper around a SELECT, rendered per dialect."""
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    dialect = compiler.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "  # no ANALYZE; QuerySet.explain() times the query instead
+    elif dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, FORMAT JSON) " if element.analyze else "EXPLAIN (FORMAT JSON) "
+    elif dialect in ("mysql", "mariadb"):
+        prefix = "EXPLAIN ANALYZE " if element.analyze else "EXPLAIN FORMAT=JSON "
+    else:
+        prefix = "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+@dataclass
+class ExplainResult:
+    """
+    Query plan of a QuerySet plus the problems found in it:
+
+    - full_scans:     tables read row by row without an index
+    - temp_btrees:    sorts/groupings the database builds at query time ("ORDER BY" ...)
+    - used_indexes:   indexes the plan uses
+    - unused_indexes: indexes on a filtered/ordered column that the plan ignores
+    - warnings:       lookups that can't use an index at all (ilike-based __have/__startswith...)
+    """
+    sql: str
+    dialect: str
+    plan: list
+    full_scans: list[str] = field(default_factory=list)
+    temp_btrees: list[str] = field(default_factory=list)
+    used_indexes: list[str] = field(default_factory=list)
+    unused_indexes: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    duration: float|None = None   # seconds, analyze=True only
+    rows: int|None = None         # rows returned, analyze=True only
+
+    @property
+    def ok(self) -> bool:
+        return not (self.full_scans or self.temp_btrees or self.warnings)
+
+    def __str__(self):
+        lines = [self.sql, ""]
+        if self.dialect == "sqlite":
+            lines += [f"  {row[-1]}" for row in self.plan]
+        else:
+            lines.append(json.dumps(self.plan, indent=2, default=str))
+        for label, items in (
+            ("full table scan", self.full_scans),
+            ("temp b-tree", self.temp_btrees),
+            ("unused index", self.unused_indexes),
+            ("warning", self.warnings),
+        ):
+            lines += [f"{label}: {item}" for item in items]
+        if self.duration is not None:
+            lines.append(f"{self.rows} rows in {self.duration * 1000:.2f}ms")
+        return "\n".join(lines)
+
+
+def explain_query(query, session, analyze: bool = False) -> ExplainResult:
+    statement = query.statement
+    connection = session.connection()
+    dialect = connection.dialect.name
+
+    raw = connection.execute(Explain(statement, analyze)).fetchall()
+    sql = str(statement.compile(dialect=connection.dialect))
+    if dialect == "sqlite":
+        result = ExplainResult(sql, dialect, [tuple(row) for row in raw])
+        _analyze_sqlite(result)
+    elif dialect == "postgresql":
+        plan = raw[0][0]
+        result = ExplainResult(sql, dialect, json.loads(plan) if isinstance(plan, str) else plan)
+        _analyze_postgres(result)
+    elif dialect in ("mysql", "mariadb") and not analyze:
+        result = ExplainResult(sql, dialect, [json.loads(raw[0][0])])
+        _analyze_mysql(result)
+    else:
+        result = ExplainResult(sql, dialect, [tuple(row) for row in raw])
+
+    _check_lookups(result, statement)
+
+    if analyze and dialect == "sqlite":
+        started = time.perf_counter()
+        result.rows = len(connection.execute(statement).fetchall())
+        result.duration = time.perf_counter() - started
+    elif analyze and dialect == "postgresql":
+        result.duration = result.plan[0].get("Execution Time", 0) / 1000
+        result.rows = result.plan[0]["Plan"].get("Actual Rows")
+    return result
+
+
+# ------------------- plan parsers -------------------
+def _analyze_sqlite(result: ExplainResult):
+    # detail looks like "SCAN book", "SEARCH book USING INDEX ix_book_author_id (author_id=?)",
+    # "SCAN book USING COVERING INDEX ...", "USE TEMP B-TREE FOR ORDER BY";
+    # SQLite before 3.36 writes "SCAN TABLE book" / "SEARCH TABLE book USING ..."
+    for *_ids, detail in result.plan:
+        words = detail.split()
+        if detail.startswith("USE TEMP B-TREE FOR "):
+            result.temp_btrees.append(detail[len("USE TEMP B-TREE FOR "):])
+        elif words[0] in ("SCAN", "SEARCH"):
+            if words[1] == "TABLE" and len(words) > 2:
+                del words[1]
+            table = words[1]
+            if "INDEX" in words:
+                result.used_indexes.append(words[words.index("INDEX") + 1])
+            elif "PRIMARY KEY" in detail:
+                result.used_indexes.append(f"{table} (primary key)")
+            elif words[0] == "SCAN":
+                result.full_scans.append(table)
+
+
+def _analyze_postgres(result: ExplainResult):
+    def walk(node):
+        node_type = node.get("Node Type", "")
+        if node_type == "Seq Scan":
+            result.full_scans.append(node.get("Relation Name"))
+        elif "Index Name" in node:
+            result.used_indexes.append(node["Index Name"])
+        elif node_type in ("Sort", "Incremental Sort"):
+            result.temp_btrees.append(f"ORDER BY {', '.join(node.get('Sort Key', []))}")
+        for child in node.get("Plans", []):
+            walk(child)
+    for entry in result.plan:
+        walk(entry["Plan"])
+
+
+def _analyze_mysql(result: ExplainResult):
+    def walk(node):
+        if isinstance(node, dict):
+            if "table_name" in node:
+                if node.get("access_type") == "ALL":
+                    result.full_scans.append(node["table_name"])
+                if node.get("key"):
+                    result.used_indexes.append(node["key"])
+            if node.get("using_filesort"):
+                result.temp_btrees.append("ORDER BY")
+            if node.get("using_temporary_table"):
+                result.temp_btrees.append("temporary table")
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+    walk(result.plan)
+
+
+# ------------------- statement checks -------------------
+_ILIKE_OPS = (operators.ilike_op, operators.not_ilike_op)
+
+
+def _check_lookups(result: ExplainResult, statement):
+    """Warn about ilike lookups and list indexes that could serve the query but weren't used."""
+    referenced = {}
+    clauses = [c for c in (statement.whereclause,) if c is not None] + list(statement._order_by_clauses)
+    for clause in clauses:
+        for element in visitors.iterate(clause):
+            if isinstance(element, Column) and element.table is not None:
+                referenced[(element.table.name, element.name)] = element
+            if isinstance(element, BinaryExpression) and element.operator in _ILIKE_OPS:
+                column = element.left
+                name = f"{column.table.name}.{column.name}" if isinstance(column, Column) else str(column)
+                result.warnings.append(
+                    f"case-insensitive match on {name} compiles to lower(...) LIKE and cannot use "
+                    f"an index on the column; filter on an exact value, or add "
+                    f"Index(\"lower({getattr(column, 'name', column)})\") and compare lowercased values"
+                )
+
+    used = set(result.used_indexes)
+    seen = set()
+    for (table_name, column_name), column in referenced.items():
+        for index in column.table.indexes:
+            leading = next(iter(index.expressions), None)
+            if getattr(leading, "name", None) == column_name and index.name not in used | seen:
+                seen.add(index.name)
+                result.unused_indexes.append(index.name)
@@ -0,0 +1,98 @@
+# apexorm/models/export.py
+#
+# Streaming exports. Rows are fetched as plain column tuples (no model
+# instances) from a server-side cursor where the driver supports one, a chunk
+# at a time, and written straight through a buffered file, so memory stays
+# flat no matter how many rows the QuerySet matches.
+import csv
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from decimal import Decimal
+from sqlalchemy import JSON, Date, DateTime, Time
+
+DEFAULT_CHUNK_SIZE = 2000
+_BUFFER_SIZE = 1 << 16
+
+
+def iter_chunks(queryset, fields, chunk_size: int):
+    """Return (field names, Columns, iterator over lists of row tuples) for the projected fields."""
+    model_class = queryset.model_class
+    if not fields:
+        fields = [col.name for col in model_class.__table__.columns]
+    columns = [getattr(model_class, f) for f in fields]
+    chunks = queryset._column_chunks(columns, chunk_size)
+    return list(fields), [c.property.columns[0] for c in columns], chunks
+
+
+def stream_columns(query, session, columns, chunk_size: int):
+    """Lists of row tuples of `columns` for `query`, `chunk_size` at a time."""
+    statement = query.with_entities(*columns).statement
+    result = session.execute(statement, execution_options={"stream_results": True})
+    return result.partitions(chunk_size)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_converter(column):
+    """Per-column cell conversion for CSV; None means write the value as is."""
+    if isinstance(column.type, (DateTime, Date, Time)):
+        return lambda v: None if v is None else v.isoformat()
+    if isinstance(column.type, JSON):
+        return lambda v: None if v is None else json.dumps(v, default=_json_default, separators=(",", ":"))
+    return None
+
+
+@contextmanager
+def _open_text(dest):
+    """Accept a path or an open text file; only files we open are closed."""
+    if isinstance(dest, (str, os.PathLike)):
+        with open(dest, "w", encoding="utf-8", newline="", buffering=_BUFFER_SIZE) as f:
+            yield f
+    elif hasattr(dest, "write"):
+        yield dest
+    else:
+        raise TypeError(f"Expected a path or a writable text file, got {type(dest).__name__}")
+
+
+def to_csv(queryset, dest, fields=(), chunk_size: int = DEFAULT_CHUNK_SIZE, header: bool = True, **fmtparams) -> int:
+    names, columns, chunks = iter_chunks(queryset, fields, chunk_size)
+    converters = [(i, conv) for i, conv in enumerate(map(_csv_converter, columns)) if conv]
+    count = 0
+    with _open_text(dest) as f:
+        writer = csv.writer(f, **fmtparams)
+        if header:
+            writer.writerow(names)
+        for chunk in chunks:
+            if converters:
+                rows = []
+                for row in chunk:
+                    row = list(row)
+                    for i, conv in converters:
+                        row[i] = conv(row[i])
+                    rows.append(row)
+                chunk = rows
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def to_jsonl(queryset, dest, fields=(), chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    names, _columns, chunks = iter_chunks(queryset, fields, chunk_size)
+    encode = json.JSONEncoder(default=_json_default, ensure_ascii=False, separators=(",", ":")).encode
+    count = 0
+    with _open_text(dest) as f:
+        for chunk in chunks:
+            f.write("".join(encode(dict(zip(names, row))) + "\n" for row in chunk))
+            count += len(chunk)
+    return count
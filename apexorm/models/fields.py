@@ -5,19 +5,29 @@ from sqlalchemy import Integer, String, Boolean, DateTime, Float, Text, JSON, Da
 from apexorm.models.validators import (
     validate_email, validate_url, validate_uuid, validate_ip_address, ValidationError
 )
+from apexorm.models.storage import cleanup
 from apexorm.models.storage.local import LocalStorageBackend
 
 
-_default_storage = LocalStorageBackend()
+_default_storage = None
+
+
+def get_default_storage():
+    """The shared LocalStorageBackend, created on first use."""
+    global _default_storage
+    if _default_storage is None:
+        _default_storage = LocalStorageBackend()
+    return _default_storage
 
 
 class Field:
-    def __init__(self, primary_key: bool=False, nullable: bool=True, unique: bool=False, default=None, validators=None):
+    def __init__(self, primary_key: bool=False, nullable: bool=True, unique: bool=False, default=None, validators=None, db_index: bool=False):
         self.primary_key = primary_key
         self.nullable = nullable
         self.unique = unique
         self.default = default
         self.validators = validators or []
+        self.db_index = db_index
 
     def validate(self, value):
         for validator in self.validators:
@@ -39,9 +49,9 @@ class IntegerField(Field):
 
 
 class CharField(Field):
-    def __init__(self, max_length: int, primary_key: bool=False, nullable: bool=True, unique: bool=False, default=None, validators=None):
+    def __init__(self, max_length: int, primary_key: bool=False, nullable: bool=True, unique: bool=False, default=None, validators=None, db_index: bool=False):
         self.max_length = max_length
-        super().__init__(primary_key, nullable, unique, default, validators)
+        super().__init__(primary_key, nullable, unique, default, validators, db_index)
 
     def get_column_type(self):
         return String(self.max_length)
@@ -70,12 +80,18 @@ class TextField(Field):
 class ForeignKeyField(Field):
     """
     author = ForeignKeyField("User", related_name="posts", nullable=False)
+
+    The '<field>_id' column is indexed by default; pass db_index=False to opt out.
+    counter_cache=True keeps "<related_name>_count" on the target up to date
+    (or pass the column name); see counters.
     """
-    def __init__(self, to: str, related_name: str|None=None, nullable: bool=True, unique: bool=False, on_delete: str|None=None):
-        super().__init__(primary_key=False, nullable=nullable, unique=unique, default=None)
+    def __init__(self, to: str, related_name: str|None=None, nullable: bool=True, unique: bool=False, on_delete: str|None=None, db_index: bool=True,
+                 counter_cache: bool|str = False):
+        super().__init__(primary_key=False, nullable=nullable, unique=unique, default=None, db_index=db_index)
         self.to = to
         self.related_name = related_name
         self.on_delete = on_delete  # not yet enforced, placeholder
+        self.counter_cache = counter_cache
 
 
 class OneToOneField(ForeignKeyField):
@@ -116,6 +132,11 @@ class UUIDField(Field):
         super().__init__(default=default, validators=validators, **kwargs)
     def get_column_type(self): return String(36)
 
+    def get_default_value(self):
+        # stored as text: uuid4() gives a UUID object
+        value = super().get_default_value()
+        return str(value) if isinstance(value, uuid.UUID) else value
+
 
 class IPAddressField(CharField):
     def __init__(self, **kwargs):
@@ -161,36 +182,113 @@ class FileField(Field):
 
     def __init__(self, upload_to="uploads", storage=None, **kwargs):
         self.upload_to = upload_to
-        self.storage = storage or _default_storage
+        self._storage = storage
         super().__init__(**kwargs)
 
+    @property
+    def storage(self):
+        return self._storage or get_default_storage()
+
+    @storage.setter
+    def storage(self, backend):
+        self._storage = backend
+
     def get_column_type(self):
         return String(255)
 
-    def save_file(self, instance, file_name: str, file_data: bytes):
-        """Save a new file and delete old file if present."""
+    def save_file(self, instance, file_name: str, file_data):
+        """
+        Save a new file and delete old file if present. `file_data` is bytes, a
+        binary file-like object or an iterable of bytes chunks; it is streamed
+        to the storage backend, never read into memory as a whole.
+
+        On a model bound to a session, the old file is deleted only after the
+        session commits, and the new one is removed again if it rolls back.
+        """
+        session = getattr(instance, "_session", None)
         old_path = getattr(instance, self.attr_name, None)
-        if old_path:
-            self.storage.delete(old_path)
         rel_path = self.storage.save(self.upload_to, file_name, file_data)
+        cleanup.delete_on_rollback(session, self.storage, rel_path)
+        cleanup.delete_on_commit(session, self.storage, old_path)
         setattr(instance, self.attr_name, rel_path)
         return rel_path
 
     def delete_file(self, instance):
-        """Delete the file if it exists."""
+        """Delete the file if it exists (after the session commits, in the background)."""
         file_path = getattr(instance, self.attr_name, None)
         if file_path:
-            self.storage.delete(file_path)
+            cleanup.delete_on_commit(getattr(instance, "_session", None), self.storage, file_path)
             setattr(instance, self.attr_name, None)
 
 
+class FieldFile:
+    """
+    `instance.<name>_file`: the stored file behind a FileField value.
+
+        doc.attachment_file.read_range(0, 1024)
+        with doc.attachment_file.mmap() as m: ...
+    """
+    def __init__(self, instance, field: "FileField"):
+        self.instance = instance
+        self.field = field
+
+    @property
+    def name(self) -> str|None:
+        return getattr(self.instance, self.field.attr_name, None)
+
+    def __bool__(self):
+        return bool(self.name)
+
+    def _path(self) -> str:
+        if not self.name:
+            raise ValueError(f"'{self.field.attr_name}' has no file.")
+        return self.name
+
+    @property
+    def url(self) -> str:
+        return self.field.storage.url(self._path())
+
+    @property
+    def size(self) -> int:
+        return self.field.storage.size(self._path())
+
+    def open(self):
+        return self.field.storage.open(self._path())
+
+    def read_range(self, start: int, length: int|None = None) -> bytes:
+        return self.field.storage.read_range(self._path(), start, length)
+
+    def mmap(self):
+        return self.field.storage.mmap(self._path())
+
+    def save(self, file_name: str, file_data):
+        return self.field.save_file(self.instance, file_name, file_data)
+
+    def delete(self):
+        self.field.delete_file(self.instance)
+
+    def __repr__(self):
+        return f"<FieldFile {self.name!r}>"
+
+
+class FieldFileDescriptor:
+    """Installed by ModelMeta as `<name>_file` next to each FileField column."""
+    def __init__(self, field: "FileField"):
+        self.field = field
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return FieldFile(instance, self.field)
+
+
 class ImageField(FileField):
     """
     Validates image extensions and saves them using the same backend.
     """
     ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
-    def save_file(self, instance, file_name: str, file_data: bytes):
+    def save_file(self, instance, file_name: str, file_data):
         ext = os.path.splitext(file_name)[1].lower()
         if ext not in self.ALLOWED_EXTENSIONS:
             raise ValidationError(f"Unsupported image format: {ext}")
@@ -0,0 +1,129 @@
+# apexorm/models/gather.py
+#
+# ApexORM.gather(): evaluate independent QuerySets concurrently, so a page
+# that needs several unrelated queries waits for the slowest one instead of
+# their sum:
+#
+#     books, n_authors, titles = orm.gather(
+#         Book.objects.filter(published=True),            # -> .all()
+#         Author.objects.all().count,                      # a QuerySet method, called on the worker
+#         partial(Book.objects.order_by("-sales").values, "id", "title"),
+#     )
+#
+# Each query runs on a bounded thread pool in its own session (and so on its
+# own pooled connection). Model instances are merged into the ORM's session
+# afterwards, without extra queries, so they behave like any other result;
+# rows the session already holds come back as its instances, edits included.
+# Sharded QuerySets already fan out over their shards; they run on the calling
+# thread.
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from sqlalchemy import inspect
+from .queryset import QuerySet, _ResultList
+from .sharding import ShardedQuerySet
+
+
+class GatherResult(list):
+    """Results in argument order; `timings[i]` is query i's wall time in seconds."""
+    def __init__(self, results, timings):
+        super().__init__(results)
+        self.timings = timings
+
+
+def _shared(item) -> bool:
+    """Items that must keep their own sessions (ShardedQuerySet and its methods)."""
+    if isinstance(item, partial):
+        return _shared(item.func)
+    return isinstance(getattr(item, "__self__", item), ShardedQuerySet)
+
+
+def _bindable(item) -> bool:
+    if isinstance(item, partial):
+        return _bindable(item.func)
+    return isinstance(item, QuerySet) or isinstance(getattr(item, "__self__", None), QuerySet)
+
+
+def _bind(item, session):
+    """A zero-argument callable evaluating `item` against `session`."""
+    if isinstance(item, QuerySet):
+        return item.using(session).all
+    if isinstance(item, partial):
+        return partial(_bind(item.func, session), *item.args, **item.keywords)
+    return getattr(item.__self__.using(session), item.__name__)
+
+
+def _evaluate(session_factory, item):
+    session = session_factory()
+    start = time.perf_counter()
+    try:
+        result = _bind(item, session)()
+    finally:
+        session.close()   # results stay loaded; gather() merges them into the ORM's session
+    return result, time.perf_counter() - start
+
+
+def _attach(session, result):
+    from . import Base
+
+    if isinstance(result, _ResultList):
+        # read-only rows (QuerySet.readonly()) are not session objects and pass through
+        return _ResultList([_merge(session, obj) if isinstance(obj, Base) else obj for obj in result],
+                           result._model_class)
+    if isinstance(result, Base):
+        return _merge(session, result)
+    return result
+
+
+def _merge(session, obj, merged_by_id=None):
+    """obj merged into `session`, with the plain attributes of obj and everything loaded with it."""
+    from . import Base
+
+    merged_by_id = {} if merged_by_id is None else merged_by_id
+    if id(obj) in merged_by_id:
+        return merged_by_id[id(obj)]
+    state = inspect(obj)
+    # an instance the session already holds wins, as it would for a query in that
+    # session: merging would overwrite its uncommitted edits with the loaded row
+    existing = session.identity_map.get(state.key) if state.key is not None else None
+    merged = merged_by_id[id(obj)] = existing if existing is not None else session.merge(obj, load=False)
+    mapped = set(state.mapper.attrs.keys())
+    for name, value in vars(obj).items():
+        if name in mapped or name.startswith("_"):
+            continue
+        # plain attributes, e.g. a Prefetch(to_attr=...) list
+        if isinstance(value, Base):
+            value = _merge(session, value, merged_by_id)
+        elif isinstance(value, list) and any(isinstance(v, Base) for v in value):
+            value = [_merge(session, v, merged_by_id) if isinstance(v, Base) else v for v in value]
+        setattr(merged, name, value)
+    # loaded related objects may carry their own, e.g. Prefetch("books__author", to_attr="writer")
+    for rel in state.mapper.relationships:
+        value = state.dict.get(rel.key)
+        for related in (value if rel.uselist else [value]) if value is not None else ():
+            _merge(session, related, merged_by_id)
+    return merged
+
+
+def gather(executor: ThreadPoolExecutor, session_factory, session, items, timeout: float|None = None) -> GatherResult:
+    for item in items:
+        if not _bindable(item):
+            raise TypeError(
+                f"gather() takes QuerySets, QuerySet methods (qs.count) or functools.partial of them, got {item!r}"
+            )
+    futures = {
+        i: executor.submit(_evaluate, session_factory, item)
+        for i, item in enumerate(items) if not _shared(item)
+    }
+    results, timings = [None] * len(items), [0.0] * len(items)
+    for i, item in enumerate(items):
+        if i not in futures:
+            start = time.perf_counter()
+            results[i] = item.all() if isinstance(item, QuerySet) else item()
+            timings[i] = time.perf_counter() - start
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for i, future in futures.items():
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        result, timings[i] = future.result(timeout=remaining)
+        results[i] = _attach(session, result)
+    return GatherResult(results, timings)
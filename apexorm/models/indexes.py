@@ -0,0 +1,92 @@
+# apexorm/models/indexes.py
+import re
+import hashlib
+from sqlalchemy import Index as SAIndex, func
+from .jsonpath import JSONExtract, is_json_column
+
+
+_FUNC_EXPR = re.compile(r"^(\w+)\((\w+)\)$")
+_MAX_NAME_LENGTH = 63  # Postgres identifier limit; SQLite/MySQL are more generous
+
+
+class Index:
+    """
+    Model-level index declared on Meta.indexes.
+
+        class User(Model):
+            ...
+            class Meta:
+                indexes = [
+                    Index("last_name", "first_name"),               # composite
+                    Index("lower(email)", unique=True),             # functional
+                    Index("created_at", condition=Q(active=True)),  # partial
+                    Index("-created_at"),                           # descending
+                ]
+
+    Entries are field names (FK names resolve to their '<field>_id' column),
+    "-field" for DESC, "func(field)" for a single-argument SQL function, or a
+    JSONField key path ("payload__user__id") matching the JSON path lookups.
+    `condition` is a Q object (or a dict of lookups) compiled to a WHERE clause
+    on dialects that support partial indexes (SQLite, Postgres).
+    """
+    def __init__(self, *expressions: str, name: str|None=None, condition=None, unique: bool=False):
+        if not expressions:
+            raise ValueError("Index() requires at least one field or expression.")
+        self.expressions = expressions
+        self.name = name
+        self.condition = condition
+        self.unique = unique
+
+    def _resolve_column(self, table, field_name: str):
+        if field_name in table.c:
+            return table.c[field_name]
+        if f"{field_name}_id" in table.c:
+            return table.c[f"{field_name}_id"]
+        raise ValueError(f"Index on '{table.name}': unknown field '{field_name}'")
+
+    def _resolve(self, table, expression: str):
+        match = _FUNC_EXPR.match(expression)
+        if match:
+            func_name, field_name = match.groups()
+            return getattr(func, func_name)(self._resolve_column(table, field_name))
+        if expression.startswith("-"):
+            return self._resolve(table, expression[1:]).desc()
+        field_name, *path = expression.split("__")
+        if path:
+            column = self._resolve_column(table, field_name)
+            if not is_json_column(column):
+                raise ValueError(f"Index on '{table.name}': '{field_name}' is not a JSONField, can't index '{expression}'")
+            # the same expression JSON path lookups (payload__user__id=...) compile to
+            return JSONExtract(column, path)
+        return self._resolve_column(table, expression)
+
+    def get_name(self, table) -> str:
+        if self.name:
+            return self.name
+        parts = [
+            f"{e[1:]}_desc" if e.startswith("-") else re.sub(r"\W+", "_", e).strip("_")
+            for e in self.expressions
+        ]
+        name = f"{'ux' if self.unique else 'ix'}_{table.name}_{'_'.join(parts)}"
+        if len(name) > _MAX_NAME_LENGTH:
+            digest = hashlib.md5(name.encode()).hexdigest()[:8]
+            name = f"{name[:_MAX_NAME_LENGTH - 9]}_{digest}"
+        return name
+
+    def build(self, model_class) -> SAIndex:
+        """Create the SQLAlchemy Index and attach it to the model's table."""
+        table = model_class.__table__
+        columns = [self._resolve(table, e) for e in self.expressions]
+
+        dialect_kwargs = {}
+        if self.condition is not None:
+            from .queryset import Q
+            condition = self.condition if isinstance(self.condition, Q) else Q(**self.condition)
+            where = condition.build(model_class)
+            dialect_kwargs["sqlite_where"] = where
+            dialect_kwargs["postgresql_where"] = where
+
+        return SAIndex(self.get_name(table), *columns, unique=self.unique, **dialect_kwargs)
+
+    def __repr__(self):
+        return f"<Index {', '.join(self.expressions)} unique={self.unique}>"
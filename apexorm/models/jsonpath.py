@@ -0,0 +1,139 @@
+# apexorm/models/jsonpath.py
+#
+# Lookups inside JSONField documents, compiled to the database's own JSON
+# functions so the filtering happens in SQL:
+#
+#     Event.objects.filter(payload__user__id=5)
+#     Event.objects.filter(payload__tags__0="urgent", payload__has_key="retry")
+#
+# SQLite: json_extract(payload, '$."user"."id"')       Postgres: payload #>> '{user,id}'
+# MySQL:  json_unquote(json_extract(payload, '$."user"."id"'))
+#
+# The path is rendered inline (not as a bound parameter) so the expression is
+# textually identical from query to query and matches an expression index built
+# from the same path: Index("payload__user__id").
+import re
+from sqlalchemy import JSON, Float, String, bindparam
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import Boolean, TypeDecorator
+
+_KEY = re.compile(r"^[\w-]+$")
+
+
+def is_json_column(column) -> bool:
+    return isinstance(getattr(column, "type", None), JSON)
+
+
+def _check_path(path):
+    for key in path:
+        if not _KEY.match(key):
+            raise ValueError(f"Unsupported JSON key {key!r}: use letters, digits, '_' or '-'.")
+    return tuple(path)
+
+
+def _json_path(path) -> str:
+    """SQLite/MySQL path: $."user"."tags"[0]"""
+    return "$" + "".join(f"[{key}]" if key.isdigit() else f'."{key}"' for key in path)
+
+
+def _pg_path(path) -> str:
+    return "{" + ",".join(path) + "}"
+
+
+class _JSONScalar(TypeDecorator):
+    """
+    Type of an extracted value. Postgres extracts text (#>>), so comparison
+    values are sent as their JSON text: 5 -> '5', True -> 'true'.
+    """
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != "postgresql" or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
+
+
+class JSONExtract(ColumnElement):
+    """The scalar at `path` inside a JSON column; numeric=True compares as a number."""
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("path", InternalTraversal.dp_string_list),
+        ("numeric", InternalTraversal.dp_boolean),
+    ]
+
+    def __init__(self, column, path, numeric: bool = False):
+        self.column = column
+        self.path = _check_path(path)
+        self.numeric = numeric
+        self.type = Float() if numeric else _JSONScalar()
+
+
+class JSONHasKey(ColumnElement):
+    """True when the object at `path` (the document itself for ()) has `key`."""
+    inherit_cache = True
+    type = Boolean()
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("path", InternalTraversal.dp_string_list),
+        ("key", InternalTraversal.dp_clauseelement),
+        ("key_path", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, path, key: str):
+        if not isinstance(key, str) or '"' in key:
+            raise ValueError(f"has_key expects a key name, got {key!r}")
+        self.column = column
+        self.path = _check_path(path)
+        # bound, not inlined: the key is a value. Postgres takes the key, the others a path.
+        self.key = bindparam(None, key, type_=String())
+        self.key_path = bindparam(None, f'{_json_path(self.path)}."{key}"', type_=String())
+
+
+@compiles(JSONExtract)
+def _compile_extract(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    path = element.path
+    if compiler.dialect.name == "postgresql":
+        sql = f"({column} #>> {compiler.render_literal_value(_pg_path(path), String())})"
+        return f"CAST({sql} AS DOUBLE PRECISION)" if element.numeric else sql
+    literal = compiler.render_literal_value(_json_path(path), String())
+    if compiler.dialect.name in ("mysql", "mariadb"):
+        sql = f"JSON_EXTRACT({column}, {literal})"
+        return sql if element.numeric else f"JSON_UNQUOTE({sql})"
+    return f"json_extract({column}, {literal})"
+
+
+@compiles(JSONHasKey)
+def _compile_has_key(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    dialect = compiler.dialect.name
+    if dialect == "postgresql":
+        target = f"CAST({column} AS JSONB)"
+        if element.path:
+            target = f"({target} #> {compiler.render_literal_value(_pg_path(element.path), String())})"
+        return f"({target} ? {compiler.process(element.key, **kw)})"
+    key_path = compiler.process(element.key_path, **kw)
+    if dialect in ("mysql", "mariadb"):
+        return f"(JSON_CONTAINS_PATH({column}, 'one', {key_path}) = 1)"
+    return f"(json_type({column}, {key_path}) IS NOT NULL)"
+
+
+# ------------------- lookups -------------------
+_RANGE = {"lt", "lte", "gt", "gte"}
+
+
+def json_target(column, path, lookup: str, value):
+    """
+    The expression a `field__<path...>__<lookup>=value` lookup applies to: the
+    extracted value, compared as a number for range lookups on numbers.
+    """
+    if not path:
+        raise ValueError(f"Lookup '{lookup}' on a JSON field needs a key path (e.g. payload__user__id).")
+    numeric = lookup in _RANGE and isinstance(value, (int, float)) and not isinstance(value, bool)
+    return JSONExtract(column, path, numeric=numeric)
@@ -0,0 +1,306 @@
+# apexorm/models/loader.py
+#
+# Streaming bulk ingest for CSV / JSONL drops. Input is parsed lazily, each row
+# is mapped onto the model's columns and coerced by column type, rows are
+# validated a batch at a time, and every valid batch is inserted with one
+# executemany in its own transaction. No Model instances are built.
+import csv
+import json
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, Integer, String, Time, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from apexorm.connection import SQLITE_PROFILES
+from . import counters
+from .fields import ForeignKeyField
+from .validators import ValidationError
+
+DEFAULT_BATCH_SIZE = 5000
+
+# the "bulk-load" SQLiteDB profile's per-connection settings, applied to the loading
+# connection with bulk_profile=True and restored afterwards (journal_mode is left
+# alone: it is database-wide and can't change while other connections use WAL)
+BULK_LOAD_PRAGMAS = {
+    name: value for name, value in SQLITE_PROFILES["bulk-load"].items()
+    if name in ("synchronous", "cache_size", "temp_store")
+}
+
+_TRUE = {"1", "true", "t", "yes", "y", "on"}
+_FALSE = {"0", "false", "f", "no", "n", "off"}
+
+
+@dataclass
+class RejectedRow:
+    line: int        # 1-based data row number in the input (CSV header not counted)
+    row: dict
+    error: str
+
+
+@dataclass
+class LoadReport:
+    rows_read: int = 0
+    inserted: int = 0
+    rejected_count: int = 0
+    rejected: list[RejectedRow] = field(default_factory=list)   # first `keep_rejected` rejects
+    batches: int = 0
+    duration: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Rows read per second."""
+        return self.rows_read / self.duration if self.duration else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.rows_read} rows read, {self.inserted} inserted, {self.rejected_count} rejected "
+            f"in {self.duration:.2f}s ({self.throughput:,.0f} rows/s)"
+        )
+
+
+# ------------------- parsing -------------------
+@contextmanager
+def _open_source(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            yield f
+    else:
+        yield source
+
+
+def read_csv(f, **fmtparams):
+    yield from csv.DictReader(f, **fmtparams)
+
+
+def read_jsonl(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+# ------------------- coercion -------------------
+def _coerce_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _from_iso(parse):
+    def coerce(value):
+        return parse(value) if isinstance(value, str) else value
+    return coerce
+
+
+def _coerce_json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _coerce_string(length):
+    def coerce(value):
+        value = value if isinstance(value, str) else str(value)
+        if length and len(value) > length:
+            raise ValueError(f"longer than {length} characters")
+        return value
+    return coerce
+
+
+def _coercer_for(column):
+    t = column.type
+    if isinstance(t, Boolean):
+        return _coerce_bool
+    if isinstance(t, Integer):
+        return int
+    if isinstance(t, Float):
+        return float
+    if isinstance(t, DateTime):
+        return _from_iso(datetime.fromisoformat)
+    if isinstance(t, Date):
+        return _from_iso(date.fromisoformat)
+    if isinstance(t, Time):
+        return _from_iso(dt_time.fromisoformat)
+    if isinstance(t, JSON):
+        return _coerce_json
+    if isinstance(t, String):
+        return _coerce_string(t.length)
+    return lambda value: value
+
+
+class RowMapper:
+    """Maps a parsed input row onto column values: rename, coerce, default, validate."""
+
+    def __init__(self, model_class, columns: dict|None = None):
+        table = model_class.__table__
+        self.renames = columns or {}
+        self.columns = {}     # column key -> (coerce, nullable, is an autoincrement primary key)
+        self.fields = {}      # column key -> declared Field (validators, defaults)
+        self.aliases = {}     # FK field name "author" -> "author_id"
+
+        declared = getattr(model_class, "__fields__", {})
+        for name, fld in declared.items():
+            if isinstance(fld, ForeignKeyField):
+                self.aliases[name] = f"{name}_id"
+            elif name in table.c:
+                self.fields[name] = fld
+
+        for column in table.columns:
+            autoincrement = column.primary_key and column.autoincrement in (True, "auto") \
+                and isinstance(column.type, Integer)
+            # left out when missing: the database fills it (autoincrement keys, server defaults like counter caches)
+            generated = autoincrement or column.server_default is not None
+            self.columns[column.key] = (_coercer_for(column), column.nullable, generated)
+
+    def map(self, raw: dict) -> dict:
+        values = {}
+        for key, value in raw.items():
+            key = self.renames.get(key, key)
+            key = self.aliases.get(key, key)
+            if key not in self.columns:
+                continue  # extra input columns are ignored
+            coerce, _nullable, _generated = self.columns[key]
+            if value is None or value == "":
+                values[key] = None
+                continue
+            try:
+                values[key] = coerce(value)
+            except (TypeError, ValueError) as e:
+                raise ValidationError(f"{key}: {e}") from None
+
+        for key, (_coerce, nullable, generated) in self.columns.items():
+            fld = self.fields.get(key)
+            if values.get(key) is None and fld is not None and fld.default is not None:
+                values[key] = fld.get_default_value()
+            value = values.get(key)
+            if value is None:
+                if generated:
+                    values.pop(key, None)  # let the database assign it
+                    continue
+                if not nullable:
+                    raise ValidationError(f"{key}: required")
+                values[key] = None  # every row carries the same keys for executemany
+                continue
+            if fld is not None:
+                fld.validate(value)
+        return values
+
+
+# ------------------- loading -------------------
+@contextmanager
+def _bulk_pragmas(connection, enabled: bool):
+    if not enabled or connection.dialect.name != "sqlite":
+        yield
+        return
+    previous = {
+        name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in BULK_LOAD_PRAGMAS
+    }
+    for name, value in BULK_LOAD_PRAGMAS.items():
+        connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+    connection.commit()  # end the autobegun transaction so batches can begin their own
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+        connection.commit()
+
+
+def load_rows(model_class, session, rows, batch_size: int = DEFAULT_BATCH_SIZE, columns: dict|None = None,
+              bulk_profile: bool = False, progress=None, keep_rejected: int = 1000) -> LoadReport:
+    """
+    Insert parsed rows (dicts) into `model_class`'s table, `batch_size` rows per
+    transaction. Rows that fail coercion/validation, or that the database rejects
+    (unique/FK violations, invalid values), are skipped and reported; everything
+    else is loaded. Other database errors (lost connection, locked database) are raised.
+    `progress(report)` is called after each batch. Rows of a sharded model (pass
+    session=None) go to the shard of their shard key.
+    """
+    mapper = RowMapper(model_class, columns)
+    shards = getattr(model_class, "__shards__", None)
+    statement = insert(model_class.__table__)
+    report = LoadReport()
+    started = time.perf_counter()
+
+    def reject(line, raw, error):
+        report.rejected_count += 1
+        if len(report.rejected) < keep_rejected:
+            report.rejected.append(RejectedRow(line, raw, str(error)))
+
+    def insert_rows(connection, valid):
+        try:
+            with connection.begin():
+                rows = [values for _l, _r, values in valid]
+                connection.execute(statement, rows)
+                counters.after_bulk_insert(connection, model_class, rows)
+            report.inserted += len(valid)
+        except (IntegrityError, DataError) as e:
+            # row-level faults only; connection, locking or disk errors abort the load
+            if len(valid) == 1:
+                line, raw, _values = valid[0]
+                reject(line, raw, getattr(e, "orig", e))
+                return
+            # bisect to isolate the offending rows; the rest of the batch still goes in
+            middle = len(valid) // 2
+            insert_rows(connection, valid[:middle])
+            insert_rows(connection, valid[middle:])
+
+    def flush(connection_for, batch):
+        # rows with and without explicit primary keys go in as separate executemany calls
+        groups = {}
+        for line, raw in batch:
+            try:
+                values = mapper.map(raw)
+                connection = connection_for(values)
+            except (ValidationError, ValueError) as e:   # ValueError: no or unknown shard
+                reject(line, raw, e)
+                continue
+            groups.setdefault((connection, frozenset(values)), []).append((line, raw, values))
+        for (connection, _keys), group in groups.items():
+            insert_rows(connection, group)
+        report.batches += 1
+        report.duration = time.perf_counter() - started
+        if progress:
+            progress(report)
+
+    # dedicated connections (one per shard): pragmas stay in effect for the whole
+    # load, and the session's own transaction is left alone
+    with ExitStack() as stack:
+        connections = {}
+
+        def connection_for(values):
+            name = shards._shard_of(model_class, values.get(model_class.__shard_key__)) if shards else None
+            if name not in connections:
+                bind = shards.engines[name] if shards else session.get_bind()
+                connection = stack.enter_context(bind.connect())
+                stack.enter_context(_bulk_pragmas(connection, bulk_profile))
+                connections[name] = connection
+            return connections[name]
+
+        batch = []
+        for line, raw in enumerate(rows, start=1):
+            batch.append((line, raw))
+            report.rows_read += 1
+            if len(batch) >= batch_size:
+                flush(connection_for, batch)
+                batch = []
+        if batch:
+            flush(connection_for, batch)
+    report.duration = time.perf_counter() - started
+    return report
+
+
+def load_csv(model_class, session, source, batch_size: int = DEFAULT_BATCH_SIZE, **kwargs) -> LoadReport:
+    fmtparams = {k: kwargs.pop(k) for k in ("delimiter", "quotechar", "escapechar") if k in kwargs}
+    with _open_source(source) as f:
+        return load_rows(model_class, session, read_csv(f, **fmtparams), batch_size, **kwargs)
+
+
+def load_jsonl(model_class, session, source, batch_size: int = DEFAULT_BATCH_SIZE, **kwargs) -> LoadReport:
+    with _open_source(source) as f:
+        return load_rows(model_class, session, read_jsonl(f), batch_size, **kwargs)
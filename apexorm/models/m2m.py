@@ -78,6 +78,8 @@ class ManyToManyManager:
             self._session
             .query(related_model)
             .filter(with_parent(self.instance, rel_attr))  # modern API
+            # lets instrumentation attribute these per-instance loads to the relationship
+            .execution_options(apexorm_relationship=(self.instance.__class__, self.private_attr))
         )
         return qs
 
@@ -1,6 +1,7 @@
 # apexorm/models/manager.py
 from sqlalchemy.orm import Session
 from .queryset import QuerySet
+from .raw import RawQuerySet
 
 class Manager:
     def __init__(self, model_class):
@@ -8,12 +9,25 @@ class Manager:
 
     def _get_session(self) -> Session:
         session = getattr(self.model_class, "_session", None)
+        if getattr(self.model_class, "__shards__", None) is not None:
+            raise RuntimeError(f"Model {self.model_class.__name__} is sharded; this needs a single database.")
         if not session:
             raise RuntimeError(f"Model {self.model_class.__name__} is not bound to a database session.")
         return session
 
+    def _session_for(self, values: dict) -> Session:
+        """The session a row with these field values is written through (its shard's, if sharded)."""
+        shards = getattr(self.model_class, "__shards__", None)
+        if shards is not None:
+            return shards.session_for_values(self.model_class, values)
+        return self._get_session()
+
     # Return QuerySet instance
     def all(self):
+        shards = getattr(self.model_class, "__shards__", None)
+        if shards is not None:
+            from .sharding import ShardedQuerySet
+            return ShardedQuerySet(self.model_class, shards)
         return QuerySet(self.model_class, self._get_session())
 
     def filter(self, *args, **kwargs):
@@ -37,9 +51,26 @@ class Manager:
     def exists(self, **kwargs):
         return self.all().filter(**kwargs).exists()
 
-    def search(self, **kwargs):
+    def raw(self, sql: str, params: dict|None = None, translations: dict|None = None, chunk_size: int = 1000,
+            shard: str|None = None):
+        """
+        Model instances from hand-written SQL (see RawQuerySet). SQL can't be routed
+        by shard key, so on a sharded model name the shard to run it on.
+        """
+        shards = getattr(self.model_class, "__shards__", None)
+        if shards is not None:
+            if shard not in shards.sessions:
+                raise ValueError(
+                    f"raw() on sharded model {self.model_class.__name__} needs shard= one of {shards.names}."
+                )
+            session = shards.sessions[shard]
+        else:
+            session = self._get_session()
+        return RawQuerySet(self.model_class, session, sql, params, translations, chunk_size)
+
+    def search(self, query: str|None = None, **kwargs):
         """Shortcut for QuerySet.search()"""
-        return self.all().search(**kwargs)
+        return self.all().search(query, **kwargs)
     
     def exclude(self, *args, **kwargs):
         """Shortcut for QuerySet.exclude()"""
@@ -50,9 +81,113 @@ class Manager:
 
     def prefetch_related(self, *paths):
         return self.all().prefetch_related(*paths)
+
+    def auto_prefetch(self, enabled: bool = True):
+        return self.all().auto_prefetch(enabled)
+
+    def only(self, *fields):
+        return self.all().only(*fields)
     
+    def readonly(self):
+        return self.all().readonly()
+
+    def as_rows(self):
+        return self.all().as_rows()
+
+    def aggregate(self, **aggregates):
+        return self.all().aggregate(**aggregates)
+
     def values(self, *fields):
         return self.all().values(*fields)
 
     def values_list(self, *fields, flat=False):
-        return self.all().values_list(*fields, flat=flat)
\ No newline at end of file
+        return self.all().values_list(*fields, flat=flat)
+
+    def to_csv(self, dest, *fields, **kwargs):
+        return self.all().to_csv(dest, *fields, **kwargs)
+
+    def to_jsonl(self, dest, *fields, **kwargs):
+        return self.all().to_jsonl(dest, *fields, **kwargs)
+
+    def to_columns(self, *fields, **kwargs):
+        return self.all().to_columns(*fields, **kwargs)
+
+    # ----- upserts -----
+    def update_or_create(self, defaults: dict|None = None, **lookup):
+        """
+        Insert or update in one INSERT ... ON CONFLICT / ON DUPLICATE KEY statement.
+        `lookup` must match a unique constraint. Returns (obj, created).
+        """
+        from .upsert import update_or_create
+        session = self._session_for({**(defaults or {}), **lookup})
+        return update_or_create(self.model_class, session, defaults, **lookup)
+
+    def get_or_create(self, defaults: dict|None = None, expect_hit: bool = False, **lookup):
+        """
+        Race-safe get-or-insert; usually one round trip. Pass expect_hit=True when
+        the row usually exists to SELECT first. Returns (obj, created).
+        """
+        from .upsert import get_or_create
+        session = self._session_for({**(defaults or {}), **lookup})
+        return get_or_create(self.model_class, session, defaults, expect_hit, **lookup)
+
+    def bulk_upsert(self, objs, conflict_fields: list[str]|None = None, update_fields: list[str]|None = None,
+                    batch_size: int = 1000):
+        """
+        Upsert model instances or dicts, `batch_size` rows per statement and transaction.
+        The conflict target defaults to the model's unique=True field (else the primary key);
+        update_fields defaults to every other provided field. Returns UpsertResult(created, updated);
+        with update_fields=[] existing rows are left alone and counted in .unchanged.
+        On a sharded model each row goes to the shard of its shard key.
+        """
+        from .upsert import UpsertResult, bulk_upsert
+        shards = getattr(self.model_class, "__shards__", None)
+        if shards is None:
+            return bulk_upsert(self.model_class, self._get_session(), objs, conflict_fields, update_fields, batch_size)
+        result = UpsertResult()
+        for name, part in shards.split(self.model_class, objs).items():
+            counts = bulk_upsert(self.model_class, shards.sessions[name], part, conflict_fields, update_fields,
+                                 batch_size)
+            result.created += counts.created
+            result.updated += counts.updated
+            result.unchanged += counts.unchanged
+        return result
+
+    # ----- counter caches -----
+    def recount(self) -> int:
+        """
+        Recompute this model's counter_cache columns from the referencing rows,
+        e.g. after writes that bypassed the ORM. Returns the number of rows corrected.
+        """
+        caches = self.model_class.__dict__.get("__counted_by__", [])
+        if not caches:
+            raise ValueError(f"{self.model_class.__name__} has no counter_cache columns (declared and migrated).")
+        session = self._get_session()
+        try:
+            fixed = sum(cache.recount(session.connection()) for cache in caches)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return fixed
+
+    # ----- bulk ingest -----
+    def load_csv(self, source, batch_size: int = 5000, **kwargs):
+        """
+        Stream a CSV file (path or text file with a header row) into the table.
+        See loader.load_rows for columns=, bulk_profile=, progress=, keep_rejected=.
+        Returns a LoadReport.
+        """
+        from .loader import load_csv
+        return load_csv(self.model_class, self._load_session(), source, batch_size, **kwargs)
+
+    def load_jsonl(self, source, batch_size: int = 5000, **kwargs):
+        """Like load_csv(), one JSON object per line."""
+        from .loader import load_jsonl
+        return load_jsonl(self.model_class, self._load_session(), source, batch_size, **kwargs)
+
+    def _load_session(self) -> Session|None:
+        # sharded models: the loader routes every row by its shard key
+        if getattr(self.model_class, "__shards__", None) is not None:
+            return None
+        return self._get_session()
@@ -0,0 +1,150 @@
+# apexorm/models/prefetch.py
+#
+# Prefetch objects: prefetch_related() with a QuerySet of your own for the
+# related rows, and an optional per-parent limit:
+#
+#     Author.objects.prefetch_related(
+#         Prefetch("books", queryset=Book.objects.filter(published=True).order_by("-year").only("title"),
+#                  to_attr="latest_books", limit=3),
+#     )
+#
+# One query per relationship (per 500 parents), like selectinload. With a limit,
+# ROW_NUMBER() OVER (PARTITION BY <parent key> ORDER BY <queryset ordering>)
+# picks each parent's first rows in the database, so only those are sent.
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+OPTION = "apexorm_prefetch"   # execution option carrying a QuerySet's Prefetch objects
+CHUNK_SIZE = 500
+
+
+class Prefetch:
+    """
+    path:     relationship to load, "books" or nested "books__tags" (earlier hops load normally)
+    queryset: QuerySet of the related model: filters, order_by(), only() (default: all rows)
+    to_attr:  store the list (or object) on this attribute instead of the relationship
+    limit:    at most this many related rows per parent, first by the queryset's ordering
+    """
+    def __init__(self, path: str, queryset=None, to_attr: str|None = None, limit: int|None = None):
+        if limit is not None and limit < 1:
+            raise ValueError("Prefetch limit must be a positive integer.")
+        self.path = path
+        self.queryset = queryset
+        self.to_attr = to_attr
+        self.limit = limit
+
+    def __repr__(self):
+        return f"<Prefetch {self.path!r} to_attr={self.to_attr!r} limit={self.limit!r}>"
+
+    def leading_loaders(self, model_class):
+        """selectinload() for the hops before the last one, or None for a single hop."""
+        from .queryset import _resolve_attr_chain
+
+        attrs, _kinds = _resolve_attr_chain(model_class, self.path)
+        if len(attrs) == 1:
+            return None
+        loader = selectinload(attrs[0])
+        for attr in attrs[1:-1]:
+            loader = loader.selectinload(attr)
+        return loader
+
+
+def prefetch_objects(query) -> tuple:
+    return query.get_execution_options().get(OPTION, ())
+
+
+def apply(objs, model_class, session, lookups):
+    """Load each Prefetch for `objs` (instances of model_class loaded in `session`)."""
+    for lookup in lookups:
+        _apply_one(list(objs), model_class, session, lookup)
+
+
+def _apply_one(objs, model_class, session, lookup: Prefetch):
+    from .queryset import QuerySet, _resolve_attr_chain
+
+    attrs, kinds = _resolve_attr_chain(model_class, lookup.path)
+    parents = objs
+    for attr, kind in zip(attrs[:-1], kinds[:-1]):   # already loaded by leading_loaders()
+        found = []
+        for parent in parents:
+            value = getattr(parent, attr.key)
+            found.extend(value if kind == "collection" else [value] if value is not None else [])
+        parents = list({id(p): p for p in found}.values())
+    if not parents:
+        return
+
+    prop = attrs[-1].property
+    target = prop.mapper.class_
+    queryset = lookup.queryset if lookup.queryset is not None else QuerySet(target, session)
+    if queryset.model_class is not target:
+        raise ValueError(f"Prefetch('{lookup.path}') needs a {target.__name__} queryset, "
+                         f"got {queryset.model_class.__name__}")
+    if lookup.limit is not None and not prop.uselist:
+        raise ValueError(f"Prefetch('{lookup.path}'): limit only applies to collections.")
+
+    if prop.secondary is not None:
+        (parent_col, key), = prop.synchronize_pairs
+        (target_col, secondary_col), = prop.secondary_synchronize_pairs
+        join = (prop.secondary, secondary_col == target_col)
+    else:
+        pairs = prop.local_remote_pairs
+        if len(pairs) != 1:
+            raise ValueError(f"Prefetch('{lookup.path}') needs a single-column relationship.")
+        (parent_col, key), = pairs
+        join = None
+
+    query = queryset.query.with_session(session)
+    related = {}
+    keys = list({getattr(p, parent_col.key) for p in parents} - {None})
+    for start in range(0, len(keys), CHUNK_SIZE):
+        chunk = keys[start:start + CHUNK_SIZE]
+        for obj, key_value in _fetch(query, queryset._ordering, target, key, join, chunk, lookup.limit):
+            related.setdefault(key_value, []).append(obj)
+
+    nested = prefetch_objects(query)
+    if nested:
+        loaded = {id(obj): obj for rows in related.values() for obj in rows}
+        apply(loaded.values(), target, session, nested)
+
+    for parent in parents:
+        found = related.get(getattr(parent, parent_col.key), [])
+        value = found if prop.uselist else (found[0] if found else None)
+        if lookup.to_attr:
+            setattr(parent, lookup.to_attr, value)
+        else:
+            set_committed_value(parent, prop.key, value)
+
+
+def _fetch(query, ordering: tuple, target, key, join, key_values, limit):
+    """
+    (related object, parent key) rows for one chunk of parent keys.
+    `ordering` holds the queryset's order_by() fields, which rank rows for the limit.
+    """
+    from .queryset import order_columns
+
+    def narrowed(q):
+        if join is not None:
+            q = q.join(*join)
+        return q.filter(key.in_(key_values))
+
+    if limit is None:
+        return narrowed(query).add_columns(key).all()
+
+    # rank each parent's rows in a subquery; the outer query keeps the queryset's only()/options
+    pk = list(target.__table__.primary_key.columns)
+    if len(pk) != 1:
+        raise ValueError(f"Prefetch with a limit needs a single-column primary key on {target.__name__}.")
+    pk_col = getattr(target, pk[0].key)
+    rank = func.row_number().over(partition_by=key, order_by=order_columns(target, ordering) or [pk_col])
+    ranked = narrowed(query.order_by(None)).with_entities(
+        pk_col.label("pk"), key.label("parent_key"), rank.label("rank"),
+    ).subquery()
+    return (
+        query.join(ranked, ranked.c.pk == pk_col)
+        .filter(ranked.c.rank <= limit)
+        .add_columns(ranked.c.parent_key)
+        .order_by(None)
+        .order_by(ranked.c.parent_key, ranked.c.rank)
+        .all()
+    )
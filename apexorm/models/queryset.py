@@ -1,7 +1,11 @@
 # apexorm/models/queryset.py
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, not_
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from . import autoprefetch, jsonpath, prefetch, rows
+from .aggregates import aggregate_columns, merge_aggregates
+from .prefetch import Prefetch
+from .search import SearchIndex, ilike_condition, words as search_words
 
 
 class _ListWithAll(list):
@@ -80,6 +84,54 @@ def _resolve_attr_chain(model_cls, path: str):
     return attrs, kinds
 
 
+_LOOKUPS = {
+    "eq", "lt", "lte", "gt", "gte", "in", "notin", "have", "contains",
+    "startswith", "istartswith", "endswith", "iendswith", "has_key",
+}
+
+_SEARCH_LOOKUPS = {"have", "contains", "startswith", "istartswith", "endswith", "iendswith"}
+
+def _apply_lookup(col, lookup: str, value):
+    if lookup == "eq":
+        return col == value
+    elif lookup == "lt":
+        return col < value
+    elif lookup == "lte":
+        return col <= value
+    elif lookup == "gt":
+        return col > value
+    elif lookup == "gte":
+        return col >= value
+    elif lookup == "in":
+        return col.in_(value)
+    elif lookup == "notin":
+        return ~col.in_(value)
+    elif lookup in ("have", "contains"):
+        return col.ilike(f"%{value}%")
+    elif lookup in ("startswith", "istartswith"):
+        return col.ilike(f"{value}%")
+    elif lookup in ("endswith", "iendswith"):
+        return col.ilike(f"%{value}")
+    raise ValueError(f"Unsupported lookup: {lookup}")
+
+def _lookup_condition(model_class, key: str, value):
+    """
+    SQL condition for one keyword lookup: "field", "field__<lookup>", or on a
+    JSONField "field__<key>__<key>...__<lookup>" (see jsonpath).
+    """
+    field_name, *rest = key.split("__")
+    col = getattr(model_class, field_name)
+    if rest and jsonpath.is_json_column(col):
+        lookup = rest[-1] if rest[-1] in _LOOKUPS else "eq"
+        path = rest[:-1] if rest[-1] in _LOOKUPS else rest
+        if lookup == "has_key":
+            return jsonpath.JSONHasKey(col, path, value)
+        col = jsonpath.json_target(col, path, lookup, value)
+    else:
+        lookup = rest[0] if rest else "eq"
+    return _apply_lookup(col, lookup, value)
+
+
 class Q:
     """Django-like Q object for complex filtering."""
     def __init__(self, **kwargs):
@@ -117,33 +169,7 @@ class Q:
                 conditions.append(~condition if child.negated else condition)
             elif isinstance(child, dict):
                 for key, value in child.items():
-                    parts = key.split("__")
-                    field_name = parts[0]
-                    lookup = parts[1] if len(parts) > 1 else "eq"
-                    col = getattr(model_class, field_name)
-
-                    if lookup == "eq":
-                        conditions.append(col == value)
-                    elif lookup == "lt":
-                        conditions.append(col < value)
-                    elif lookup == "lte":
-                        conditions.append(col <= value)
-                    elif lookup == "gt":
-                        conditions.append(col > value)
-                    elif lookup == "gte":
-                        conditions.append(col >= value)
-                    elif lookup == "in":
-                        conditions.append(col.in_(value))
-                    elif lookup == "notin":
-                        conditions.append(~col.in_(value))
-                    elif lookup in ("have", "contains"):
-                        conditions.append(col.ilike(f"%{value}%"))
-                    elif lookup in ("startswith", "istartswith"):
-                        conditions.append(col.ilike(f"{value}%"))
-                    elif lookup in ("endswith", "iendswith"):
-                        conditions.append(col.ilike(f"%{value}"))
-                    else:
-                        raise ValueError(f"Unsupported lookup: {lookup}")
+                    conditions.append(_lookup_condition(model_class, key, value))
             else:
                 raise ValueError(f"Invalid Q child type: {type(child)}")
 
@@ -160,11 +186,42 @@ class Q:
         return f"<Q negated={self.negated} children={self.children}>"
 
 
+def order_columns(model_class, fields, explicit_nulls: bool = False) -> list:
+    """
+    ORDER BY clauses for order_by() fields ("title", "-year"). With explicit_nulls,
+    NULLs sort first ascending and last descending on every database (Postgres
+    defaults to the opposite).
+    """
+    columns = []
+    for field in fields:
+        if field.startswith('-'):
+            column = getattr(model_class, field[1:]).desc()
+            columns.append(column.nulls_last() if explicit_nulls else column)
+        else:
+            column = getattr(model_class, field).asc()
+            columns.append(column.nulls_first() if explicit_nulls else column)
+    return columns
+
+
 class QuerySet:
     def __init__(self, model_class, session: Session):
         self.model_class = model_class
         self.session = session
         self.query = session.query(model_class)
+        self._ordering = ()   # order_by() fields, e.g. ("-year", "title")
+
+    def _clone(self):
+        """A new QuerySet of the same kind; the caller sets its .query."""
+        qs = QuerySet(self.model_class, self.session)
+        qs._ordering = self._ordering
+        return qs
+
+    def using(self, session: Session):
+        """The same query, evaluated in another session (see ApexORM.gather)."""
+        qs = QuerySet(self.model_class, session)
+        qs.query = self.query.with_session(session)
+        qs._ordering = self._ordering
+        return qs
 
     # ------------------- FILTERING -------------------
     def filter(self, *args, **kwargs):
@@ -183,37 +240,10 @@ class QuerySet:
                 raise TypeError(f"Invalid argument {q}, expected Q object")
 
         # Handle regular kwargs
-        if kwargs:
-            for key, value in kwargs.items():
-                parts = key.split("__")
-                field_name = parts[0]
-                lookup = parts[1] if len(parts) > 1 else "eq"
-                col = getattr(self.model_class, field_name)
-
-                if lookup == "eq":
-                    conditions.append(col == value)
-                elif lookup == "lt":
-                    conditions.append(col < value)
-                elif lookup == "lte":
-                    conditions.append(col <= value)
-                elif lookup == "gt":
-                    conditions.append(col > value)
-                elif lookup == "gte":
-                    conditions.append(col >= value)
-                elif lookup == "in":
-                    conditions.append(col.in_(value))
-                elif lookup == "notin":
-                    conditions.append(~col.in_(value))
-                elif lookup in ("have", "contains"):
-                    conditions.append(col.ilike(f"%{value}%"))
-                elif lookup in ("startswith", "istartswith"):
-                    conditions.append(col.ilike(f"{value}%"))
-                elif lookup in ("endswith", "iendswith"):
-                    conditions.append(col.ilike(f"%{value}"))
-                else:
-                    raise ValueError(f"Unsupported lookup: {lookup}")
-
-        new_qs = QuerySet(self.model_class, self.session)
+        for key, value in kwargs.items():
+            conditions.append(_lookup_condition(self.model_class, key, value))
+
+        new_qs = self._clone()
         if conditions:
             new_qs.query = self.query.filter(and_(*conditions))
         else:
@@ -221,66 +251,120 @@ class QuerySet:
         return new_qs
 
     # ------------------- SEARCH -------------------
-    def search(self, **kwargs):
+    def search(self, query: str|None = None, **kwargs):
         """
         Perform OR-based string search across multiple fields.
         Example:
             User.objects.search(name__have='joe', description__have='dev')
+            Book.objects.search("dune herbert")   # every word, in any of Meta.search_fields
+
+        search("...") needs Meta.search_fields: when the database supports it the
+        full-text index is used and results come best match first, words matching
+        as prefixes; elsewhere every word is an ILIKE over the search fields.
+        Field lookups keep their ILIKE semantics (substrings, anchored prefixes)
+        and scan the table.
         """
-        or_conditions = []
+        if query is not None and kwargs:
+            raise TypeError("search() takes a query string or field lookups, not both.")
+        index = SearchIndex.for_model(self.model_class)
+        dialect_name = self.session.get_bind().dialect.name
+
+        if query is not None:
+            query_words = search_words(query)
+            if index is None:
+                raise ValueError(f"search('...') needs Meta.search_fields on {self.model_class.__name__}.")
+            if not query_words:
+                # no words would match every row (and build an empty AND)
+                raise ValueError(f"search() needs at least one word to look for, got {query!r}.")
+            new_qs = self._clone()
+            if index.supports(dialect_name):
+                new_qs.query = index.apply(self.query, self.model_class, dialect_name, query_words)
+            else:
+                new_qs.query = self.query.filter(ilike_condition(self.model_class, index.fields, query_words))
+            return new_qs
 
+        conditions = []
         for key, value in kwargs.items():
-            parts = key.split("__")
-            field_name = parts[0]
-            lookup = parts[1] if len(parts) > 1 else "have"
-            col = getattr(self.model_class, field_name)
-
-            if lookup in ("have", "contains"):
-                or_conditions.append(col.ilike(f"%{value}%"))
-            elif lookup in ("startswith", "istartswith"):
-                or_conditions.append(col.ilike(f"{value}%"))
-            elif lookup in ("endswith", "iendswith"):
-                or_conditions.append(col.ilike(f"%{value}"))
-            else:
+            field_name, _, lookup = key.partition("__")
+            lookup = lookup or "have"
+            if lookup not in _SEARCH_LOOKUPS:
                 raise ValueError(f"Unsupported search lookup: {lookup}")
-
-        new_qs = QuerySet(self.model_class, self.session)
-        new_qs.query = self.query.filter(or_(*or_conditions))
+            conditions.append(_apply_lookup(getattr(self.model_class, field_name), lookup, value))
+        new_qs = self._clone()
+        new_qs.query = self.query.filter(or_(*conditions))
         return new_qs
 
     # --- ordering ---
     def order_by(self, *fields):
-        columns = []
-        for field in fields:
-            if field.startswith('-'):
-                columns.append(getattr(self.model_class, field[1:]).desc())
-            else:
-                columns.append(getattr(self.model_class, field).asc())
-        new_qs = QuerySet(self.model_class, self.session)
-        new_qs.query = self.query.order_by(*columns)
+        new_qs = self._clone()
+        new_qs.query = self.query.order_by(*order_columns(self.model_class, fields))
+        new_qs._ordering = self._ordering + fields
         return new_qs
 
     # --- slicing ---
     def limit(self, n):
-        new_qs = QuerySet(self.model_class, self.session)
+        new_qs = self._clone()
         new_qs.query = self.query.limit(n)
         return new_qs
 
     def offset(self, n):
-        new_qs = QuerySet(self.model_class, self.session)
+        new_qs = self._clone()
         new_qs.query = self.query.offset(n)
         return new_qs
 
+    # --- auto-prefetch ---
+    def auto_prefetch(self, enabled: bool = True):
+        """
+        Batch lazy loads across the result set: the first access to a relationship
+        on any returned instance loads it for all of them in one IN query.
+        Overrides the ORM-wide `ApexORM(..., auto_prefetch=...)` default.
+        """
+        new_qs = self._clone()
+        new_qs.query = self.query.execution_options(**{autoprefetch.OPTION: enabled})
+        return new_qs
+
+    # --- read-only rows ---
+    def readonly(self, enabled: bool = True):
+        """
+        Return compact read-only row objects instead of model instances: same
+        column attribute names (FKs as author_id), no session tracking, no
+        relationship loading. For large results that are only read.
+        """
+        new_qs = self._clone()
+        new_qs.query = self.query.execution_options(**{rows.OPTION: enabled})
+        return new_qs
+
+    def as_rows(self):
+        """Shortcut for readonly().all()."""
+        return self.readonly().all()
+
     # --- retrieval ---
     def all(self):
         # return a list-like object that also supports .values(), .values_list()
-        return _ResultList(self.query.all(), self.model_class)
+        if rows.is_readonly(self.query):
+            return _ResultList(rows.fetch(self.query, self.model_class), self.model_class)
+        results = self.query.all()
+        if autoprefetch.is_enabled(self.query, self.session):
+            autoprefetch.link_siblings(results)
+        self._prefetch(results)
+        return _ResultList(results, self.model_class)
+
+    def _prefetch(self, results):
+        lookups = prefetch.prefetch_objects(self.query)
+        if lookups and results:
+            prefetch.apply(results, self.model_class, self.session, lookups)
 
     def first(self):
-        return self.query.first()
+        if rows.is_readonly(self.query):
+            found = rows.fetch(self.query.limit(1), self.model_class)
+            return found[0] if found else None
+        obj = self.query.first()
+        if obj is not None:
+            self._prefetch([obj])
+        return obj
 
     def last(self):
-        return self.query.order_by(self.model_class.id.desc()).first()
+        return self.order_by("-id").first()
 
     def count(self):
         return self.query.count()
@@ -289,27 +373,30 @@ class QuerySet:
         return self.query.first() is not None
 
     def get(self, **kwargs):
-        results = self.query.filter_by(**kwargs).all()
+        query = self.query.filter_by(**kwargs)
+        readonly = rows.is_readonly(query)
+        results = rows.fetch(query, self.model_class) if readonly else query.all()
         if len(results) == 0:
             raise ValueError(f"{self.model_class.__name__} matching {kwargs} does not exist.")
         elif len(results) > 1:
             raise ValueError(f"Multiple {self.model_class.__name__} objects returned for {kwargs}.")
+        if not readonly:
+            self._prefetch(results)
         return results[0]
-    
+
+    # --- aggregates ---
+    def aggregate(self, **aggregates):
+        """
+        Book.objects.filter(...).aggregate(total=Sum("price"), cheapest=Min("price"))
+        -> {"total": ..., "cheapest": ...}, computed in one SELECT.
+        """
+        columns, spans = aggregate_columns(self.model_class, aggregates)
+        row = self.query.order_by(None).with_entities(*columns).one()
+        return merge_aggregates(aggregates, spans, [tuple(row)])
+
     def exclude(self, **kwargs):
-        conditions = []
-        for key, value in kwargs.items():
-            parts = key.split("__")
-            field_name = parts[0]
-            lookup = parts[1] if len(parts) > 1 else "eq"
-            col = getattr(self.model_class, field_name)
-
-            if lookup == "eq":
-                conditions.append(col == value)
-            elif lookup == "lt":
-                conditions.append(col < value)
-            # (reuse same logic)
-        new_qs = QuerySet(self.model_class, self.session)
+        conditions = [_lookup_condition(self.model_class, key, value) for key, value in kwargs.items()]
+        new_qs = self._clone()
         new_qs.query = self.query.filter(~and_(*conditions))
         return new_qs
     
@@ -366,17 +453,25 @@ class QuerySet:
                 loader = loader.joinedload(attr)
             loaders.append(loader)
 
-        new_qs = QuerySet(self.model_class, self.session)
+        new_qs = self._clone()
         new_qs.query = self.query.options(*loaders)
         return new_qs
 
     def prefetch_related(self, *paths):
         """
         Eager SELECT IN load for collections (O2M, M2M), also works for FK/O2O.
-        Nested paths allowed: "author__groups".
+        Nested paths allowed: "author__groups". A Prefetch("books", queryset=...,
+        to_attr=..., limit=...) loads a filtered/ordered/limited subset instead.
         """
         loaders = []
+        lookups = []
         for path in paths:
+            if isinstance(path, Prefetch):
+                lookups.append(path)
+                leading = path.leading_loaders(self.model_class)
+                if leading is not None:
+                    loaders.append(leading)
+                continue
             attrs, _kinds = _resolve_attr_chain(self.model_class, path)
 
             # build chained selectinload
@@ -385,10 +480,66 @@ class QuerySet:
                 loader = loader.selectinload(attr)
             loaders.append(loader)
 
-        new_qs = QuerySet(self.model_class, self.session)
+        new_qs = self._clone()
         new_qs.query = self.query.options(*loaders)
+        if lookups:
+            lookups = prefetch.prefetch_objects(self.query) + tuple(lookups)
+            new_qs.query = new_qs.query.execution_options(**{prefetch.OPTION: lookups})
+        return new_qs
+
+    def only(self, *fields):
+        """
+        Load just these columns (and the primary key); the others load on first access.
+        FK fields may be named by relation ("author") or column ("author_id").
+        """
+        columns = []
+        for field in fields:
+            name = field if field in self.model_class.__table__.c else f"{field}_id"
+            if name not in self.model_class.__table__.c:
+                raise AttributeError(f"{self.model_class.__name__} has no column '{field}'")
+            columns.append(getattr(self.model_class, name))
+        new_qs = self._clone()
+        new_qs.query = self.query.options(load_only(*columns))
         return new_qs
 
+    # --- streaming export ---
+    def to_csv(self, dest, *fields, chunk_size: int = 2000, header: bool = True, **fmtparams) -> int:
+        """
+        Write the selected fields (default: all columns) as CSV to a path or text
+        file, fetching `chunk_size` rows at a time. Returns the number of rows.
+        """
+        from .export import to_csv
+        return to_csv(self, dest, fields, chunk_size=chunk_size, header=header, **fmtparams)
+
+    def to_jsonl(self, dest, *fields, chunk_size: int = 2000) -> int:
+        """Like to_csv(), one JSON object per line."""
+        from .export import to_jsonl
+        return to_jsonl(self, dest, fields, chunk_size=chunk_size)
+
+    def _column_chunks(self, columns, chunk_size: int):
+        """Row tuples of `columns` in chunks, for the exports above and to_columns()."""
+        from .export import stream_columns
+        return stream_columns(self.query, self.session, columns, chunk_size)
+
+    def to_columns(self, *fields, chunk_size: int = 2000, numpy: bool|None = None) -> dict:
+        """
+        Fetch the selected fields (default: all columns) into one ColumnArray per
+        field: typed array.array buffers for integer/float/boolean fields, NumPy
+        arrays when NumPy is installed (numpy=None) or requested (numpy=True).
+        """
+        from .columns import to_columns
+        return to_columns(self, fields, chunk_size=chunk_size, use_numpy=numpy)
+
+    # --- diagnostics ---
+    def explain(self, analyze: bool = False):
+        """
+        Run the database's EXPLAIN for this QuerySet and return an ExplainResult
+        flagging full table scans, temp B-trees for ORDER BY, unused indexes and
+        lookups that can't use an index. analyze=True also executes the query.
+        """
+        from .explain import explain_query
+        return explain_query(self.query, self.session, analyze=analyze)
+
     # --- iteration magic ---
     def __iter__(self):
         return iter(self.all())
@@ -0,0 +1,113 @@
+# apexorm/models/raw.py
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+class RawQuerySet:
+    """
+    Model instances hydrated from hand-written SQL:
+
+        Book.objects.raw(
+            "WITH ranked AS (SELECT *, rank() OVER (ORDER BY sales DESC) AS sales_rank FROM book) "
+            "SELECT id, title, sales_rank FROM ranked WHERE sales_rank <= :n",
+            {"n": 10},
+        )
+
+    Result columns are matched to fields by name (`translations` maps SQL column
+    names to field names first; FK fields accept "author" for "author_id"). The
+    primary key must be selected. Fields the SQL didn't select stay deferred and
+    are loaded on first access; columns that aren't fields (computed values)
+    become plain attributes, and must not reuse the name of an existing attribute
+    or method. Rows are fetched and hydrated `chunk_size` at a time
+    while iterating.
+    """
+    def __init__(self, model_class, session, sql: str, params: dict|None = None,
+                 translations: dict|None = None, chunk_size: int = 1000):
+        self.model_class = model_class
+        self.session = session
+        self.sql = sql
+        self.params = params or {}
+        self.translations = translations or {}
+        self.chunk_size = chunk_size
+
+    # ------------------- iteration -------------------
+    def iterator(self, chunk_size: int|None = None):
+        result = self.session.execute(
+            text(self.sql), self.params, execution_options={"stream_results": True}
+        )
+        fields, extras = self._map_columns(list(result.keys()))
+        for chunk in result.partitions(chunk_size or self.chunk_size):
+            for row in chunk:
+                yield self._hydrate(row, fields, extras)
+
+    def __iter__(self):
+        return self.iterator()
+
+    def all(self):
+        from .queryset import _ResultList
+        return _ResultList(self.iterator(), self.model_class)
+
+    def __getitem__(self, idx):
+        return self.all()[idx]
+
+    def __repr__(self):
+        return f"<RawQuerySet model={self.model_class.__name__} sql={self.sql!r}>"
+
+    # ------------------- hydration -------------------
+    def _map_columns(self, keys: list[str]):
+        """
+        Returns ([(row index, attribute key, result processor)], [(row index, name)])
+        for model columns and extra (non-field) columns respectively.
+        """
+        table = self.model_class.__table__
+        dialect = self.session.get_bind().dialect
+        fields, extras = [], []
+        for i, key in enumerate(keys):
+            name = self.translations.get(key, key)
+            if name not in table.c and f"{name}_id" in table.c:
+                name = f"{name}_id"
+            if name in table.c:
+                column = table.c[name]
+                processor = column.type.dialect_impl(dialect).result_processor(dialect, None)
+                fields.append((i, column.key, processor))
+            elif hasattr(self.model_class, name):
+                # a method, relationship or other attribute; overwriting it would break the instance
+                raise ValueError(
+                    f"Raw query column '{key}' clashes with {self.model_class.__name__}.{name}; "
+                    f"alias it in the SQL or map it with translations."
+                )
+            else:
+                extras.append((i, name))
+
+        pk_keys = {c.key for c in table.primary_key.columns}
+        if not pk_keys <= {key for _i, key, _p in fields}:
+            raise ValueError(
+                f"Raw query for {self.model_class.__name__} must select the primary key "
+                f"({', '.join(sorted(pk_keys))})."
+            )
+        return fields, extras
+
+    def _hydrate(self, row, fields, extras):
+        mapper = inspect(self.model_class)
+        values = {key: (processor(row[i]) if processor else row[i]) for i, key, processor in fields}
+        identity = mapper.identity_key_from_primary_key([values[c.key] for c in mapper.primary_key])
+
+        obj = self.session.identity_map.get(identity)
+        if obj is None:
+            obj = mapper.class_manager.new_instance()
+            for key, value in values.items():
+                set_committed_value(obj, key, value)
+            # unloaded columns become deferred: loaded by primary key on first access
+            make_transient_to_detached(obj)
+            self.session.add(obj)
+        else:
+            # keep the session's copy; only fill in attributes it hasn't loaded
+            unloaded = inspect(obj).unloaded
+            for key, value in values.items():
+                if key in unloaded:
+                    set_committed_value(obj, key, value)
+
+        for i, name in extras:
+            setattr(obj, name, row[i])
+        return obj
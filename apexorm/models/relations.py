@@ -1,7 +1,7 @@
 # apexorm/models/relations.py
 import re
 from typing import Dict, List, Tuple
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, ForeignKey
 from sqlalchemy.orm import relationship
 
 
@@ -21,6 +21,9 @@ PENDING_BACKREFS: List[Tuple[str, str, str, str, bool, str]] = []
 
 M2M_ASSOC_TABLES: Dict[str, Table] = {}  # key = "<left>_<attr>"
 
+PENDING_COUNTERS: List[Tuple[str, str, str, str]] = []
+# (target_class_name, counter_column, source_class_name, fk_column) from counter_cache=...
+
 def register_model(cls):
     MODEL_REGISTRY[fqcn_from_cls(cls)] = cls
 
@@ -40,8 +43,11 @@ def ensure_m2m_table(metadata, left_cls, left_attr: str, right_cls):
     assoc = Table(
         table_name,
         metadata,
-        Column(f"{left_table}_id", Integer, ForeignKey(f"{left_table}.id"), primary_key=True),
-        Column(f"{right_table}_id", Integer, ForeignKey(f"{right_table}.id"), primary_key=True),
+        # column types follow the referenced primary keys
+        Column(f"{left_table}_id", left_cls.__table__.c.id.type, ForeignKey(f"{left_table}.id"), primary_key=True),
+        # the composite PK serves left-side lookups; reverse lookups need their own index
+        Column(f"{right_table}_id", right_cls.__table__.c.id.type, ForeignKey(f"{right_table}.id"),
+               primary_key=True, index=True),
     )
     M2M_ASSOC_TABLES[key] = assoc
     return assoc
@@ -98,8 +104,8 @@ def finalize_backrefs(Base):
                     )
 
                 # Map public -> private so prefetch/select_related can resolve paths
-                if not hasattr(target_cls, "__m2m_private_map__"):
-                    target_cls.__m2m_private_map__ = {}
+                if "__m2m_private_map__" not in target_cls.__dict__:
+                    target_cls.__m2m_private_map__ = dict(target_cls.__m2m_private_map__)
                 target_cls.__m2m_private_map__[related_attr] = back_private
 
                 # Expose the public descriptor (User.groups)
@@ -108,3 +114,11 @@ def finalize_backrefs(Base):
                     setattr(target_cls, related_attr, ManyToManyDescriptor(back_private))
 
     PENDING_BACKREFS.clear()
+
+    from .counters import attach
+    for target_name, column, source_name, fk_key in list(PENDING_COUNTERS):
+        target_cls = MODEL_REGISTRY.get(target_name)
+        source_cls = MODEL_REGISTRY.get(source_name)
+        if target_cls and source_cls:
+            attach(source_cls, fk_key, target_cls, column)
+            PENDING_COUNTERS.remove((target_name, column, source_name, fk_key))
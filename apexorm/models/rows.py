@@ -0,0 +1,47 @@
+# apexorm/models/rows.py
+#
+# Read-only rows: QuerySet.readonly() returns compact objects instead of model
+# instances, for list endpoints that only read:
+#
+#     for book in Book.objects.filter(published=True).readonly():
+#         book.title, book.author_id        # same attribute names, FK ids as plain values
+#
+# Rows are fetched as column tuples and wrapped in a frozen __slots__ class
+# generated once per model (BookRow). Nothing is added to the session: no
+# identity map entry, no change tracking, no lazy loading; a fraction of the
+# memory and hydration time of mapped instances.
+from dataclasses import asdict, make_dataclass
+from itertools import starmap
+
+OPTION = "apexorm_readonly"   # execution option set by QuerySet.readonly()
+
+
+def is_readonly(query) -> bool:
+    return query.get_execution_options().get(OPTION, False)
+
+
+def row_class(model_class):
+    """The row class of model_class: one slot per column attribute, in table order."""
+    cls = model_class.__dict__.get("__row_class__")
+    if cls is None:
+        names = [attr.key for attr in model_class.__mapper__.column_attrs]
+        cls = make_dataclass(
+            f"{model_class.__name__}Row", names,
+            namespace={"__model__": model_class, "__getattr__": _missing, "to_dict": asdict},
+            frozen=True, slots=True, module=model_class.__module__,
+        )
+        model_class.__row_class__ = cls
+    return cls
+
+
+def _missing(row, name):
+    # only reached for names that are not columns, e.g. relationships
+    hint = f"; use {name}_id" if f"{name}_id" in row.__slots__ else ""
+    raise AttributeError(f"{type(row).__name__} has no attribute '{name}' (read-only rows hold column values{hint})")
+
+
+def fetch(query, model_class) -> list:
+    """Run `query` for column tuples and wrap each in the model's row class."""
+    cls = row_class(model_class)
+    columns = [getattr(model_class, name) for name in cls.__slots__]
+    return list(starmap(cls, query.with_entities(*columns)))
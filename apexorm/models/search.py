@@ -0,0 +1,171 @@
+# apexorm/models/search.py
+#
+# Full-text search declared per model:
+#
+#     class Book(Model):
+#         ...
+#         class Meta:
+#             search_fields = ["title", "blurb"]
+#             search_config = "english"      # Postgres text search configuration
+#
+# migrate() creates the index, and QuerySet.search() queries it, best match first:
+#
+# - SQLite:   an FTS5 table (<table>_fts) over the model's table, kept in sync by
+#             AFTER INSERT/UPDATE/DELETE triggers, ranked by bm25
+# - Postgres: a GIN index on to_tsvector(<config>, <fields>), ranked by ts_rank
+# - MySQL:    a FULLTEXT index, ranked by MATCH ... AGAINST
+#
+# Models without search_fields (or other databases) keep the ILIKE search, and
+# field lookups (search(title__have="dune")) always use it: their substring,
+# anchored-prefix and phrase semantics aren't what a word index answers.
+import re
+from sqlalchemy import and_, func, inspect, literal_column, or_, table as sql_table, column as sql_column, text
+
+_IDENTIFIER = re.compile(r"^\w+$")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def words(query: str) -> list[str]:
+    """Search terms as plain words; query syntax characters are never passed through."""
+    return _WORD.findall(query or "")
+
+
+class SearchIndex:
+    """The full-text index of one model's table, built from Meta.search_fields."""
+    def __init__(self, table, fields, config: str = "english"):
+        for name in fields:
+            if name not in table.c:
+                raise ValueError(f"search_fields on '{table.name}': unknown field '{name}'")
+        if not _IDENTIFIER.match(config):
+            raise ValueError(f"Invalid search_config {config!r}")
+        pk = list(table.primary_key.columns)
+        if fields and len(pk) != 1:
+            raise ValueError(f"search_fields on '{table.name}' need a single-column primary key")
+        self.table = table
+        self.fields = list(fields)
+        self.config = config
+        self.pk = pk[0] if pk else None
+        self.fts_table = f"{table.name}_fts"   # SQLite
+        self.index_name = f"fts_{table.name}"  # Postgres/MySQL; not ix_, so the index diff leaves it alone
+
+    @classmethod
+    def for_model(cls, model_class):
+        return model_class.__table__.info.get("apexorm_search")
+
+    def attach(self):
+        self.table.info["apexorm_search"] = self
+        return self
+
+    def supports(self, dialect_name: str) -> bool:
+        return dialect_name in ("sqlite", "postgresql", "mysql", "mariadb")
+
+    # ------------------- DDL -------------------
+    def create_statements(self, dialect) -> list[str]:
+        q = dialect.identifier_preparer.quote
+        table, fields = q(self.table.name), [q(f) for f in self.fields]
+        if dialect.name == "sqlite":
+            fts, pk = q(self.fts_table), q(self.pk.name)
+            cols = ", ".join(fields)
+            new = ", ".join(f"new.{f}" for f in fields)
+            old = ", ".join(f"old.{f}" for f in fields)
+            insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new});"
+            delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old});"
+            return [
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content={table}, content_rowid={pk})",
+                f"CREATE TRIGGER {q(self.fts_table + '_ai')} AFTER INSERT ON {table} BEGIN {insert_new} END",
+                f"CREATE TRIGGER {q(self.fts_table + '_ad')} AFTER DELETE ON {table} BEGIN {delete_old} END",
+                f"CREATE TRIGGER {q(self.fts_table + '_au')} AFTER UPDATE OF {cols} ON {table} "
+                f"BEGIN {delete_old} {insert_new} END",
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",   # index the rows already there
+            ]
+        if dialect.name == "postgresql":
+            document = self._pg_document_sql(fields)
+            return [f"CREATE INDEX {q(self.index_name)} ON {table} USING GIN ({document})"]
+        if dialect.name in ("mysql", "mariadb"):
+            return [f"CREATE FULLTEXT INDEX {q(self.index_name)} ON {table} ({', '.join(fields)})"]
+        return []
+
+    def drop_statements(self, dialect) -> list[str]:
+        q = dialect.identifier_preparer.quote
+        if dialect.name == "sqlite":
+            return [
+                *(f"DROP TRIGGER IF EXISTS {q(self.fts_table + suffix)}" for suffix in ("_ai", "_ad", "_au")),
+                f"DROP TABLE IF EXISTS {q(self.fts_table)}",
+            ]
+        if dialect.name == "postgresql":
+            return [f"DROP INDEX IF EXISTS {q(self.index_name)}"]
+        if dialect.name in ("mysql", "mariadb"):
+            return [f"DROP INDEX {q(self.index_name)} ON {q(self.table.name)}"]
+        return []
+
+    def is_current(self, connection) -> bool:
+        """Whether the index exists with the declared fields."""
+        if connection.dialect.name == "sqlite":
+            # the triggers go away with the table when a migration rebuilds it
+            names = {row[0] for row in connection.execute(
+                text("SELECT name FROM sqlite_master WHERE name IN (:t, :ai, :ad, :au)"),
+                {"t": self.fts_table, "ai": f"{self.fts_table}_ai", "ad": f"{self.fts_table}_ad",
+                 "au": f"{self.fts_table}_au"},
+            )}
+            if len(names) < 4:
+                return False
+            columns = [row[1] for row in connection.exec_driver_sql(
+                f"PRAGMA table_info({connection.dialect.identifier_preparer.quote(self.fts_table)})"
+            )]
+            return columns == self.fields
+        if connection.dialect.name == "postgresql":
+            definition = connection.execute(
+                text("SELECT indexdef FROM pg_indexes WHERE indexname = :n"), {"n": self.index_name}
+            ).scalar()
+            return definition is not None and all(f in definition for f in self.fields)
+        indexes = {ix["name"]: ix for ix in inspect(connection).get_indexes(self.table.name)}
+        return self.index_name in indexes and indexes[self.index_name]["column_names"] == self.fields
+
+    def owns_table(self, name: str) -> bool:
+        """The FTS table and its shadow tables (<table>_fts_data, ...)."""
+        return name == self.fts_table or name.startswith(f"{self.fts_table}_")
+
+    def _pg_document_sql(self, fields) -> str:
+        # written out literally so the query's expression matches the index's exactly
+        joined = " || ' ' || ".join(f"coalesce({f}, '')" for f in fields)
+        return f"to_tsvector('{self.config}'::regconfig, {joined})"
+
+    # ------------------- querying -------------------
+    def apply(self, query, model_class, dialect_name: str, query_words: list[str]):
+        """
+        Filter `query` to rows whose search fields, together, contain every word
+        and order it by relevance. Words match as prefixes ("jo" finds "john").
+        """
+        if dialect_name == "sqlite":
+            return self._apply_fts5(query, model_class, query_words)
+        if dialect_name == "postgresql":
+            return self._apply_postgres(query, query_words)
+        return self._apply_mysql(query, query_words)
+
+    def _apply_fts5(self, query, model_class, query_words):
+        fts = sql_table(self.fts_table, sql_column("rowid"))
+        fts_name = literal_column(f'"{self.fts_table}"')
+        return (
+            query.join(fts, fts.c.rowid == getattr(model_class, self.pk.key))
+            .filter(fts_name.op("MATCH")(" ".join(f'"{w}"*' for w in query_words)))
+            .order_by(literal_column(f'"{self.fts_table}".rank'))
+        )
+
+    def _apply_postgres(self, query, query_words):
+        document = literal_column(self._pg_document_sql([f'"{self.table.name}"."{f}"' for f in self.fields]))
+        ts = func.to_tsquery(literal_column(f"'{self.config}'::regconfig"), " & ".join(f"{w}:*" for w in query_words))
+        return query.filter(document.op("@@")(ts)).order_by(func.ts_rank(document, ts).desc())
+
+    def _apply_mysql(self, query, query_words):
+        from sqlalchemy.dialects.mysql import match
+
+        against = " ".join(f"+{w}*" for w in query_words)
+        relevance = match(*(self.table.c[f] for f in self.fields), against=against).in_boolean_mode()
+        return query.filter(relevance > 0).order_by(relevance.desc())
+
+
+def ilike_condition(model_class, fields, query_words):
+    """Fallback for search("..."): every word in at least one of the fields."""
+    return and_(*(
+        or_(*(getattr(model_class, f).ilike(f"%{w}%") for f in fields)) for w in query_words
+    ))
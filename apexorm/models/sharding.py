@@ -0,0 +1,321 @@
+# apexorm/models/sharding.py
+#
+# Horizontal sharding: rows of a sharded model are spread over several
+# databases by the value of one field.
+#
+#     orm = ApexORM(SQLiteDB("main.db"), shards={"a": SQLiteDB("a.db"), "b": SQLiteDB("b.db")})
+#
+#     class Order(Model):
+#         tenant_id = IntegerField()
+#         class Meta:
+#             shard_key = "tenant_id"
+#             shard_by = lambda tenant_id: "a" if tenant_id < 1000 else "b"   # optional
+#
+# Without shard_by a stable hash of the key picks the shard. save()/delete()
+# go to the instance's shard; bulk_upsert(), load_csv()/load_jsonl(),
+# get_or_create() and update_or_create() route each row by its shard key
+# (one transaction per shard and batch, none spanning shards). raw() SQL can't
+# be routed, so it takes the shard's name: raw(sql, shard="a").
+#
+# A query whose filter pins the shard key (tenant_id=5, tenant_id__in=[...])
+# runs on the matching shards only; any other query runs on every shard in
+# parallel, and order_by, slicing, count() and aggregate() are merged across them.
+#
+# Each shard has its own session, so related models should be sharded by the
+# same key (a row and everything it references live on one shard). Primary keys
+# must be unique across shards (UUIDField): autoincrement ids are rejected, as
+# every shard would count from 1.
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import object_session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList, Grouping
+from . import autoprefetch
+from .aggregates import aggregate_columns, merge_aggregates
+from .export import stream_columns
+from .queryset import QuerySet, _ResultList, order_columns
+from .rows import fetch as fetch_rows, is_readonly
+
+_SHARD = "apexorm_shard"
+
+
+class ShardSet:
+    """The shard databases of one ApexORM: a session per shard and a pool to query them in parallel."""
+    def __init__(self, session_factories: dict):
+        if not session_factories:
+            raise ValueError("shards needs at least one database")
+        self.names = list(session_factories)
+        self.factories = session_factories
+        self.sessions = {}
+        for name, factory in session_factories.items():
+            session = factory()
+            session.info[_SHARD] = name
+            self.sessions[name] = session
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def engines(self) -> dict:
+        return {name: session.get_bind() for name, session in self.sessions.items()}
+
+    # ------------------- routing -------------------
+    def shard_for(self, model_class, value) -> str:
+        """Name of the shard holding rows whose shard key is `value`."""
+        shard_by = model_class.__shard_by__
+        if shard_by is None:
+            return self.names[zlib.crc32(str(value).encode()) % len(self.names)]
+        name = shard_by(value)
+        if name not in self.sessions:
+            raise ValueError(f"{model_class.__name__}.Meta.shard_by({value!r}) returned unknown shard {name!r}")
+        return name
+
+    def session_for(self, obj):
+        model_class = type(obj)
+        key = model_class.__shard_key__
+        name = self._shard_of(model_class, getattr(obj, key, None))
+        current = object_session(obj)
+        if current is not None and current.info.get(_SHARD, name) != name:
+            raise ValueError(
+                f"Changing {model_class.__name__}.{key} would move the row to shard {name!r}; "
+                f"delete it and create it again instead."
+            )
+        return current or self.sessions[name]
+
+    def session_for_values(self, model_class, values: dict):
+        """Session of the shard a row given as field values belongs to."""
+        return self.sessions[self._shard_of(model_class, values.get(model_class.__shard_key__))]
+
+    def split(self, model_class, objs) -> dict:
+        """{shard name: [rows]} for model instances or dicts, by their shard key value."""
+        key = model_class.__shard_key__
+        parts = {}
+        for obj in objs:
+            value = obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+            parts.setdefault(self._shard_of(model_class, value), []).append(obj)
+        return parts
+
+    def _shard_of(self, model_class, value) -> str:
+        if value is None:
+            raise ValueError(f"{model_class.__name__} needs a '{model_class.__shard_key__}' value to choose its shard.")
+        return self.shard_for(model_class, value)
+
+    def target_shards(self, model_class, whereclause) -> list[str]:
+        """The shards a query can match: those of the shard key values it pins, else all."""
+        column = model_class.__table__.c[model_class.__shard_key__]
+        values = _pinned_values(whereclause, column)
+        if values is None:
+            return list(self.names)
+        found = {self.shard_for(model_class, v) for v in values}
+        return [name for name in self.names if name in found]
+
+    # ------------------- execution -------------------
+    def run(self, fn, names: list[str]) -> list:
+        """fn(name) on each shard, concurrently; results in `names` order."""
+        if len(names) == 1:
+            return [fn(names[0])]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(len(self.names), thread_name_prefix="apexorm-shards")
+        futures = [self._executor.submit(fn, name) for name in names]
+        return [future.result() for future in futures]
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+            session.get_bind().dispose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class ShardRouter:
+    """Model._session of a sharded model: the session of the instance's shard."""
+    def __init__(self, shards: ShardSet):
+        self.shards = shards
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return None   # no single session for the class; Manager builds a ShardedQuerySet
+        return self.shards.session_for(obj)
+
+
+def _pinned_values(clause, column):
+    """
+    Shard key values a WHERE clause restricts the column to (=, IN, AND, OR of
+    those), or None when rows with any value can match.
+    """
+    if clause is None:
+        return None
+    if isinstance(clause, Grouping):
+        return _pinned_values(clause.element, column)
+    if isinstance(clause, BooleanClauseList):
+        parts = [_pinned_values(c, column) for c in clause.clauses]
+        if clause.operator is operators.and_:
+            pinned = [p for p in parts if p is not None]
+            return set.intersection(*pinned) if pinned else None
+        if clause.operator is operators.or_ and all(p is not None for p in parts):
+            return set.union(*parts)
+        return None
+    if isinstance(clause, BinaryExpression):
+        left, right = clause.left, clause.right
+        if _is_column(right, column):
+            left, right = right, left
+        if not _is_column(left, column) or not isinstance(right, BindParameter):
+            return None
+        if clause.operator is operators.eq:
+            return {right.effective_value}
+        if clause.operator is operators.in_op:
+            return set(right.effective_value)
+    return None
+
+
+def _is_column(element, column) -> bool:
+    return getattr(element, "table", None) is column.table and getattr(element, "name", None) == column.name
+
+
+def shard_tables(models) -> set[str]:
+    """Tables kept on the shards: sharded models' tables and the M2M tables between them."""
+    from .relations import M2M_ASSOC_TABLES
+
+    sharded = {m.__table__.name for m in models if m.__shard_key__}
+    for table in M2M_ASSOC_TABLES.values():
+        targets = {fk.column.table.name for fk in table.foreign_keys}
+        if targets and targets <= sharded:
+            sharded.add(table.name)
+    return sharded
+
+
+class ShardedQuerySet(QuerySet):
+    """
+    QuerySet over every shard of a sharded model. Filters build one query that
+    runs on each targeted shard; LIMIT/OFFSET are applied after the merge.
+    """
+    def __init__(self, model_class, shards: ShardSet):
+        super().__init__(model_class, shards.sessions[shards.names[0]])   # template for building .query
+        self.shards = shards
+        self._limit = None
+        self._offset = 0
+
+    def _clone(self):
+        qs = ShardedQuerySet(self.model_class, self.shards)
+        qs._ordering, qs._limit, qs._offset = self._ordering, self._limit, self._offset
+        return qs
+
+    def order_by(self, *fields):
+        # all() merges the shards' rows with _sort_key, so each shard must place NULLs
+        # the same way; MySQL has no NULLS FIRST/LAST, but its default order is this one
+        explicit = self.session.get_bind().dialect.name not in ("mysql", "mariadb")
+        qs = self._clone()
+        qs.query = self.query.order_by(*order_columns(self.model_class, fields, explicit_nulls=explicit))
+        qs._ordering = self._ordering + fields
+        return qs
+
+    def limit(self, n):
+        qs = self._clone()
+        qs.query, qs._limit = self.query, n
+        return qs
+
+    def offset(self, n):
+        qs = self._clone()
+        qs.query, qs._offset = self.query, n
+        return qs
+
+    # ------------------- execution -------------------
+    def _targets(self) -> list[str]:
+        return self.shards.target_shards(self.model_class, self.query.whereclause)
+
+    def _on_shards(self, fn) -> list:
+        """fn(query bound to the shard's session) on every targeted shard."""
+        return self.shards.run(lambda name: fn(self.query.with_session(self.shards.sessions[name])), self._targets())
+
+    def all(self):
+        targets = self._targets()
+        offset, limit = self._offset or 0, self._limit
+
+        def fetch(name):
+            session = self.shards.sessions[name]
+            query = self.query.with_session(session)
+            if len(targets) == 1:
+                query = query.offset(offset or None).limit(limit)
+            elif limit is not None:
+                query = query.limit(offset + limit)   # enough of each shard's rows for the merged window
+            if is_readonly(query):
+                return fetch_rows(query, self.model_class)
+            rows = query.all()
+            if autoprefetch.is_enabled(query, session):
+                autoprefetch.link_siblings(rows)
+            self.using(session)._prefetch(rows)
+            return rows
+
+        parts = self.shards.run(fetch, targets)
+        if len(parts) == 1:
+            return _ResultList(parts[0], self.model_class)
+        rows = [obj for part in parts for obj in part]
+        for field in reversed(self._ordering):   # stable sorts, last key first
+            name = field.lstrip("-")
+            rows.sort(key=lambda obj: _sort_key(getattr(obj, name)), reverse=field.startswith("-"))
+        stop = None if limit is None else offset + limit
+        return _ResultList(rows[offset:stop], self.model_class)
+
+    def first(self):
+        rows = self.limit(1).all()
+        return rows[0] if rows else None
+
+    def last(self):
+        return self.order_by("-id").first()
+
+    def count(self):
+        total = sum(self._on_shards(lambda query: query.count()))
+        total = max(0, total - (self._offset or 0))
+        return total if self._limit is None else min(total, self._limit)
+
+    def exists(self):
+        return self.first() is not None
+
+    def get(self, **kwargs):
+        results = self.filter(**kwargs).all()
+        if len(results) == 0:
+            raise ValueError(f"{self.model_class.__name__} matching {kwargs} does not exist.")
+        elif len(results) > 1:
+            raise ValueError(f"Multiple {self.model_class.__name__} objects returned for {kwargs}.")
+        return results[0]
+
+    def values(self, *fields):
+        return self.all().values(*fields)
+
+    def values_list(self, *fields, flat=False):
+        return self.all().values_list(*fields, flat=flat)
+
+    def aggregate(self, **aggregates):
+        columns, spans = aggregate_columns(self.model_class, aggregates)
+        rows = self._on_shards(lambda query: tuple(query.order_by(None).with_entities(*columns).one()))
+        return merge_aggregates(aggregates, spans, rows)
+
+    # ------------------- exports & diagnostics -------------------
+    def _column_chunks(self, columns, chunk_size: int):
+        if self._ordering or self._limit is not None or self._offset:
+            # the merged order/window only exists after all(); read-only rows keep that light
+            rows = [tuple(getattr(row, c.key) for c in columns) for row in self.readonly().all()]
+            return (rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size))
+        # no ordering: stream one shard after the other
+        return (
+            chunk for name in self._targets()
+            for chunk in stream_columns(self.query, self.shards.sessions[name], columns, chunk_size)
+        )
+
+    def explain(self, analyze: bool = False) -> dict:
+        """{shard name: ExplainResult} for each shard this query runs on."""
+        from .explain import explain_query
+        return {
+            name: explain_query(self.query, self.shards.sessions[name], analyze=analyze)
+            for name in self._targets()
+        }
+
+    def __repr__(self):
+        return f"<ShardedQuerySet model={self.model_class.__name__}>"
+
+
+def _sort_key(value):
+    # NULLs first ascending (last when reversed), as order_by() asks every shard for
+    return (value is not None, value)
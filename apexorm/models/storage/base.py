@@ -1,14 +1,48 @@
 # apexorm/models/storage/base.py
+import hashlib
+import mmap
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from apexorm.models.storage.utils import iter_chunks
+
+
+@dataclass
+class StoredFile:
+    path: str              # relative path, as stored in the FileField column
+    size: int
+    checksum: str|None     # hex digest of the content (see the backend's `checksum` algorithm)
+
 
 class BaseStorageBackend(ABC):
-    """Abstract base class for file storage backends."""
+    """
+    Abstract base class for file storage backends.
+
+    `file_data` may be bytes, a binary file-like object or an iterable of bytes
+    chunks; backends should consume it incrementally (see utils.iter_chunks) so
+    uploads never have to fit in memory.
+    """
+    checksum = "sha256"
 
     @abstractmethod
-    def save(self, folder: str, file_name: str, file_data: bytes) -> str:
+    def save(self, folder: str, file_name: str, file_data) -> str:
         """Save file and return its relative path."""
         pass
 
+    def store(self, folder: str, file_name: str, file_data) -> StoredFile:
+        """Save file and return its path, size and checksum."""
+        digest = hashlib.new(self.checksum)
+        size = 0
+
+        def counted():
+            nonlocal size
+            for chunk in iter_chunks(file_data):
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+
+        path = self.save(folder, file_name, counted())
+        return StoredFile(path, size, digest.hexdigest())
+
     @abstractmethod
     def delete(self, path: str):
         """Delete a file by its relative path."""
@@ -18,3 +52,24 @@ class BaseStorageBackend(ABC):
     def url(self, path: str) -> str:
         """Return a URL or absolute path to access the file."""
         pass
+
+    # ------------------- reading -------------------
+    def size(self, path: str) -> int:
+        """Size of a stored file in bytes."""
+        with self.open(path) as f:
+            return f.seek(0, 2)
+
+    def open(self, path: str):
+        """Open a stored file for binary reading."""
+        raise NotImplementedError(f"{type(self).__name__} does not support reading files")
+
+    def read_range(self, path: str, start: int, length: int|None = None) -> bytes:
+        """Up to `length` bytes from offset `start` (to the end when length is None)."""
+        with self.open(path) as f:
+            f.seek(start)
+            return f.read(-1 if length is None else length)
+
+    def mmap(self, path: str) -> mmap.mmap:
+        """A read-only memory map of the file (slice memoryview(m) for zero-copy ranges)."""
+        with self.open(path) as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
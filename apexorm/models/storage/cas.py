@@ -0,0 +1,113 @@
+# apexorm/models/storage/cas.py
+import errno
+import hashlib
+import os
+import time
+import uuid
+from apexorm.models.storage.base import StoredFile
+from apexorm.models.storage.local import LocalStorageBackend
+
+CAS_DIR = ".cas"
+
+# link() errors meaning "this filesystem has no hard links": store a plain copy instead
+_NO_LINKS = {errno.EPERM, errno.EXDEV, errno.EMLINK, getattr(errno, "ENOTSUP", errno.EPERM)}
+
+
+class ContentAddressedStorageBackend(LocalStorageBackend):
+    """
+    Local storage that keeps one copy of each distinct content.
+
+    Blobs live at <base_dir>/.cas/ab/cd/<digest>. Every save() still returns its
+    own path (<folder>/<digest>-<random><ext>), a hard link to the blob, so
+    FileField columns, url(), size() and delete() work exactly as with LocalStorageBackend.
+    The blob's link count is its reference count: delete() removes one reference,
+    and the blob goes with the last one. Stored files share an inode with their
+    duplicates, so treat them as immutable.
+    """
+
+    def blob_path(self, checksum: str) -> str:
+        return os.path.join(self.base_dir, CAS_DIR, checksum[:2], checksum[2:4], checksum)
+
+    def store(self, folder: str, file_name: str, file_data) -> StoredFile:
+        tmp_dir = os.path.join(self.base_dir, CAS_DIR, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path, size, checksum = self._write_temp(tmp_dir, file_data)
+        try:
+            ext = os.path.splitext(file_name)[1]
+            rel_path = f"{folder}/{checksum}-{uuid.uuid4().hex[:12]}{ext}"
+            os.makedirs(os.path.join(self.base_dir, folder), exist_ok=True)
+            self._link_reference(tmp_path, checksum, os.path.join(self.base_dir, rel_path))
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return StoredFile(rel_path.replace("\\", "/"), size, checksum)
+
+    def _link_reference(self, tmp_path: str, checksum: str, ref_path: str):
+        blob = self.blob_path(checksum)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        for _attempt in range(3):
+            try:
+                os.link(tmp_path, blob)        # first copy of this content
+            except FileExistsError:
+                pass                           # a duplicate: the temp file is dropped
+            except OSError as e:
+                if e.errno not in _NO_LINKS:
+                    raise
+                os.replace(tmp_path, ref_path)
+                return
+            try:
+                os.link(blob, ref_path)
+                return
+            except FileNotFoundError:
+                continue                       # the last reference was deleted meanwhile
+        raise RuntimeError(f"Could not link {ref_path} to its content blob")
+
+    def delete(self, path: str):
+        if not path:
+            return
+        super().delete(path)
+        checksum = self._checksum_of(path)
+        if checksum is None:
+            return
+        blob = self.blob_path(checksum)
+        try:
+            if os.stat(blob).st_nlink <= 1:
+                os.remove(blob)
+        except FileNotFoundError:
+            pass
+
+    def refcount(self, path: str) -> int:
+        """How many stored paths share this file's content."""
+        checksum = self._checksum_of(path)
+        try:
+            return os.stat(self.blob_path(checksum)).st_nlink - 1 if checksum else 1
+        except FileNotFoundError:
+            return 1 if os.path.exists(self.url(path)) else 0
+
+    def collect_garbage(self, temp_max_age: float = 3600) -> int:
+        """
+        Remove blobs no path references any more (e.g. after a crash mid-delete)
+        and temp files of uploads abandoned more than `temp_max_age` seconds ago.
+        """
+        removed = 0
+        root = os.path.join(self.base_dir, CAS_DIR)
+        stale = time.time() - temp_max_age
+        for dirpath, _dirnames, filenames in os.walk(root):
+            is_tmp = os.path.basename(dirpath) == "tmp"
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                if (st.st_mtime < stale) if is_tmp else st.st_nlink <= 1:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def _checksum_of(self, path: str) -> str|None:
+        checksum = os.path.basename(path).split("-", 1)[0]
+        if len(checksum) == self._digest_length and all(c in "0123456789abcdef" for c in checksum):
+            return checksum
+        return None
+
+    @property
+    def _digest_length(self) -> int:
+        return hashlib.new(self.checksum).digest_size * 2
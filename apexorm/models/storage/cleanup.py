@@ -0,0 +1,182 @@
+# apexorm/models/storage/cleanup.py
+#
+# File deletions follow the database: FileField queues them on the instance's
+# session and they only run once that session commits (files uploaded in a
+# transaction that rolls back are removed instead). Deletions run on a small
+# bounded thread pool, off the request path. sweep_orphans() finds files no
+# FileField column references any more.
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from dataclasses import dataclass, field
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_ON_COMMIT = "apexorm_delete_on_commit"
+_ON_ROLLBACK = "apexorm_delete_on_rollback"
+
+_lock = threading.Lock()
+_executor = None
+_slots = None              # bounds queued + running deletions; submitters block when full
+_pending = set()
+_settings = {"max_workers": 2, "max_pending": 1000}
+_installed = False
+
+
+def configure(max_workers: int = 2, max_pending: int = 1000):
+    """
+    Size the deletion pool. At most `max_pending` deletions are queued or
+    running; committing more blocks until the pool catches up.
+    """
+    global _executor
+    with _lock:
+        _settings.update(max_workers=max_workers, max_pending=max_pending)
+        if _executor is not None:
+            _executor.shutdown(wait=False)   # already queued deletions still run
+            _executor = None
+
+
+def _submit(storage, path: str):
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(_settings["max_workers"], thread_name_prefix="apexorm-files")
+            _slots = threading.BoundedSemaphore(_settings["max_pending"])
+        executor, slots = _executor, _slots
+    slots.acquire()
+    future = executor.submit(_delete, storage, path)
+    with _lock:
+        _pending.add(future)
+
+    def done(f):
+        slots.release()
+        with _lock:
+            _pending.discard(f)
+    future.add_done_callback(done)
+
+
+def _delete(storage, path: str):
+    try:
+        storage.delete(path)
+    except Exception:
+        logger.exception("Could not delete stored file %r", path)
+
+
+def wait(timeout: float|None = None) -> bool:
+    """Block until queued deletions have run; False if `timeout` expired first."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        with _lock:
+            futures = list(_pending)
+        if not futures:
+            return True
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return False
+        wait_futures(futures, timeout=remaining)
+
+
+# ------------------- transaction hooks -------------------
+def delete_on_commit(session, storage, path: str):
+    """Delete `path` once `session` commits; forgotten if it rolls back. Without a session: now, in the background."""
+    if not path:
+        return
+    if session is None:
+        _submit(storage, path)
+        return
+    _install()
+    session.info.setdefault(_ON_COMMIT, []).append((storage, path))
+
+
+def delete_on_rollback(session, storage, path: str):
+    """Delete `path` (a file written for uncommitted changes) if `session` rolls back."""
+    if path and session is not None:
+        _install()
+        session.info.setdefault(_ON_ROLLBACK, []).append((storage, path))
+
+
+def _install():
+    global _installed
+    if not _installed:
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+        _installed = True
+
+
+def _after_commit(session):
+    if session.get_nested_transaction() is not None:
+        return   # a SAVEPOINT was released; wait for the real commit
+    session.info.pop(_ON_ROLLBACK, None)
+    for storage, path in session.info.pop(_ON_COMMIT, ()):
+        _submit(storage, path)
+
+
+def _after_rollback(session):
+    if session.get_nested_transaction() is not None:
+        return
+    session.info.pop(_ON_COMMIT, None)
+    for storage, path in session.info.pop(_ON_ROLLBACK, ()):
+        _submit(storage, path)
+
+
+# ------------------- orphan sweeping -------------------
+@dataclass
+class SweepReport:
+    scanned: int = 0
+    referenced: int = 0
+    orphans: list[str] = field(default_factory=list)   # relative paths (deleted unless dry_run)
+
+
+def sweep_orphans(session, models, dry_run: bool = False, grace_period: float = 3600,
+                  chunk_size: int = 5000) -> SweepReport:
+    """
+    Delete files under each FileField's upload_to folder that no row references.
+    Referenced paths are read column-at-a-time in bulk; files modified within
+    `grace_period` seconds are kept (their rows may not be committed yet).
+    Only storages with a local `base_dir` can be listed.
+    """
+    from apexorm.models.fields import FileField
+
+    # (storage, folder) -> referenced relative paths
+    targets = {}
+    for model in models:
+        for fld in getattr(model, "__fields__", {}).values():
+            if not isinstance(fld, FileField) or not hasattr(fld.storage, "base_dir"):
+                continue
+            key = (id(fld.storage), fld.upload_to.strip("/"))
+            storage, referenced = targets.setdefault(key, (fld.storage, set()))
+            column = model.__table__.c[fld.attr_name]
+            result = session.execute(
+                select(column).where(column.isnot(None)), execution_options={"stream_results": True}
+            )
+            for chunk in result.scalars().partitions(chunk_size):
+                referenced.update(chunk)
+
+    report = SweepReport()
+    cutoff = time.time() - grace_period
+    for (_id, folder), (storage, referenced) in targets.items():
+        report.referenced += len(referenced)
+        root = os.path.join(storage.base_dir, folder)
+        if not os.path.isdir(root):
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if name.startswith("."):
+                    continue   # in-progress uploads, backend bookkeeping
+                report.scanned += 1
+                abs_path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(abs_path, storage.base_dir).replace("\\", "/")
+                if rel_path in referenced:
+                    continue
+                st = os.stat(abs_path)
+                if max(st.st_mtime, st.st_ctime) > cutoff:   # ctime: a fresh hard link to old content
+                    continue
+                report.orphans.append(rel_path)
+                if not dry_run:
+                    storage.delete(rel_path)
+    return report
@@ -1,22 +1,93 @@
 # apexorm/models/storage/local.py
+import hashlib
+import mmap
 import os
-from apexorm.models.storage.base import BaseStorageBackend
-from apexorm.models.storage.utils import generate_uuid_filename
+import uuid
+from apexorm.models.storage.base import BaseStorageBackend, StoredFile
+from apexorm.models.storage.utils import CHUNK_SIZE, generate_uuid_filename, iter_chunks, regular_file_fd
+
+# in-kernel copies for uploads that are already regular files (Linux, macOS/BSD)
+_ZERO_COPY = hasattr(os, "pread") and (hasattr(os, "copy_file_range") or hasattr(os, "sendfile"))
 
 class LocalStorageBackend(BaseStorageBackend):
     """Default backend for saving files locally."""
 
-    def __init__(self, base_dir: str = "media"):
+    def __init__(self, base_dir: str = "media", checksum: str = "sha256"):
+        # directories are created on first save, not at construction/import time
         self.base_dir = base_dir
-        os.makedirs(self.base_dir, exist_ok=True)
+        self.checksum = checksum
+
+    def save(self, folder: str, file_name: str, file_data) -> str:
+        return self.store(folder, file_name, file_data).path
 
-    def save(self, folder: str, file_name: str, file_data: bytes) -> str:
-        os.makedirs(os.path.join(self.base_dir, folder), exist_ok=True)
+    def store(self, folder: str, file_name: str, file_data) -> StoredFile:
+        """
+        Stream `file_data` into a temporary file next to its destination, then
+        rename it into place: readers never see a partial file, and a failed
+        upload leaves nothing behind. Memory use is one chunk, whatever the size.
+        """
+        directory = os.path.join(self.base_dir, folder)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path, size, checksum = self._write_temp(directory, file_data)
         unique_name = generate_uuid_filename(file_name)
-        save_path = os.path.join(self.base_dir, folder, unique_name)
-        with open(save_path, "wb") as f:
-            f.write(file_data)
-        return os.path.join(folder, unique_name).replace("\\", "/")
+        try:
+            os.replace(tmp_path, os.path.join(directory, unique_name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return StoredFile(os.path.join(folder, unique_name).replace("\\", "/"), size, checksum)
+
+    def _write_temp(self, directory: str, file_data):
+        """Write to `directory`/.<uuid>.part; returns (temp path, size, hex checksum)."""
+        tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+        # os.open honours the umask, unlike mkstemp's 0600
+        out = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            try:
+                src = regular_file_fd(file_data) if _ZERO_COPY else None
+                if src is not None:
+                    size, checksum = self._copy_file(file_data, src, out)
+                else:
+                    size, checksum = self._copy_chunks(file_data, out)
+            finally:
+                os.close(out)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path, size, checksum
+
+    def _copy_chunks(self, file_data, out: int):
+        digest = hashlib.new(self.checksum)
+        size = 0
+        for chunk in iter_chunks(file_data):
+            digest.update(chunk)
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(out, view):]
+            size += len(chunk)
+        return size, digest.hexdigest()
+
+    def _copy_file(self, f, src: int, out: int):
+        """
+        Copy a regular file from its current position inside the kernel
+        (copy_file_range, else sendfile), then hash it with positional reads.
+        """
+        if getattr(f, "writable", lambda: False)():
+            f.flush()   # a file still being written: its buffer may not be on disk yet
+        start = f.tell()
+        size = os.fstat(src).st_size - start
+        _kernel_copy(src, out, start, size)
+        f.seek(start + size)
+
+        digest = hashlib.new(self.checksum)
+        offset = start
+        while offset < start + size:
+            chunk = os.pread(src, min(CHUNK_SIZE, start + size - offset), offset)
+            if not chunk:
+                break
+            digest.update(chunk)
+            offset += len(chunk)
+        return size, digest.hexdigest()
 
     def delete(self, path: str):
         if not path:
@@ -27,3 +98,88 @@ class LocalStorageBackend(BaseStorageBackend):
 
     def url(self, path: str) -> str:
         return os.path.abspath(os.path.join(self.base_dir, path))
+
+    # ------------------- reading -------------------
+    def size(self, path: str) -> int:
+        return os.path.getsize(os.path.join(self.base_dir, path))
+
+    def open(self, path: str):
+        return open(os.path.join(self.base_dir, path), "rb")
+
+    def read_range(self, path: str, start: int, length: int|None = None) -> bytes:
+        """Positional read (pread): no seek, no buffering, safe to share across threads."""
+        fd = os.open(os.path.join(self.base_dir, path), os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if length is None:
+                length = max(os.fstat(fd).st_size - start, 0)
+            if not hasattr(os, "pread"):
+                os.lseek(fd, start, os.SEEK_SET)
+                return os.read(fd, length)
+            parts = []
+            while length > 0:   # pread may return short reads
+                chunk = os.pread(fd, length, start)
+                if not chunk:
+                    break
+                parts.append(chunk)
+                start += len(chunk)
+                length -= len(chunk)
+            return b"".join(parts) if len(parts) != 1 else parts[0]
+        finally:
+            os.close(fd)
+
+    def mmap(self, path: str) -> mmap.mmap:
+        """
+        Map the file read-only; pages are read on access by the OS, so serving a
+        range from a multi-GB file touches only that range:
+
+            with storage.mmap(path) as m, memoryview(m)[start:start + length] as body:
+                sock.sendall(body)
+        """
+        fd = os.open(os.path.join(self.base_dir, path), os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if os.fstat(fd).st_size == 0:
+                raise ValueError(f"Cannot memory-map empty file {path!r}")
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)   # the map keeps its own handle
+        finally:
+            os.close(fd)
+
+
+def _kernel_copy(src: int, out: int, offset: int, count: int):
+    """
+    Append `count` bytes of `src` from `offset` to `out`: copy_file_range, else
+    sendfile, else pread/write. Some filesystems (FUSE, overlayfs, procfs-like)
+    report 0 bytes copied without an error, so a strategy that copies nothing
+    falls through to the next one; a short copy raises instead of leaving a
+    truncated file behind.
+    """
+    strategies = []
+    if hasattr(os, "copy_file_range"):
+        strategies.append(lambda pos, n: os.copy_file_range(src, out, n, pos))
+    if hasattr(os, "sendfile"):
+        strategies.append(lambda pos, n: os.sendfile(out, src, pos, n))
+    for copy in strategies:
+        copied = 0
+        try:
+            while copied < count:
+                n = copy(offset + copied, count - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            if copied:
+                raise
+            continue
+        if copied == count:
+            return
+        if copied:
+            raise OSError(f"Short copy: {copied} of {count} bytes")
+
+    copied = 0
+    while copied < count:   # e.g. copying across filesystems on an old kernel
+        chunk = os.pread(src, min(CHUNK_SIZE, count - copied), offset + copied)
+        if not chunk:
+            raise OSError(f"Short copy: {copied} of {count} bytes")
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(out, view):]
+        copied += len(chunk)
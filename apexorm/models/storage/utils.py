@@ -1,7 +1,40 @@
-# apexorm/models/storage/utils.py
-import uuid
+import io
 import os
+import stat
+import uuid
+
+CHUNK_SIZE = 1 << 20   # 1 MiB
+
 
 def generate_uuid_filename(original_name: str) -> str:
     ext = os.path.splitext(original_name)[1]
     return f"{uuid.uuid4().hex}{ext}"
+
+
+def iter_chunks(file_data, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the upload as bytes chunks. `file_data` may be bytes, a binary
+    file-like object (read from its current position) or an iterable of bytes.
+    """
+    if isinstance(file_data, (bytes, bytearray, memoryview)):
+        if file_data:
+            yield file_data
+        return
+    read = getattr(file_data, "read", None)
+    chunks = iter(lambda: read(chunk_size), b"") if read is not None else file_data
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            raise TypeError("File data must be bytes; open files in binary mode ('rb').")
+        if chunk:
+            yield chunk
+
+
+def regular_file_fd(file_data) -> int|None:
+    """The OS descriptor behind a binary file object on a regular file, else None."""
+    if isinstance(file_data, io.TextIOBase) or not hasattr(file_data, "fileno"):
+        return None
+    try:
+        fd = file_data.fileno()
+    except (OSError, ValueError):   # BytesIO, closed files, sockets wrapped in files...
+        return None
+    return fd if stat.S_ISREG(os.fstat(fd).st_mode) else None
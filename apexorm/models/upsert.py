@@ -0,0 +1,378 @@
+# apexorm/models/upsert.py
+#
+# Native upserts: INSERT ... ON CONFLICT DO UPDATE (SQLite, Postgres) and
+# INSERT ... ON DUPLICATE KEY UPDATE (MySQL), so idempotent writes are one
+# statement instead of get() + save(), and concurrent writers can't race.
+from dataclasses import dataclass
+from sqlalchemy import inspect, literal_column, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from . import counters
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class UpsertResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0   # rows whose key exists, left alone because there was nothing to update
+
+    def __iter__(self):
+        # created, updated = Book.objects.bulk_upsert(...)
+        return iter((self.created, self.updated))
+
+    def add(self, created: int, existing: int, updated: bool):
+        self.created += created
+        if updated:
+            self.updated += existing
+        else:
+            self.unchanged += existing
+
+
+def dialect_insert(dialect_name: str, target):
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect_name}")
+    return insert(target)
+
+
+def on_conflict_update(dialect_name: str, stmt, conflict_columns, update_columns):
+    if dialect_name in ("mysql", "mariadb"):
+        # MySQL picks the conflicting unique key itself
+        target = stmt.inserted
+        if not update_columns:  # no-op update keeps ON DUPLICATE KEY semantics
+            update_columns = conflict_columns[:1]
+        return stmt.on_duplicate_key_update({c: target[c] for c in update_columns})
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+    return stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={c: stmt.excluded[c] for c in update_columns},
+    )
+
+
+# ------------------- values -------------------
+def column_values(model_class, values: dict) -> dict:
+    """
+    Map field names to column keys: FK fields accept a related instance or id
+    ("author=a" / "author_id=1"); unknown names raise like Model(**kwargs) does.
+    """
+    table = model_class.__table__
+    out = {}
+    for key, value in values.items():
+        if key in table.c:
+            out[key] = value
+        elif f"{key}_id" in table.c:
+            out[f"{key}_id"] = getattr(value, "id", value)
+        else:
+            raise TypeError(f"Unknown field '{key}' for {model_class.__name__}")
+    return out
+
+
+def validate_values(model_class, values: dict):
+    """Run the declared fields' validators, as Model.save() intends."""
+    for key, value in values.items():
+        field = model_class.__fields__.get(key)
+        if field is not None and value is not None:
+            field.validate(value)
+
+
+def instance_values(obj) -> dict:
+    """Column values set on an unsaved/loaded instance, with FK ids taken from related objects."""
+    state = inspect(obj)
+    mapper = state.mapper
+    values = {c.key: state.dict[c.key] for c in mapper.column_attrs if c.key in state.dict}
+    for rel in mapper.relationships:
+        related = state.dict.get(rel.key)
+        if related is None or rel.uselist:
+            continue
+        for local_col, remote_col in rel.local_remote_pairs:
+            values.setdefault(local_col.key, getattr(related, remote_col.key, None))
+    for column in mapper.primary_key:
+        if values.get(column.key) is None:
+            values.pop(column.key, None)  # let the database assign it
+    for key in counters.counter_columns(mapper.class_):
+        values.pop(key, None)   # maintained in SQL, see counters
+    return values
+
+
+def default_conflict_fields(model_class) -> list[str]:
+    """First unique=True column of the model, falling back to the primary key."""
+    table = model_class.__table__
+    unique = [c.key for c in table.columns if c.unique and not c.primary_key]
+    if unique:
+        return unique[:1]
+    return [c.key for c in table.primary_key.columns]
+
+
+# ------------------- bulk_upsert -------------------
+def bulk_upsert(model_class, session, objs, conflict_fields=None, update_fields=None,
+                batch_size: int = DEFAULT_BATCH_SIZE) -> UpsertResult:
+    table = model_class.__table__
+    dialect_name = session.get_bind().dialect.name
+    conflict = list(conflict_fields or default_conflict_fields(model_class))
+    conflict = list(column_values(model_class, dict.fromkeys(conflict)))
+    pk_keys = {c.key for c in table.primary_key.columns}
+
+    rows = []
+    for obj in objs:
+        values = instance_values(obj) if hasattr(obj, "__table__") else column_values(model_class, obj)
+        missing = [c for c in conflict if values.get(c) is None]
+        if missing:
+            raise ValueError(f"bulk_upsert() rows need a value for the conflict field(s) {missing}")
+        validate_values(model_class, values)
+        rows.append(values)
+
+    result = UpsertResult()
+    try:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            # executemany needs one key set per statement
+            groups = {}
+            for values in batch:
+                groups.setdefault(tuple(sorted(values)), []).append(values)
+            for keys, group in groups.items():
+                updates = list(update_fields) if update_fields is not None else \
+                    [k for k in keys if k not in conflict and k not in pk_keys]
+                updates = [k for k in column_values(model_class, dict.fromkeys(updates)) if k in keys]
+                before = counters.parents_before(session, model_class, conflict, group)
+                _upsert_group(session, table, dialect_name, group, conflict, updates, result)
+                counters.recount_after(session, model_class, before, group)
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return result
+
+
+def _upsert_group(session, table, dialect_name, rows, conflict, updates, result: UpsertResult):
+    stmt = on_conflict_update(dialect_name, dialect_insert(dialect_name, table), conflict, updates)
+    if dialect_name == "postgresql":
+        total = len(rows)
+        if updates:
+            # ON CONFLICT DO UPDATE can't touch a row twice in one statement: the last row per key wins
+            rows = list({_key(values, conflict): values for values in rows}.values())
+        # xmax is 0 only for freshly inserted row versions; DO NOTHING returns inserted rows only
+        inserted = session.execute(stmt.returning(literal_column("(xmax = 0)")), rows).scalars().all()
+        created = sum(1 for flag in inserted if flag)
+        result.add(created, total - created, updated=bool(updates))
+        return
+
+    if dialect_name in ("mysql", "mariadb"):
+        # no RETURNING, and ON DUPLICATE KEY's row counts can't tell an insert from an
+        # unchanged row: lock and read the stored keys first, then upsert the batch
+        stored = _stored_keys(session, table, rows, conflict)
+        created = len({_key(values, conflict) for values in rows} - stored)
+        session.execute(stmt, rows)
+        result.add(created, len(rows) - created, updated=bool(updates))
+        return
+
+    # SQLite can't say per row whether an upsert inserted or updated. Insert the new
+    # keys first (RETURNING reports exactly those rows), then upsert the rest.
+    created, rest = _insert_new(session, table, dialect_name, rows, conflict)
+    if rest and updates:
+        session.execute(stmt, rest)
+    result.add(created, len(rows) - created, updated=bool(updates))
+
+
+def _key(values: dict, conflict) -> tuple:
+    return tuple(values[c] for c in conflict)
+
+
+def _stored_keys(session, table, rows, conflict) -> set:
+    """Conflict keys of `rows` already in the table, locked until commit (SELECT ... FOR UPDATE)."""
+    columns = [table.c[c] for c in conflict]
+    keys = {_key(values, conflict) for values in rows}
+    where = columns[0].in_([k[0] for k in keys]) if len(columns) == 1 else tuple_(*columns).in_(keys)
+    return {tuple(row) for row in session.execute(select(*columns).where(where).with_for_update())}
+
+
+def _insert_new(session, table, dialect_name, rows, conflict) -> tuple[int, list]:
+    """INSERT the rows whose conflict key isn't stored; returns (rows inserted, rows left to upsert)."""
+    columns = [table.c[c] for c in conflict]
+    stmt = dialect_insert(dialect_name, table).on_conflict_do_nothing(index_elements=conflict).returning(*columns)
+    inserted = {tuple(row) for row in session.execute(stmt, rows)}
+    # a key repeated within the batch is inserted once; its later rows update it
+    rest, seen = [], set()
+    for values in rows:
+        key = _key(values, conflict)
+        if key in inserted and key not in seen:
+            seen.add(key)
+        else:
+            rest.append(values)
+    return len(inserted), rest
+
+
+# ------------------- update_or_create -------------------
+def update_or_create(model_class, session, defaults=None, **lookup):
+    """
+    Returns (obj, created). `lookup` must match a unique constraint (it is the
+    conflict target); `defaults` are written on both insert and update.
+    """
+    if not lookup:
+        raise ValueError("update_or_create() requires at least one lookup field.")
+    lookup = column_values(model_class, lookup)
+    defaults = column_values(model_class, defaults or {})
+    validate_values(model_class, {**lookup, **defaults})
+    dialect_name = session.get_bind().dialect.name
+    populate = {"populate_existing": True}
+    written = [{**lookup, **defaults}]
+
+    try:
+        before = counters.parents_before(session, model_class, list(lookup), written)
+        if dialect_name == "postgresql":
+            stmt = dialect_insert(dialect_name, model_class).values(**lookup, **defaults)
+            stmt = on_conflict_update(dialect_name, stmt, list(lookup), list(defaults))
+            if defaults:
+                row = session.execute(
+                    stmt.returning(model_class, literal_column("(xmax = 0)")), execution_options=populate
+                ).first()
+                obj, created = row
+            else:
+                obj = session.scalars(stmt.returning(model_class), execution_options=populate).first()
+                created = obj is not None
+                if obj is None:
+                    obj = session.scalars(select(model_class).filter_by(**lookup)).one()
+        elif dialect_name == "sqlite":
+            obj, created = _sqlite_update_or_create(model_class, session, lookup, defaults, populate)
+        else:
+            obj, created = _mysql_update_or_create(model_class, session, lookup, defaults, populate)
+        counters.recount_after(session, model_class, before, written)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return obj, created
+
+
+def _sqlite_update_or_create(model_class, session, lookup, defaults, populate):
+    """
+    SQLite's RETURNING can't tell an insert from an update, so: UPDATE ... RETURNING
+    (one statement when the row exists), else INSERT ... ON CONFLICT DO NOTHING
+    RETURNING; if a concurrent writer inserted in between, the UPDATE is retried.
+    """
+    table = model_class.__table__
+    for _attempt in range(3):
+        if defaults:
+            stmt = update(model_class).filter_by(**lookup).values(**defaults).returning(model_class)
+            obj = session.scalars(stmt, execution_options=populate).first()
+        else:
+            obj = session.scalars(select(model_class).filter_by(**lookup)).first()
+        if obj is not None:
+            return obj, False
+
+        stmt = dialect_insert("sqlite", model_class).values(**lookup, **defaults)
+        stmt = stmt.on_conflict_do_nothing(index_elements=[table.c[k] for k in lookup]).returning(model_class)
+        obj = session.scalars(stmt, execution_options=populate).first()
+        if obj is not None:
+            return obj, True
+    raise RuntimeError(f"update_or_create() on {model_class.__name__} kept conflicting with concurrent writers.")
+
+
+def _mysql_update_or_create(model_class, session, lookup, defaults, populate):
+    """
+    ON DUPLICATE KEY UPDATE's row count can't tell an insert from an unchanged row
+    (SQLAlchemy connects with CLIENT_FOUND_ROWS, which reports both as 1). So, as on
+    SQLite: UPDATE (its count is the rows matched), else a plain INSERT; if that fails
+    because a concurrent writer inserted the key in between, the UPDATE is retried.
+    MySQL only undoes the failed statement, not the transaction. Then SELECT the row.
+    """
+    table = model_class.__table__
+    query = select(model_class).filter_by(**lookup)
+    for _attempt in range(3):
+        if defaults:
+            stmt = update(table).filter_by(**lookup).values(**defaults)
+            found = session.execute(stmt).rowcount > 0
+        else:
+            found = session.scalars(query).first() is not None
+        created = False
+        if not found:
+            try:
+                session.execute(dialect_insert("mysql", table).values(**lookup, **defaults))
+                created = True
+            except IntegrityError:
+                # NOT NULL/FK/other unique violations are errors; only a racing insert of the key is retried
+                if session.scalars(query).first() is None:
+                    raise
+        if found or created:
+            return session.scalars(query, execution_options=populate).one(), created
+    raise RuntimeError(f"update_or_create() on {model_class.__name__} kept conflicting with concurrent writers.")
+
+
+# ------------------- get_or_create -------------------
+def get_or_create(model_class, session, defaults=None, expect_hit: bool = False, **lookup):
+    """
+    Returns (obj, created) in one round trip in the common case:
+
+    - expect_hit=False (default): INSERT ... ON CONFLICT DO NOTHING RETURNING;
+      only when nothing was inserted, one SELECT fetches the existing row.
+    - expect_hit=True: SELECT first; only on a miss, the INSERT above.
+
+    A worker that loses a race sees the winner's row instead of a unique-constraint
+    error. MySQL has no ON CONFLICT DO NOTHING (INSERT IGNORE would also swallow
+    NOT NULL/FK errors), so there a duplicate key surfaces as IntegrityError and is
+    handled like any other conflict. Postgres aborts the whole transaction when a
+    statement fails, so there the INSERT runs inside a SAVEPOINT if the session
+    already has a transaction open; SQLite and MySQL only undo the failed statement.
+    """
+    if not lookup:
+        raise ValueError("get_or_create() requires at least one lookup field.")
+    lookup = column_values(model_class, lookup)
+    defaults = column_values(model_class, defaults or {})
+    validate_values(model_class, {**lookup, **defaults})
+    query = select(model_class).filter_by(**lookup)
+
+    if expect_hit:
+        obj = session.scalars(query).first()
+        if obj is not None:
+            return obj, False
+
+    aborts_transaction = session.get_bind().dialect.name == "postgresql"
+    guarded = aborts_transaction and session.in_transaction()
+    try:
+        try:
+            if guarded:
+                with session.begin_nested():
+                    obj = _insert_do_nothing(model_class, session, {**lookup, **defaults})
+            else:
+                obj = _insert_do_nothing(model_class, session, {**lookup, **defaults})
+        except IntegrityError:
+            if aborts_transaction and not guarded:
+                session.rollback()
+            # e.g. a conflict on another unique column: only fine if the lookup row exists
+            obj = session.scalars(query).first()
+            if obj is None:
+                raise
+            return obj, False
+
+        created = obj is not None
+        if obj is None:
+            obj = session.scalars(query).first()
+            if obj is None:
+                raise ValueError(
+                    f"get_or_create() on {model_class.__name__}: the insert conflicted with a row "
+                    f"that doesn't match {lookup}."
+                )
+        else:
+            counters.recount_after(session, model_class, {}, [{**lookup, **defaults}])
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return obj, created
+
+
+def _insert_do_nothing(model_class, session, values: dict):
+    """The inserted instance, or None when a unique constraint already holds the row."""
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name in ("mysql", "mariadb"):
+        # a duplicate key raises IntegrityError, which get_or_create() resolves
+        session.execute(dialect_insert(dialect_name, model_class.__table__).values(**values))
+        return session.scalars(select(model_class).filter_by(**values)).first()
+    stmt = dialect_insert(dialect_name, model_class).values(**values).on_conflict_do_nothing()
+    return session.scalars(stmt.returning(model_class)).first()
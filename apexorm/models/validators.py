@@ -2,7 +2,6 @@
 import re
 from urllib.parse import urlparse
 import uuid
-import ipaddress
 from datetime import date, datetime, time
 
 class ValidationError(Exception):
@@ -28,6 +27,8 @@ def validate_uuid(value):
 
 
 def validate_ip_address(value):
+    import ipaddress  # only needed by IPAddressField; keep it off the import path
+
     try:
         ipaddress.ip_address(value)
     except ValueError:
@@ -1,9 +1,46 @@
 # apexorm/testing.py
+from contextlib import contextmanager
+
+
 def reset_model_state():
+    import apexorm
     from apexorm.models import Base
-    from apexorm.models.relations import MODEL_REGISTRY, PENDING_BACKREFS, M2M_ASSOC_TABLES
+    from apexorm.models.relations import MODEL_REGISTRY, PENDING_BACKREFS, PENDING_COUNTERS, M2M_ASSOC_TABLES
     MODEL_REGISTRY.clear()
     PENDING_BACKREFS.clear()
+    PENDING_COUNTERS.clear()
     M2M_ASSOC_TABLES.clear()
+    # Forget mapped classes so models can be redefined under the same names
+    Base.registry.dispose()
     # Clear in-memory table metadata (no engine drop here)
-    Base.metadata.clear()
\ No newline at end of file
+    Base.metadata.clear()
+    # Discovered classes belong to the disposed registry
+    apexorm._DISCOVERY_CACHE.clear()
+
+
+@contextmanager
+def assert_max_queries(orm, limit: int):
+    """
+    Fail if the block sends more than `limit` statements:
+
+        with assert_max_queries(orm, 2):
+            client.get("/books")
+    """
+    with orm.capture_queries() as log:
+        yield log
+    if len(log) > limit:
+        raise AssertionError(f"Expected at most {limit} queries, {len(log)} were executed:\n{log}")
+
+
+@contextmanager
+def assert_num_queries(orm, count: int):
+    with orm.capture_queries() as log:
+        yield log
+    if len(log) != count:
+        raise AssertionError(f"Expected {count} queries, {len(log)} were executed:\n{log}")
+
+
+@contextmanager
+def assert_no_n_plus_one(orm, threshold: int = 3):
+    with orm.detect_n_plus_one(threshold=threshold, raise_error=True) as detector:
+        yield detector
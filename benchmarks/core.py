@@ -0,0 +1,333 @@
+# benchmarks/core.py
+"""
+Benchmarks for the core ORM paths.
+
+Every benchmark runs against a fresh SQLite database (a file in a temporary
+directory and/or an in-memory one). For each one we report
+
+- ops/sec:      operations per second, from the median of --repeat timed runs
+- peak KiB:     peak memory allocated while running one call (tracemalloc, one extra run)
+- queries/op:   statements sent to the database per operation (one extra run)
+
+Every run is compared against benchmarks/baseline.json (committed; pass
+--baseline for another file, --no-baseline to skip); the run fails (exit code 1)
+when ops/sec drops or peak memory grows by more than --tolerance, or when any
+benchmark sends more queries than it used to. Timings depend on the machine:
+re-save the baseline on yours from a known-good commit before comparing.
+
+    python benchmarks/core.py
+    python benchmarks/core.py --db memory --quick --only get filter_all
+    python benchmarks/core.py --save-baseline benchmarks/baseline.json
+    python benchmarks/core.py --baseline other.json --tolerance 0.15
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apexorm import ApexORM, models                      # noqa: E402
+from apexorm.connection import SQLiteDB                  # noqa: E402
+from apexorm.testing import reset_model_state            # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+
+# ------------------- fixtures -------------------
+class Env:
+    """A fresh ORM + schema: Publisher <- Author <- Book >< Tag."""
+
+    def __init__(self, db_kind: str, workdir: str):
+        reset_model_state()
+        name = SQLiteDB.MEMORY if db_kind == "memory" else str(Path(workdir) / f"bench-{time.monotonic_ns()}.db")
+        self.orm = ApexORM(SQLiteDB(name))
+
+        class Publisher(models.Model):
+            id = models.IntegerField(primary_key=True)
+            name = models.CharField(max_length=100, nullable=False)
+
+        class Author(models.Model):
+            id = models.IntegerField(primary_key=True)
+            name = models.CharField(max_length=100, nullable=False)
+            publisher = models.ForeignKeyField("Publisher", related_name="authors", nullable=False)
+
+        class Book(models.Model):
+            id = models.IntegerField(primary_key=True)
+            title = models.CharField(max_length=200, nullable=False)
+            pages = models.IntegerField(nullable=True)
+            author = models.ForeignKeyField("Author", related_name="books", nullable=False)
+
+        class Tag(models.Model):
+            id = models.IntegerField(primary_key=True)
+            name = models.CharField(max_length=50, nullable=False)
+            books = models.ManyToManyField("Book", related_name="tags")
+
+        self.orm.register_models([Publisher, Author, Book, Tag])
+        self.orm.migrate()
+        self.Publisher, self.Author, self.Book, self.Tag = Publisher, Author, Book, Tag
+        self.session = self.orm.session
+
+    def seed(self, books: int, authors: int = 10, tags: int = 5):
+        """Bulk-insert rows directly so seeding doesn't dominate the run."""
+        from sqlalchemy import insert
+
+        s = self.session
+        s.execute(insert(self.Publisher), [{"id": 1, "name": "P"}])
+        s.execute(insert(self.Author), [{"id": i, "name": f"A{i}", "publisher_id": 1} for i in range(1, authors + 1)])
+        s.execute(insert(self.Tag), [{"id": i, "name": f"T{i}"} for i in range(1, tags + 1)])
+        s.execute(insert(self.Book), [
+            {"id": i, "title": f"Book {i}", "pages": i % 500, "author_id": i % authors + 1}
+            for i in range(1, books + 1)
+        ])
+        assoc = self.Book._tags_rel.property.secondary
+        s.execute(insert(assoc), [
+            {"tag_id": i % tags + 1, "book_id": i} for i in range(1, min(books, 1000) + 1)
+        ])
+        s.commit()
+        s.expunge_all()
+
+    def close(self):
+        self.session.close()
+        self.orm.engine.dispose()
+
+
+# ------------------- benchmarks -------------------
+# name -> (rows to seed, ops per call, skipped by --quick, fn(env) -> callable)
+BENCHMARKS = {}
+
+
+def benchmark(name, rows=0, ops=1, slow=False):
+    def register(fn):
+        BENCHMARKS[name] = (rows, ops, slow, fn)
+        return fn
+    return register
+
+
+@benchmark("save_single", rows=10)
+def _save_single(env):
+    author = env.Author.objects.first()
+
+    def run():
+        env.Book(title="New", pages=1, author=author).save()
+    return run
+
+
+@benchmark("save_batched_100", rows=10, ops=100)
+def _save_batched(env):
+    author = env.Author.objects.first()
+
+    def run():
+        for i in range(100):
+            env.Book(title=f"New {i}", pages=i, author=author).save(commit=False)
+        env.session.commit()
+    return run
+
+
+@benchmark("get", rows=1_000)
+def _get(env):
+    counter = iter(range(10**9))
+
+    def run():
+        env.Book.objects.get(id=next(counter) % 1_000 + 1)
+    return run
+
+
+def _filter_all(env):
+    def run():
+        env.Book.objects.filter(pages__gte=0).all()
+        env.session.expunge_all()
+    return run
+
+
+benchmark("filter_all_10", rows=10)(_filter_all)
+benchmark("filter_all_1k", rows=1_000)(_filter_all)
+benchmark("filter_all_100k", rows=100_000, slow=True)(_filter_all)
+
+
+def _readonly_all(env):
+    def run():
+        env.Book.objects.filter(pages__gte=0).readonly().all()
+    return run
+
+
+benchmark("readonly_all_1k", rows=1_000)(_readonly_all)
+benchmark("readonly_all_100k", rows=100_000, slow=True)(_readonly_all)
+
+
+@benchmark("values_1k", rows=1_000)
+def _values(env):
+    def run():
+        env.Book.objects.values("id", "title")
+        env.session.expunge_all()
+    return run
+
+
+@benchmark("values_list_flat_1k", rows=1_000)
+def _values_list(env):
+    def run():
+        env.Book.objects.values_list("title", flat=True)
+        env.session.expunge_all()
+    return run
+
+
+@benchmark("select_related_nested_1k", rows=1_000)
+def _select_related(env):
+    def run():
+        for book in env.Book.objects.select_related("author__publisher").all():
+            book.author.publisher.name
+        env.session.expunge_all()
+    return run
+
+
+@benchmark("prefetch_related_nested_1k", rows=1_000)
+def _prefetch_related(env):
+    def run():
+        for author in env.Author.objects.prefetch_related("books__tags").all():
+            for book in author.books:
+                len(book.tags)
+        env.session.expunge_all()
+    return run
+
+
+@benchmark("m2m_add_remove", rows=100, ops=2)
+def _m2m(env):
+    tag = env.Tag.objects.first()
+    book = env.Book.objects.get(id=100)
+
+    def run():
+        tag.books.add(book)
+        tag.books.remove(book)
+    return run
+
+
+@benchmark("slice_1k", rows=1_000)
+def _slice(env):
+    def run():
+        env.Book.objects.order_by("id")[500:520].all()
+        env.Book.objects.order_by("id")[42]
+        env.session.expunge_all()
+    return run
+
+
+# ------------------- runner -------------------
+@dataclass
+class Result:
+    name: str
+    db: str
+    ops_per_sec: float
+    peak_kib: float
+    queries_per_op: float
+
+    @property
+    def key(self):
+        return f"{self.db}:{self.name}"
+
+
+def measure(name, db_kind, workdir, repeat) -> Result:
+    rows, ops, _slow, setup = BENCHMARKS[name]
+    env = Env(db_kind, workdir)
+    try:
+        env.seed(rows)
+        run = setup(env)
+        run()  # warm up caches (compiled SQL, mapper configuration)
+
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        run()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        with env.orm.capture_queries() as log:
+            run()
+    finally:
+        env.close()
+
+    return Result(
+        name=name,
+        db=db_kind,
+        ops_per_sec=round(ops / statistics.median(timings), 2),
+        peak_kib=round(peak / 1024, 1),
+        queries_per_op=round(len(log) / ops, 2),
+    )
+
+
+def compare(results: list[Result], baseline: dict, tolerance: float) -> list[str]:
+    """Return one message per regression against `baseline` (key -> Result dict)."""
+    regressions = []
+    for r in results:
+        base = baseline.get(r.key)
+        if base is None:
+            continue
+        if r.ops_per_sec < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(f"{r.key}: {r.ops_per_sec:.0f} ops/sec, baseline {base['ops_per_sec']:.0f}")
+        if r.peak_kib > base["peak_kib"] * (1 + tolerance) + 1:
+            regressions.append(f"{r.key}: {r.peak_kib:.0f} KiB peak, baseline {base['peak_kib']:.0f}")
+        if r.queries_per_op > base["queries_per_op"]:
+            regressions.append(f"{r.key}: {r.queries_per_op} queries/op, baseline {base['queries_per_op']}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", choices=["file", "memory", "both"], default="both")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-row benchmarks")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run benchmarks whose name starts with NAME")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="compare against a stored baseline (default: benchmarks/baseline.json)")
+    parser.add_argument("--no-baseline", dest="baseline", action="store_const", const=None,
+                        help="don't compare against a baseline")
+    parser.add_argument("--save-baseline", type=Path, help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown/alloc growth (default 0.2)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    names = [
+        n for n, (_rows, _ops, slow, _fn) in BENCHMARKS.items()
+        if (not args.only or n.startswith(tuple(args.only))) and not (args.quick and slow)
+    ]
+    db_kinds = ["file", "memory"] if args.db == "both" else [args.db]
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for db_kind in db_kinds:
+            for name in names:
+                results.append(measure(name, db_kind, workdir, args.repeat))
+    reset_model_state()
+
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(f"{'benchmark':<36}{'ops/sec':>12}{'peak KiB':>12}{'queries/op':>12}")
+        for r in results:
+            print(f"{r.key:<36}{r.ops_per_sec:>12.1f}{r.peak_kib:>12.1f}{r.queries_per_op:>12.2f}")
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps({r.key: asdict(r) for r in results}, indent=2) + "\n")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# benchmarks/startup.py
+"""
+Cold-start benchmark.
+
+Every scenario runs in a fresh interpreter under `python -X importtime`, from an
+empty working directory. For each one we report the median total import time
+(sum of top-level cumulative times), the median process wall time, and any files
+the process left behind in its working directory (there should be none besides
+the scenario's own database).
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 20 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SCENARIOS = {
+    "import apexorm": "import apexorm",
+    "import apexorm.connection": "import apexorm.connection",
+    "define models": """
+from apexorm import models
+class User(models.Model):
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    avatar = models.ImageField(nullable=True)
+""",
+    "connect + migrate": """
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+orm = ApexORM(SQLiteDB("bench.db"))
+class User(models.Model):
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+orm.register_models([User])
+orm.migrate()
+orm.migrate()
+""",
+}
+
+EXPECTED_FILES = {"bench.db"}
+
+
+def parse_importtime(stderr: str) -> float:
+    """Total import time in ms: cumulative time of every top-level import."""
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # one leading space => imported by the script itself
+            total_us += int(cumulative_us)
+    return total_us / 1000
+
+
+def run_once(code: str) -> tuple[float, float, list[str]]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE="1")
+    with tempfile.TemporaryDirectory() as cwd:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=cwd, env=env, capture_output=True, text=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(f"scenario failed:\n{proc.stderr[-2000:]}")
+        leftovers = sorted(set(os.listdir(cwd)) - EXPECTED_FILES)
+    return parse_importtime(proc.stderr), wall_ms, leftovers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        imports, walls, leftovers = [], [], set()
+        for _ in range(args.repeat):
+            import_ms, wall_ms, left = run_once(code)
+            imports.append(import_ms)
+            walls.append(wall_ms)
+            leftovers.update(left)
+        results[name] = {
+            "import_ms": round(statistics.median(imports), 2),
+            "wall_ms": round(statistics.median(walls), 2),
+            "side_effects": sorted(leftovers),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'scenario':<28}{'imports (ms)':>14}{'wall (ms)':>12}  side effects")
+    for name, r in results.items():
+        print(f"{name:<28}{r['import_ms']:>14.2f}{r['wall_ms']:>12.2f}  {', '.join(r['side_effects']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
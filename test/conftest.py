@@ -12,7 +12,7 @@ from apexorm import ApexORM
 from apexorm.connection import SQLiteDB
 from apexorm.testing import reset_model_state
 from apexorm.models import Base
-from apexorm.models.relations import MODEL_REGISTRY, PENDING_BACKREFS, M2M_ASSOC_TABLES
+from apexorm.models.relations import MODEL_REGISTRY, PENDING_BACKREFS, PENDING_COUNTERS, M2M_ASSOC_TABLES
 
 
 @pytest.fixture(autouse=True)
@@ -21,12 +21,14 @@ def clean_model_registry():
     Base.registry.dispose()
     MODEL_REGISTRY.clear()
     PENDING_BACKREFS.clear()
+    PENDING_COUNTERS.clear()
     M2M_ASSOC_TABLES.clear()
     yield
     # run AFTER each test (belt & suspenders)
     Base.registry.dispose()
     MODEL_REGISTRY.clear()
     PENDING_BACKREFS.clear()
+    PENDING_COUNTERS.clear()
     M2M_ASSOC_TABLES.clear()
 
 @pytest.fixture(autouse=True)
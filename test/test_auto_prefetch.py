@@ -0,0 +1,85 @@
+# test/test_auto_prefetch.py
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+from apexorm.testing import assert_num_queries
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Profile(models.Model):
+        id = models.IntegerField(primary_key=True)
+        bio = models.CharField(max_length=200, nullable=True)
+        author = models.OneToOneField("Author", related_name="profile", nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200, nullable=False)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=False)
+
+    class Shelf(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+        books = models.ManyToManyField("Book", related_name="shelves")
+
+    orm.register_models([Author, Profile, Book, Shelf])
+    orm.migrate()
+    return Author, Profile, Book, Shelf
+
+def seed(Author, Profile, Book, Shelf, n=4):
+    for i in range(n):
+        a = Author(name=f"A{i}").save()
+        Profile(bio=f"bio {i}", author=a).save()
+        b1 = Book(title=f"B{i}a", author=a).save()
+        b2 = Book(title=f"B{i}b", author=a).save()
+        s = Shelf(name=f"S{i}").save()
+        s.books.add(b1, b2)
+    Author._session.expunge_all()
+
+def test_fk_reverse_fk_and_o2o_load_in_one_query_each(orm):
+    Author, Profile, Book, Shelf = register_models(orm)
+    seed(Author, Profile, Book, Shelf)
+
+    books = Book.objects.auto_prefetch().filter(title__endswith="a").all()
+    with assert_num_queries(orm, 1):
+        assert [b.author.name for b in books] == ["A0", "A1", "A2", "A3"]
+
+    # books + the selectin of their M2M shelves, then profiles
+    authors = Author.objects.auto_prefetch().order_by("id").all()
+    with assert_num_queries(orm, 3) as log:
+        assert [len(a.books) for a in authors] == [2, 2, 2, 2]
+        assert [a.profile.bio for a in authors] == ["bio 0", "bio 1", "bio 2", "bio 3"]
+    assert {e.relationship for e in log.lazy_loads} == {"Author.books", "Author.profile"}
+
+def test_m2m_collections_are_batched_after_expiry(orm):
+    Author, Profile, Book, Shelf = register_models(orm)
+    seed(Author, Profile, Book, Shelf)
+
+    shelves = Shelf.objects.auto_prefetch().all()
+    for shelf in shelves:
+        Shelf._session.expire(shelf, ["_books_rel"])
+    with assert_num_queries(orm, 2):
+        assert sorted(len(list(s.books)) for s in shelves) == [2, 2, 2, 2]
+
+def test_off_by_default_and_global_switch(tmp_path):
+    orm = ApexORM(SQLiteDB(str(tmp_path / "off.db")))
+    Author, Profile, Book, Shelf = register_models(orm)
+    seed(Author, Profile, Book, Shelf)
+    # the book query also selectin-loads the books' shelves
+    with assert_num_queries(orm, 6):
+        for book in Book.objects.filter(title__endswith="a").all():
+            book.author.name
+
+    from apexorm.testing import reset_model_state
+    reset_model_state()
+    orm = ApexORM(SQLiteDB(str(tmp_path / "on.db")), auto_prefetch=True)
+    Author, Profile, Book, Shelf = register_models(orm)
+    seed(Author, Profile, Book, Shelf)
+    with assert_num_queries(orm, 3):
+        for book in Book.objects.filter(title__endswith="a").all():
+            book.author.name
+    Book._session.expunge_all()
+    with assert_num_queries(orm, 6):
+        for book in Book.objects.auto_prefetch(False).filter(title__endswith="a").all():
+            book.author.name
@@ -0,0 +1,34 @@
+# test/test_benchmarks.py
+import importlib.util
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def load_core():
+    spec = importlib.util.spec_from_file_location("bench_core", ROOT / "benchmarks" / "core.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_measure_reports_ops_memory_and_queries(tmp_path):
+    core = load_core()
+    result = core.measure("get", "memory", str(tmp_path), repeat=1)
+    assert result.key == "memory:get"
+    assert result.ops_per_sec > 0 and result.peak_kib > 0
+    # the lookup + the selectin of Book.tags
+    assert result.queries_per_op == 2
+
+def test_committed_baseline_covers_every_benchmark():
+    core = load_core()
+    baseline = json.loads(core.DEFAULT_BASELINE.read_text())
+    assert set(baseline) == {f"{db}:{name}" for db in ("file", "memory") for name in core.BENCHMARKS}
+    assert baseline["memory:get"]["queries_per_op"] == 2
+
+def test_compare_flags_regressions():
+    core = load_core()
+    base = {"file:get": {"ops_per_sec": 1000, "peak_kib": 50, "queries_per_op": 1}}
+    same = core.Result("get", "file", 950, 52, 1)
+    worse = core.Result("get", "file", 500, 200, 2)
+    assert core.compare([same], base, tolerance=0.2) == []
+    assert len(core.compare([worse], base, tolerance=0.2)) == 3
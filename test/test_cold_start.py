@@ -0,0 +1,67 @@
+# test/test_cold_start.py
+import subprocess
+import sys
+import types
+from pathlib import Path
+import apexorm
+from apexorm import models
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def run_in(cwd, code):
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, env={"PYTHONPATH": str(ROOT)},
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+def test_import_has_no_side_effects_and_defers_sqlalchemy(tmp_path):
+    out = run_in(tmp_path, "import sys, apexorm; print('sqlalchemy' in sys.modules)")
+    assert out == "False"
+
+    run_in(tmp_path, "from apexorm.models import fields; fields.FileField()")
+    assert list(tmp_path.iterdir()) == []
+
+def test_default_storage_is_created_lazily():
+    field = models.FileField(upload_to="docs")
+    assert field._storage is None
+    assert field.storage is models.get_default_storage()
+
+def make_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+def test_manifest_and_cached_discovery(orm, monkeypatch):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+
+    class Draft(models.Model):
+        id = models.IntegerField(primary_key=True)
+
+    make_module("manifest_app", Author=Author, Draft=Draft, __apexorm_models__=[Author])
+    monkeypatch.setattr(apexorm, "_DISCOVERY_CACHE", {})
+    try:
+        orm.register_model_paths(["manifest_app"])
+        assert orm.models == [Author]
+        assert apexorm._DISCOVERY_CACHE["manifest_app"] == [Author]
+
+        orm.register_manifest(["manifest_app:Draft"])
+        assert orm.models == [Author, Draft]
+        assert Draft.objects is not None
+    finally:
+        del sys.modules["manifest_app"]
+
+def test_reset_model_state_forgets_discovered_models(orm):
+    from apexorm.testing import reset_model_state
+
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+
+    make_module("reset_app", Author=Author)
+    try:
+        assert apexorm.discover_models("reset_app") == [Author]
+        reset_model_state()
+        assert "reset_app" not in apexorm._DISCOVERY_CACHE
+    finally:
+        del sys.modules["reset_app"]
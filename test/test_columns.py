@@ -0,0 +1,55 @@
+# test/test_columns.py
+from array import array
+import pytest
+from apexorm import models
+
+def register_models(orm):
+    class Sale(models.Model):
+        id = models.IntegerField(primary_key=True)
+        region = models.CharField(max_length=20, nullable=False)
+        units = models.IntegerField(nullable=True)
+        amount = models.FloatField(nullable=False)
+        refunded = models.BooleanField(nullable=True)
+
+    orm.register_models([Sale])
+    orm.migrate()
+    return Sale
+
+def seed(Sale):
+    for i in range(6):
+        Sale(region="EU" if i % 2 else "US", units=None if i == 4 else i,
+             amount=i * 1.5, refunded=i % 3 == 0).save()
+    Sale._session.expunge_all()
+
+def test_typed_buffers_with_null_mask(orm):
+    Sale = register_models(orm)
+    seed(Sale)
+
+    cols = Sale.objects.order_by("id").to_columns("units", "amount", "refunded", "region", chunk_size=4, numpy=False)
+    assert isinstance(cols["units"].values, array) and cols["units"].values.typecode == "q"
+    assert cols["units"].tolist() == [0, 1, 2, 3, None, 5]
+    assert list(cols["units"].mask) == [0, 0, 0, 0, 1, 0]
+    assert cols["amount"].values == array("d", [0.0, 1.5, 3.0, 4.5, 6.0, 7.5])
+    assert cols["amount"].mask is None
+    assert cols["refunded"].tolist() == [True, False, False, True, False, False]
+    assert all(type(v) is bool for v in cols["refunded"].tolist())
+    assert cols["region"].values == ["US", "EU", "US", "EU", "US", "EU"]
+    assert len(Sale._session.identity_map) == 0
+
+def test_filtered_and_all_columns(orm):
+    Sale = register_models(orm)
+    seed(Sale)
+    cols = Sale.objects.filter(region="EU").to_columns(numpy=False)
+    assert set(cols) == {"id", "region", "units", "amount", "refunded"}
+    assert list(cols["id"].values) == [2, 4, 6]
+
+def test_numpy_arrays_when_installed(orm):
+    np = pytest.importorskip("numpy")
+    Sale = register_models(orm)
+    seed(Sale)
+    cols = Sale.objects.order_by("id").to_columns("units", "refunded", numpy=True)
+    assert cols["units"].values.dtype == np.int64
+    assert cols["units"].mask.tolist() == [False, False, False, False, True, False]
+    assert cols["refunded"].values.dtype == np.bool_
+    assert cols["refunded"].values.tolist() == [True, False, False, True, False, False]
+    assert cols["refunded"][0] is True and cols["units"][1] == 1 and type(cols["units"][1]) is int
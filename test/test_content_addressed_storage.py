@@ -0,0 +1,61 @@
+# test/test_content_addressed_storage.py
+import os
+from apexorm import models
+from apexorm.models.storage import cleanup
+from apexorm.models.storage.cas import ContentAddressedStorageBackend
+
+def blob_count(storage):
+    root = os.path.join(storage.base_dir, ".cas")
+    return sum(len(files) for path, _dirs, files in os.walk(root) if os.path.basename(path) != "tmp")
+
+def test_duplicates_share_one_blob_until_the_last_delete(tmp_path):
+    storage = ContentAddressedStorageBackend(base_dir=str(tmp_path / "media"))
+
+    a = storage.save("avatars", "me.png", b"same bytes")
+    b = storage.save("avatars", "you.png", b"same bytes")
+    c = storage.save("docs", "other.txt", b"different")
+    assert a != b and a.endswith(".png") and c.startswith("docs/")
+    assert os.path.samefile(storage.url(a), storage.url(b))
+    assert blob_count(storage) == 2 and storage.refcount(a) == 2
+
+    storage.delete(a)
+    assert not os.path.exists(storage.url(a))
+    with open(storage.url(b), "rb") as f:
+        assert f.read() == b"same bytes"
+    assert storage.refcount(b) == 1
+
+    storage.delete(b)
+    storage.delete(c)
+    assert blob_count(storage) == 0
+
+def test_blob_is_sharded_by_checksum(tmp_path):
+    storage = ContentAddressedStorageBackend(base_dir=str(tmp_path / "media"))
+    stored = storage.store("docs", "a.txt", iter([b"hello ", b"world"]))
+    blob = storage.blob_path(stored.checksum)
+    assert blob.endswith(os.path.join(".cas", stored.checksum[:2], stored.checksum[2:4], stored.checksum))
+    assert os.path.exists(blob) and os.listdir(os.path.join(storage.base_dir, ".cas", "tmp")) == []
+
+def test_collect_garbage_removes_unreferenced_blobs(tmp_path):
+    storage = ContentAddressedStorageBackend(base_dir=str(tmp_path / "media"))
+    path = storage.save("docs", "a.txt", b"x")
+    os.remove(storage.url(path))          # reference removed behind the backend's back
+    assert storage.collect_garbage() == 1 and blob_count(storage) == 0
+
+def test_file_field_works_unchanged(tmp_path):
+    storage = ContentAddressedStorageBackend(base_dir=str(tmp_path / "media"))
+    field = models.FileField(upload_to="files", storage=storage)
+    field.attr_name = "attachment"
+
+    class Doc:
+        attachment = None
+
+    first, second = Doc(), Doc()
+    field.save_file(first, "a.txt", b"payload")
+    field.save_file(second, "b.txt", b"payload")
+    field.save_file(first, "c.txt", b"replaced")     # the old reference is released
+    cleanup.wait()
+    assert storage.refcount(second.attachment) == 1
+    field.delete_file(second)
+    field.delete_file(first)
+    cleanup.wait()    # without a session, deletions run right away in the background
+    assert second.attachment is None and blob_count(storage) == 0
@@ -0,0 +1,77 @@
+# test/test_counter_cache.py
+import io
+import pytest
+from sqlalchemy import text
+from apexorm import models
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False, unique=True)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        isbn = models.CharField(max_length=20, nullable=False, unique=True)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=True, counter_cache=True)
+
+    orm.register_models([Author, Book])
+    orm.migrate()
+    return Author, Book
+
+def counts(Author):
+    return {a.name: a.books_count for a in Author.objects.order_by("name").all()}
+
+def test_save_delete_and_reassignment_update_the_counter_in_sql(orm):
+    Author, Book = register_models(orm)
+    le_guin, herbert = Author(name="Le Guin"), Author(name="Herbert")
+    le_guin.save()
+    herbert.save()
+    assert le_guin.books_count == 0
+
+    books = [Book(isbn=str(i), author=le_guin).save() for i in range(3)]
+    assert le_guin.books_count == 3   # loaded instances are refreshed
+
+    with orm.capture_queries() as log:
+        books[0].author = herbert
+        books[0].save()
+    assert any("books_count=(author.books_count + ?)" in e.statement for e in log)
+    books[1].delete()
+    books[2].author_id = None
+    books[2].save()
+    assert counts(Author) == {"Herbert": 1, "Le Guin": 0}
+
+def test_bulk_writes_keep_counters_in_step(orm):
+    Author, Book = register_models(orm)
+    a, b = Author(name="A"), Author(name="B")
+    a.save()
+    b.save()
+
+    Book.objects.bulk_upsert([{"isbn": "1", "author_id": a.id}, {"isbn": "2", "author_id": a.id}])
+    assert counts(Author) == {"A": 2, "B": 0}
+    Book.objects.bulk_upsert([{"isbn": "2", "author_id": b.id}])            # moves a book
+    assert counts(Author) == {"A": 1, "B": 1}
+
+    Book.objects.get_or_create(isbn="3", defaults={"author": b})
+    Book.objects.get_or_create(isbn="3", defaults={"author": b})
+    Book.objects.update_or_create(isbn="1", defaults={"author_id": b.id})
+    assert counts(Author) == {"A": 0, "B": 3}
+
+    Book.objects.load_csv(io.StringIO(f"isbn,author_id\n4,{a.id}\n5,{a.id}\n"))
+    Author.objects.load_csv(io.StringIO("name\nC\n"))   # the counter column fills itself
+    orm.session.expire_all()
+    assert counts(Author) == {"A": 2, "B": 3, "C": 0}
+
+def test_recount_repairs_drift(orm):
+    Author, Book = register_models(orm)
+    author = Author(name="A")
+    author.save()
+    Book(isbn="1", author=author).save()
+    with orm.engine.begin() as connection:
+        connection.execute(text("INSERT INTO book (isbn, author_id) VALUES ('2', :a)"), {"a": author.id})
+        connection.execute(text("UPDATE author SET books_count = 7"))
+
+    assert Author.objects.recount() == 1
+    assert Author.objects.get(name="A").books_count == 2
+    assert Author.objects.recount() == 0
+    with pytest.raises(ValueError, match="no counter_cache"):
+        Book.objects.recount()
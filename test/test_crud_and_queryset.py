@@ -93,3 +93,13 @@ def test_order_limit_offset_values(orm):
     # flat invalid usage
     with pytest.raises(ValueError):
         User.objects.values_list("id", "name", flat=True)
+
+def test_aggregate(orm):
+    User = register_user(orm)
+    seed_users(User)
+    stats = User.objects.filter(name__startswith="jo").aggregate(
+        n=models.Count(), described=models.Count("description"), first=models.Min("name"),
+        mean_id=models.Avg("id"),
+    )
+    assert stats == {"n": 3, "described": 3, "first": "Joe Doe", "mean_id": (1 + 2 + 5) / 3}
+    assert User.objects.filter(id__gt=99).aggregate(top=models.Max("id"), n=models.Count()) == {"top": None, "n": 0}
@@ -0,0 +1,60 @@
+# test/test_explain.py
+from apexorm import models
+from apexorm.models.explain import ExplainResult, _analyze_sqlite
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200, nullable=False, db_index=True)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=False)
+
+    orm.register_models([Author, Book])
+    orm.migrate()
+    return Author, Book
+
+def test_index_lookup_is_clean(orm):
+    Author, Book = register_models(orm)
+    result = Book.objects.filter(title="Dune").explain()
+    assert isinstance(result, ExplainResult)
+    assert result.used_indexes == ["ix_book_title"]
+    assert result.ok and "SEARCH book USING INDEX ix_book_title" in str(result)
+
+def test_flags_full_scans_ilike_and_unused_indexes(orm):
+    Author, Book = register_models(orm)
+    result = Book.objects.filter(title__have="dune").explain()
+    assert result.full_scans == ["book"]
+    assert result.unused_indexes == ["ix_book_title"]
+    assert len(result.warnings) == 1 and "book.title" in result.warnings[0]
+    assert not result.ok
+
+    search = Book.objects.search(title__startswith="Du").explain()
+    assert search.full_scans == ["book"] and search.warnings
+
+def test_flags_temp_btree_for_order_by(orm):
+    Author, Book = register_models(orm)
+    result = Book.objects.filter(author_id=1).order_by("-title").explain()
+    assert result.used_indexes == ["ix_book_author_id"]
+    assert result.temp_btrees == ["ORDER BY"]
+
+def test_analyze_runs_the_query(orm):
+    Author, Book = register_models(orm)
+    a = Author(name="Frank").save()
+    Book(title="Dune", author=a).save()
+    Book(title="Emma", author=a).save()
+
+    result = Book.objects.filter(author_id=a.id).explain(analyze=True)
+    assert result.rows == 2 and result.duration > 0
+
+def test_parses_the_pre_3_36_sqlite_plan_format():
+    result = ExplainResult("SELECT ...", "sqlite", [
+        (2, 0, 0, "SEARCH TABLE book USING INDEX ix_book_author_id (author_id=?)"),
+        (5, 0, 0, "SCAN TABLE author"),
+        (7, 0, 0, "SEARCH TABLE publisher USING INTEGER PRIMARY KEY (rowid=?)"),
+    ])
+    _analyze_sqlite(result)
+    assert result.full_scans == ["author"]
+    assert result.used_indexes == ["ix_book_author_id", "publisher (primary key)"]
@@ -0,0 +1,54 @@
+# test/test_export.py
+import csv
+import datetime
+import io
+import json
+from apexorm import models
+
+def register_models(orm):
+    class Event(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+        ref = models.UUIDField(nullable=True)
+        starts = models.DateTimeField(nullable=True)
+        day = models.DateField(nullable=True)
+        meta = models.JSONField(nullable=True)
+
+    orm.register_models([Event])
+    orm.migrate()
+    return Event
+
+def seed(Event, n=5):
+    for i in range(n):
+        Event(
+            name=f"E{i}", ref=f"00000000-0000-0000-0000-00000000000{i}",
+            starts=datetime.datetime(2024, 5, 1, 12, i), day=datetime.date(2024, 5, i + 1),
+            meta={"i": i, "tags": ["a"]},
+        ).save()
+    Event._session.expunge_all()
+
+def test_to_csv_streams_typed_columns(orm, tmp_path):
+    Event = register_models(orm)
+    seed(Event)
+
+    path = tmp_path / "events.csv"
+    count = Event.objects.filter(id__gte=2).order_by("id").to_csv(path, chunk_size=2)
+    rows = list(csv.reader(path.open(newline="")))
+
+    assert count == 4
+    assert rows[0] == ["id", "name", "ref", "starts", "day", "meta"]
+    assert rows[1] == ["2", "E1", "00000000-0000-0000-0000-000000000001",
+                       "2024-05-01T12:01:00", "2024-05-02", '{"i":1,"tags":["a"]}']
+    assert len(rows) == 5
+    # nothing was hydrated into the session
+    assert len(Event._session.identity_map) == 0
+
+def test_to_jsonl_to_file_object_with_selected_fields(orm):
+    Event = register_models(orm)
+    seed(Event)
+
+    buf = io.StringIO()
+    assert Event.objects.to_jsonl(buf, "name", "day", "meta", chunk_size=3) == 5
+    lines = [json.loads(line) for line in buf.getvalue().splitlines()]
+    assert lines[0] == {"name": "E0", "day": "2024-05-01", "meta": {"i": 0, "tags": ["a"]}}
+    assert [line["name"] for line in lines] == ["E0", "E1", "E2", "E3", "E4"]
@@ -0,0 +1,69 @@
+# test/test_file_cleanup.py
+import os
+from apexorm import models
+from apexorm.models.storage import cleanup
+from apexorm.models.storage.local import LocalStorageBackend
+
+def register_models(orm, storage):
+    class Document(models.Model):
+        id = models.IntegerField(primary_key=True)
+        attachment = models.FileField(upload_to="docs", storage=storage)
+
+    orm.register_models([Document])
+    orm.migrate()
+    return Document
+
+def test_replaced_file_is_deleted_only_after_commit(orm, tmp_path):
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+    Document = register_models(orm, storage)
+    field = Document.__fields__["attachment"]
+
+    doc = Document()
+    old = field.save_file(doc, "a.txt", b"v1")
+    doc.save()
+    new = field.save_file(doc, "b.txt", b"v2")
+    cleanup.wait()
+    assert os.path.exists(storage.url(old))      # row still points at it until commit
+
+    doc.save()
+    cleanup.wait()
+    assert not os.path.exists(storage.url(old)) and os.path.exists(storage.url(new))
+
+def test_rollback_keeps_the_old_file_and_drops_the_new_one(orm, tmp_path):
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+    Document = register_models(orm, storage)
+    field = Document.__fields__["attachment"]
+
+    doc = Document()
+    old = field.save_file(doc, "a.txt", b"v1")
+    doc.save()
+    new = field.save_file(doc, "b.txt", b"v2")
+    field.delete_file(doc)
+    Document._session.rollback()
+    cleanup.wait()
+    assert os.path.exists(storage.url(old)) and not os.path.exists(storage.url(new))
+
+    Document._session.refresh(doc)
+    field.delete_file(doc)
+    doc.save()
+    cleanup.wait()
+    assert not os.path.exists(storage.url(old))
+
+def test_sweeper_deletes_only_unreferenced_files(orm, tmp_path):
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+    Document = register_models(orm, storage)
+    field = Document.__fields__["attachment"]
+
+    doc = Document()
+    kept = field.save_file(doc, "kept.txt", b"kept")
+    doc.save()
+    orphan = storage.save("docs", "orphan.txt", b"lost")
+
+    # freshly written files may belong to rows that aren't committed yet
+    assert orm.sweep_orphaned_files().orphans == []
+
+    report = orm.sweep_orphaned_files(dry_run=True, grace_period=0)
+    assert report.orphans == [orphan] and report.scanned == 2 and os.path.exists(storage.url(orphan))
+
+    orm.sweep_orphaned_files(grace_period=0)
+    assert not os.path.exists(storage.url(orphan)) and os.path.exists(storage.url(kept))
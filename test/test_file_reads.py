@@ -0,0 +1,79 @@
+# test/test_file_reads.py
+import io
+import pytest
+from apexorm import models
+from apexorm.models.storage.base import BaseStorageBackend
+from apexorm.models.storage.cas import ContentAddressedStorageBackend
+from apexorm.models.storage.local import LocalStorageBackend
+
+DATA = bytes(range(256)) * 400   # 100 KiB
+
+def test_ranged_and_mapped_reads(tmp_path):
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+    path = storage.save("media", "clip.bin", DATA)
+
+    assert storage.read_range(path, 1000, 24) == DATA[1000:1024]
+    assert storage.read_range(path, len(DATA) - 10) == DATA[-10:]
+    assert storage.read_range(path, len(DATA) + 5, 10) == b""   # past EOF, like an HTTP range clamp
+    with storage.open(path) as f:
+        assert f.read(4) == DATA[:4]
+    with storage.mmap(path) as m, memoryview(m)[512:1024] as view:
+        assert view == DATA[512:1024]
+
+    empty = storage.save("media", "empty.bin", b"")
+    with pytest.raises(ValueError):
+        storage.mmap(empty)
+
+def test_file_field_accessor(orm, tmp_path):
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+
+    class Video(models.Model):
+        id = models.IntegerField(primary_key=True)
+        clip = models.FileField(upload_to="clips", storage=storage)
+
+    orm.register_models([Video])
+    orm.migrate()
+
+    video = Video()
+    assert not video.clip_file
+    video.clip_file.save("clip.bin", DATA)
+    video.save()
+
+    loaded = Video.objects.get(id=video.id)
+    assert loaded.clip_file.name == video.clip and loaded.clip_file.size == len(DATA)
+    assert loaded.clip_file.read_range(100, 50) == DATA[100:150]
+    with loaded.clip_file.mmap() as m:
+        assert m[-3:] == DATA[-3:]
+
+class MemoryStorage(BaseStorageBackend):
+    """A non-filesystem backend: url() is a public URL, not a path."""
+    def __init__(self):
+        self.files = {}
+
+    def save(self, folder, file_name, file_data):
+        path = f"{folder}/{file_name}"
+        self.files[path] = file_data
+        return path
+
+    def delete(self, path):
+        self.files.pop(path, None)
+
+    def url(self, path):
+        return f"https://cdn.example.com/{path}"
+
+    def open(self, path):
+        return io.BytesIO(self.files[path])
+
+def test_size_comes_from_the_backend(orm, tmp_path):
+    cas = ContentAddressedStorageBackend(base_dir=str(tmp_path / "cas"))
+    assert cas.size(cas.save("docs", "a.bin", DATA)) == len(DATA)
+
+    class Attachment(models.Model):
+        id = models.IntegerField(primary_key=True)
+        blob = models.FileField(upload_to="blobs", storage=MemoryStorage())
+
+    orm.register_models([Attachment])
+    orm.migrate()
+    attachment = Attachment()
+    attachment.blob_file.save("a.bin", DATA[:1000])
+    assert attachment.blob_file.url.startswith("https://") and attachment.blob_file.size == 1000
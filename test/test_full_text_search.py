@@ -0,0 +1,126 @@
+# test/test_full_text_search.py
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql, postgresql
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+from apexorm.testing import reset_model_state
+
+def register_models(orm, search_fields=("title", "blurb")):
+    meta = type("Meta", (), {"search_fields": list(search_fields)} if search_fields else {})
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200, nullable=False)
+        blurb = models.TextField(nullable=True)
+        isbn = models.CharField(max_length=20, nullable=True)
+        Meta = meta
+
+    orm.register_models([Book])
+    return Book
+
+def fresh_orm(db_path):
+    reset_model_state()
+    return ApexORM(db=SQLiteDB(db_path))
+
+def seed(Book):
+    for title, blurb in [
+        ("Dune", "Spice, sand and a desert planet."),
+        ("Dune Messiah", "Paul rules the desert empire."),
+        ("Neuromancer", "Cyberspace heist; a desert of data."),
+        ("Solaris", "An ocean planet that thinks."),
+    ]:
+        Book(title=title, blurb=blurb).save()
+
+def titles(qs):
+    return [b.title for b in qs.all()]
+
+def test_fts5_index_is_created_and_kept_in_sync(orm):
+    Book = register_models(orm)
+    orm.migrate()
+    seed(Book)
+
+    assert titles(Book.objects.search("desert planet")) == ["Dune"]
+    assert set(titles(Book.objects.search("plan"))) == {"Dune", "Solaris"}   # prefix match
+    assert titles(Book.objects.search(title__have="messiah")) == ["Dune Messiah"]
+
+    book = Book.objects.get(title="Solaris")
+    book.blurb = "A sentient ocean."
+    book.save()
+    Book.objects.get(title="Neuromancer").delete()
+    assert titles(Book.objects.search("planet")) == ["Dune"]
+    assert titles(Book.objects.search("sentient")) == ["Solaris"]
+    assert Book.objects.search("cyberspace").count() == 0
+
+def test_results_are_ranked_by_relevance(orm):
+    Book = register_models(orm)
+    orm.migrate()
+    seed(Book)
+    Book(title="Deserts of the world", blurb="desert desert desert").save()
+    assert titles(Book.objects.search("desert"))[0] == "Deserts of the world"
+
+    for empty in ("", "   ", "?!"):
+        with pytest.raises(ValueError, match="at least one word"):
+            Book.objects.search(empty)
+
+def test_search_uses_the_index_not_ilike(orm):
+    Book = register_models(orm)
+    orm.migrate()
+    with orm.capture_queries() as log:
+        Book.objects.search("dune").all()
+    assert "MATCH" in log[0].statement and "LIKE" not in log[0].statement.upper()
+
+    # field lookups keep their ILIKE meaning, search_fields or not
+    with orm.capture_queries() as log:
+        Book.objects.search(title__have="dune").all()
+    assert "LIKE" in log[0].statement.upper() and "MATCH" not in log[0].statement
+
+def test_field_lookups_keep_substring_and_anchored_semantics(orm):
+    Book = register_models(orm)
+    orm.migrate()
+    seed(Book)
+    assert titles(Book.objects.search(title__have="essia")) == ["Dune Messiah"]         # substring
+    assert titles(Book.objects.search(title__startswith="Messiah")) == []              # anchored
+    assert titles(Book.objects.search(title__have="Dune Messiah")) == ["Dune Messiah"]  # phrase
+    assert titles(Book.objects.search(title__have="Messiah Dune")) == []
+    # the lookup names a field: a match in another search field doesn't count
+    assert titles(Book.objects.search(title__have="desert")) == []
+
+def test_migrate_indexes_existing_rows_and_drops_undeclared_index(db_path):
+    orm = fresh_orm(db_path)
+    Book = register_models(orm, search_fields=None)
+    orm.migrate()
+    seed(Book)
+
+    orm = fresh_orm(db_path)
+    Book = register_models(orm)
+    assert [op.kind for op in orm.migrate()] == ["create_search_index"]
+    assert titles(Book.objects.search("ocean")) == ["Solaris"]
+    assert orm.migrate() == []
+
+    orm = fresh_orm(db_path)
+    register_models(orm, search_fields=None)
+    assert [op.kind for op in orm.migrate(allow_drop=True)] == ["drop_search_index"]
+    with orm.engine.connect() as connection:
+        leftovers = connection.execute(text("SELECT count(*) FROM sqlite_master WHERE name LIKE 'book_fts%'"))
+        assert leftovers.scalar() == 0
+
+def test_postgres_and_mysql_ddl_and_queries(orm):
+    Book = register_models(orm)
+    search = Book.__table__.info["apexorm_search"]
+    query = orm.session.query(Book)
+
+    pg = postgresql.dialect()
+    assert search.create_statements(pg) == [
+        "CREATE INDEX fts_book ON book USING GIN (to_tsvector('english'::regconfig, "
+        "coalesce(title, '') || ' ' || coalesce(blurb, '')))"
+    ]
+    sql = search.apply(query, Book, "postgresql", ["dune", "spice"]).statement.compile(dialect=pg)
+    assert "@@ to_tsquery('english'::regconfig" in str(sql) and "ts_rank" in str(sql)
+    assert "dune:* & spice:*" in sql.params.values()
+
+    my = mysql.dialect()
+    assert search.create_statements(my) == ["CREATE FULLTEXT INDEX fts_book ON book (title, blurb)"]
+    sql = search.apply(query, Book, "mysql", ["dune", "spice"]).statement.compile(dialect=my)
+    assert "MATCH (book.title, book.blurb) AGAINST" in str(sql)
+    assert "+dune* +spice*" in sql.params.values()
@@ -0,0 +1,97 @@
+# test/test_gather.py
+import threading
+import time
+from functools import partial
+import pytest
+from sqlalchemy import event
+from apexorm import models
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=100, nullable=False)
+        sales = models.IntegerField(nullable=False)
+        author = models.ForeignKeyField("Author", related_name="books")
+
+    orm.register_models([Author, Book])
+    orm.migrate()
+    for name in ("Le Guin", "Herbert"):
+        author = Author(name=name)
+        author.save()
+        for i in range(3):
+            Book(title=f"{name} {i}", sales=i * 10, author=author).save()
+    return Author, Book
+
+def test_results_come_back_in_order_with_timings(orm):
+    Author, Book = register_models(orm)
+    books, n_authors, top, first = orm.gather(
+        Book.objects.filter(sales__gt=0),
+        Author.objects.all().count,
+        partial(Book.objects.order_by("-sales").values_list, "title", flat=True),
+        Author.objects.order_by("name").first,
+    )
+    assert len(books) == 4 and n_authors == 2
+    assert list(top)[:2] == ["Le Guin 2", "Herbert 2"]
+    assert first.name == "Herbert"
+    assert len(orm.gather(Author.objects.all()).timings) == 1
+
+    # instances are attached to the ORM's session: lazy loads and saves work as usual
+    assert all(b in orm.session for b in books) and first in orm.session
+    assert {b.title for b in first.books} == {"Herbert 0", "Herbert 1", "Herbert 2"}
+    first.name = "F. Herbert"
+    first.save()
+    assert Author.objects.filter(name="F. Herbert").count() == 1
+
+def test_uncommitted_edits_survive_gather(orm):
+    Author, Book = register_models(orm)
+    author = Author.objects.get(name="Herbert")
+    author.name = "changed-uncommitted"
+    assert author in orm.session.dirty
+
+    authors, = orm.gather(Author.objects.order_by("id"))
+    assert authors[1] is author and author.name == "changed-uncommitted"
+    assert author in orm.session.dirty
+    assert authors[0].name == "Le Guin"
+
+def test_queries_run_concurrently_on_their_own_connections(orm):
+    Author, Book = register_models(orm)
+    threads, connections = set(), set()
+
+    def slow(conn, cursor, statement, parameters, context, executemany):
+        threads.add(threading.get_ident())
+        connections.add(id(conn.connection.dbapi_connection))
+        time.sleep(0.2)
+
+    event.listen(orm.engine, "before_cursor_execute", slow)
+    try:
+        start = time.perf_counter()
+        result = orm.gather(Author.objects.all(), Book.objects.all(), Book.objects.all().count)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(orm.engine, "before_cursor_execute", slow)
+
+    assert len(threads) == 3 and len(connections) == 3
+    assert elapsed < 0.5 <= sum(result.timings)
+
+def test_rejects_callables_it_cannot_rebind(orm):
+    Author, _Book = register_models(orm)
+    with pytest.raises(TypeError, match="QuerySet methods"):
+        orm.gather(lambda: Author.objects.count())
+
+def test_nested_prefetch_attributes_survive_the_merge(orm):
+    from apexorm.models import Prefetch
+
+    Author, Book = register_models(orm)
+    authors, = orm.gather(
+        Author.objects.order_by("name").prefetch_related(
+            Prefetch("books", queryset=Book.objects.order_by("-sales"), to_attr="top", limit=1),
+            Prefetch("books__author", to_attr="writer"),
+        )
+    )
+    assert [a.top[0].title for a in authors] == ["Herbert 2", "Le Guin 2"]
+    assert all(book.writer is author for author in authors for book in author.books)
+    assert all(author in orm.session for author in authors)
@@ -0,0 +1,64 @@
+# test/test_get_or_create.py
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from apexorm import models
+
+def register_models(orm):
+    class Tag(models.Model):
+        id = models.IntegerField(primary_key=True)
+        slug = models.CharField(max_length=50, nullable=False, unique=True)
+        label = models.CharField(max_length=50, nullable=False)
+
+    orm.register_models([Tag])
+    orm.migrate()
+    return Tag
+
+def test_one_round_trip_each_way(orm):
+    Tag = register_models(orm)
+
+    with orm.capture_queries() as log:
+        tag, created = Tag.objects.get_or_create(slug="py", defaults={"label": "Python"})
+    assert created and tag.id and tag.label == "Python"
+    assert len(log) == 1 and "ON CONFLICT DO NOTHING" in log[0].statement
+
+    with orm.capture_queries() as log:
+        same, created = Tag.objects.get_or_create(slug="py", defaults={"label": "ignored"}, expect_hit=True)
+    assert not created and same is tag and same.label == "Python"
+    assert len(log) == 1 and log[0].statement.startswith("SELECT")
+
+    # insert-first on a hit: the INSERT is a no-op, then one SELECT
+    with orm.capture_queries() as log:
+        same, created = Tag.objects.get_or_create(slug="py", defaults={"label": "ignored"})
+    assert not created and same is tag and len(log) == 2
+    assert Tag.objects.count() == 1
+
+def test_losing_a_race_returns_the_winner(orm):
+    Tag = register_models(orm)
+
+    raced = []
+    def concurrent_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT") and not raced:
+            raced.append(statement)
+            with orm.engine.connect() as other:
+                other.exec_driver_sql("INSERT INTO tag (slug, label) VALUES ('rs', 'Rust (winner)')")
+                other.commit()
+    event.listen(orm.engine, "before_cursor_execute", concurrent_insert)
+
+    tag, created = Tag.objects.get_or_create(slug="rs", defaults={"label": "Rust"})
+    assert not created and tag.label == "Rust (winner)"
+
+def test_failed_insert_keeps_the_outer_transaction_usable(orm):
+    Tag = register_models(orm)
+    Tag(slug="a", label="A").save()
+    pending = Tag(slug="b", label="B")
+    Tag._session.add(pending)
+    Tag._session.flush()  # uncommitted work in the session's transaction
+
+    # no label: the INSERT fails on NOT NULL, then the lookup finds the pending row
+    tag, created = Tag.objects.get_or_create(slug="b")
+    assert not created and tag is pending
+    assert Tag.objects.count() == 2
+
+    with pytest.raises(IntegrityError):
+        Tag.objects.get_or_create(slug="c")
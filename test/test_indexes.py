@@ -0,0 +1,84 @@
+# test/test_indexes.py
+from sqlalchemy import text
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+from apexorm.models.queryset import Q
+from apexorm.testing import reset_model_state
+
+def register_models(orm):
+    class User(models.Model):
+        id = models.IntegerField(primary_key=True)
+        email = models.CharField(max_length=200, nullable=False)
+        first_name = models.CharField(max_length=100, db_index=True)
+        last_name = models.CharField(max_length=100)
+        active = models.BooleanField(nullable=True)
+
+        class Meta:
+            indexes = [
+                models.Index("last_name", "first_name"),
+                models.Index("lower(email)", unique=True),
+                models.Index("last_name", name="ix_user_active_last_name", condition=Q(active=True)),
+            ]
+
+    class Post(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200)
+        author = models.ForeignKeyField("User", related_name="posts", nullable=False)
+
+        class Meta:
+            indexes = [models.Index("author", "-title")]
+
+    orm.register_models([User, Post])
+    orm.migrate()
+    return User, Post
+
+def index_sql(orm):
+    with orm.engine.connect() as conn:
+        rows = conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))
+        return {name: sql for name, sql in rows}
+
+def test_declared_indexes_are_created(orm):
+    register_models(orm)
+    indexes = index_sql(orm)
+
+    assert "ix_user_first_name" in indexes
+    assert "ix_user_last_name_first_name" in indexes
+    assert "lower(email)" in indexes["ux_user_lower_email"]
+    assert indexes["ux_user_lower_email"].startswith("CREATE UNIQUE INDEX")
+    assert "WHERE" in indexes["ix_user_active_last_name"]
+    # FK columns are indexed automatically
+    assert "ix_post_author_id" in indexes
+    assert "author_id, title DESC" in indexes["ix_post_author_title_desc"]
+
+def test_fk_index_is_used_for_filters(orm):
+    User, Post = register_models(orm)
+    u = User(email="a@x.io", first_name="A", last_name="B").save()
+    Post(title="t", author=u).save()
+
+    with orm.engine.connect() as conn:
+        plan = conn.execute(text("EXPLAIN QUERY PLAN SELECT * FROM post WHERE author_id = 1")).fetchall()
+    assert any(row[-1].startswith("SEARCH post USING") and "(author_id=?)" in row[-1] for row in plan)
+
+def test_migrate_adds_indexes_to_existing_tables(db_path):
+    orm = ApexORM(db=SQLiteDB(db_path))
+
+    class Tag(models.Model):
+        id = models.IntegerField(primary_key=True)
+        label = models.CharField(max_length=50)
+
+    orm.register_models([Tag])
+    orm.migrate()
+    Tag(label="x").save()
+    assert "ix_tag_label" not in index_sql(orm)
+
+    reset_model_state()
+    orm = ApexORM(db=SQLiteDB(db_path))
+
+    class Tag(models.Model):
+        id = models.IntegerField(primary_key=True)
+        label = models.CharField(max_length=50, db_index=True)
+
+    orm.register_models([Tag])
+    orm.migrate()
+    assert "ix_tag_label" in index_sql(orm)
+    assert Tag.objects.count() == 1
@@ -0,0 +1,125 @@
+# test/test_instrumentation.py
+import pytest
+from apexorm import models
+from apexorm.instrumentation import NPlusOneError
+from apexorm.testing import assert_max_queries, assert_num_queries, assert_no_n_plus_one
+
+def register_models(orm):
+    class User(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Post(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200, nullable=False)
+        author = models.ForeignKeyField("User", related_name="posts", nullable=False)
+
+    class Group(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+        members = models.ManyToManyField("User", related_name="groups")
+
+    orm.register_models([User, Post, Group])
+    orm.migrate()
+    return User, Post, Group
+
+def seed(User, Post, Group, n=4):
+    for i in range(n):
+        u = User(name=f"U{i}").save()
+        Post(title=f"T{i}", author=u).save()
+        g = Group(name=f"G{i}").save()
+        g.members.add(u)
+    User._session.expunge_all()
+
+def test_callback_records_statement_caller_and_rows(orm):
+    User, Post, Group = register_models(orm)
+    seed(User, Post, Group)
+
+    events = []
+    remove = orm.instrument(events.append)
+    posts = Post.objects.filter(title__have="T").all()
+    remove()
+    Post.objects.count()
+
+    assert len(events) == 1
+    event = events[0]
+    assert event.statement.startswith("SELECT") and event.parameters
+    assert event.caller == "QuerySet.all"
+    assert event.location.startswith("test_instrumentation.py:")
+    assert event.rowcount == len(posts) == 4
+    assert event.duration > 0 and event.relationship is None
+
+def test_capture_queries_and_budgets(orm):
+    User, Post, Group = register_models(orm)
+    seed(User, Post, Group)
+
+    with orm.capture_queries() as log:
+        Post.objects.get(title="T1")
+    assert len(log) == 1 and log[0].caller == "Manager.get"
+
+    # JOIN for the author + the selectin load of the author's M2M groups
+    with assert_num_queries(orm, 2):
+        Post.objects.select_related("author").all()
+
+    with pytest.raises(AssertionError):
+        with assert_max_queries(orm, 2):
+            for post in Post.objects.all():
+                post.author.name
+
+def test_failed_statements_are_reported_and_popped(orm):
+    import sqlite3
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    register_models(orm)
+
+    with orm.capture_queries() as log:
+        with pytest.raises(OperationalError):
+            with orm.engine.connect() as connection:
+                connection.execute(text("SELECT * FROM missing_table"))
+    assert len(log) == 1 and "missing_table" in log[0].statement
+    assert isinstance(log[0].error, sqlite3.OperationalError)
+    assert "failed: no such table" in str(log[0])
+    # the pooled connection carries no stale entry into the next checkout
+    with orm.engine.connect() as connection:
+        assert not connection.connection.info.get("apexorm_query_stack")
+
+def test_n_plus_one_detector_points_to_eager_loading(orm):
+    User, Post, Group = register_models(orm)
+    seed(User, Post, Group)
+
+    with orm.detect_n_plus_one(threshold=3) as detector:
+        for post in Post.objects.all():
+            post.author.name
+        for user in User.objects.all():
+            len(user.posts)
+        for group in Group.objects.all():
+            group.members.all().count()
+
+    issues = {issue.relationship: issue for issue in detector.issues}
+    assert set(issues) == {"Post.author", "User.posts", "Group.members"}
+    assert issues["Post.author"].count == 4
+    assert "select_related('author')" in str(issues["Post.author"])
+    assert "prefetch_related('posts')" in str(issues["User.posts"])
+
+    User._session.expunge_all()
+    with assert_no_n_plus_one(orm):
+        for post in Post.objects.select_related("author").all():
+            post.author.name
+
+    User._session.expunge_all()
+    with pytest.raises(NPlusOneError):
+        with assert_no_n_plus_one(orm):
+            for post in Post.objects.all():
+                post.author.name
+
+def test_only_sqlalchemy_and_stdlib_frames_are_skipped():
+    import os
+    from apexorm import instrumentation as inst
+
+    stdlib, sqlalchemy = inst._STDLIB_DIR, inst._SQLALCHEMY_DIR
+    assert inst._is_library_frame(os.path.join(stdlib, "contextlib.py"))
+    assert inst._is_library_frame(os.path.join(stdlib, "concurrent", "futures", "thread.py"))
+    assert inst._is_library_frame(os.path.join(sqlalchemy, "orm", "query.py"))
+    # installed applications and look-alike package names are application code
+    assert not inst._is_library_frame(os.path.join(stdlib, "site-packages", "myapp", "views.py"))
+    assert not inst._is_library_frame(sqlalchemy.rstrip(os.sep) + "_utils" + os.sep + "types.py")
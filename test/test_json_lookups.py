@@ -0,0 +1,92 @@
+# test/test_json_lookups.py
+import json
+import pytest
+from sqlalchemy.dialects import mysql, postgresql
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+from apexorm.models import Index
+from apexorm.models.queryset import Q
+
+def register_models(orm):
+    class Event(models.Model):
+        id = models.IntegerField(primary_key=True)
+        kind = models.CharField(max_length=20, nullable=True)
+        payload = models.JSONField(nullable=True)
+
+        class Meta:
+            indexes = [Index("payload__user__id")]
+
+    orm.register_models([Event])
+    orm.migrate()
+    for kind, payload in [
+        ("login", {"user": {"id": 5, "name": "ada"}, "tags": ["urgent"], "score": 2.5}),
+        ("login", {"user": {"id": 7, "name": "bob"}, "retry": None, "score": 10}),
+        ("logout", {"user": {"id": 5}, "ok": True}),
+        ("noop", None),
+    ]:
+        Event(kind=kind, payload=payload).save()
+    return Event
+
+def kinds(qs):
+    return sorted(e.kind for e in qs.all())
+
+def test_path_lookups_filter_in_sql(orm):
+    Event = register_models(orm)
+
+    assert kinds(Event.objects.filter(payload__user__id=5)) == ["login", "logout"]
+    assert kinds(Event.objects.filter(payload__user__name="bob")) == ["login"]
+    assert kinds(Event.objects.filter(payload__user__id__in=[7, 8])) == ["login"]
+    assert kinds(Event.objects.filter(payload__score__gt=3)) == ["login"]
+    assert kinds(Event.objects.filter(payload__tags__0="urgent")) == ["login"]
+    assert kinds(Event.objects.filter(payload__ok=True)) == ["logout"]
+    assert kinds(Event.objects.filter(payload__user__name__startswith="a")) == ["login"]
+    assert kinds(Event.objects.filter(Q(payload__user__id=7) | Q(kind="logout"))) == ["login", "logout"]
+    assert kinds(Event.objects.exclude(payload__user__id=5)) == ["login"]
+
+def test_has_key(orm):
+    Event = register_models(orm)
+    assert kinds(Event.objects.filter(payload__has_key="retry")) == ["login"]   # even with a null value
+    assert kinds(Event.objects.filter(payload__user__has_key="name")) == ["login", "login"]
+    with pytest.raises(ValueError):
+        Event.objects.filter(payload__has_key='a"b')
+
+def test_lookups_use_the_expression_index(orm):
+    Event = register_models(orm)
+    plan = Event.objects.filter(payload__user__id=5).explain()
+    assert "ix_event_payload__user__id" in plan.used_indexes, str(plan)
+    assert orm.migrate() == []   # the expression index round-trips through the schema diff
+
+def test_compiles_per_dialect(orm):
+    Event = register_models(orm)
+    qs = Event.objects.filter(payload__user__id=5, payload__has_key="x")
+
+    pg = str(qs.query.statement.compile(dialect=postgresql.dialect()))
+    assert "(event.payload #>> '{user,id}')" in pg and "CAST(event.payload AS JSONB) ?" in pg
+    my = str(qs.query.statement.compile(dialect=mysql.dialect()))
+    assert "JSON_UNQUOTE(JSON_EXTRACT(event.payload, '$.\"user\".\"id\"'))" in my
+    assert "JSON_CONTAINS_PATH(event.payload, 'one'" in my
+
+    with pytest.raises(ValueError):
+        Event.objects.filter(**{"payload__a'b": 1})
+
+def test_json_codec_option(db_path):
+    calls = []
+
+    class Codec:
+        @staticmethod
+        def dumps(value):
+            calls.append("dumps")
+            return json.dumps(value)
+
+        @staticmethod
+        def loads(text):
+            calls.append("loads")
+            return json.loads(text)
+
+    orm = ApexORM(db=SQLiteDB(db_path), json_codec=Codec)
+    Event = register_models(orm)
+    Event._session.expire_all()
+    assert Event.objects.get(kind="logout").payload == {"user": {"id": 5}, "ok": True}
+    assert "dumps" in calls and "loads" in calls
+    with pytest.raises(ValueError):
+        ApexORM(db=SQLiteDB(db_path), json_codec="yaml")
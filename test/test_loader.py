@@ -0,0 +1,85 @@
+# test/test_loader.py
+import io
+import json
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from apexorm import models
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        isbn = models.CharField(max_length=13, nullable=False, unique=True)
+        title = models.CharField(max_length=20, nullable=False)
+        pages = models.IntegerField(nullable=True)
+        price = models.FloatField(nullable=True)
+        in_print = models.BooleanField(nullable=True)
+        published = models.DateField(nullable=True)
+        contact = models.EmailField(nullable=True)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=True)
+
+    orm.register_models([Author, Book])
+    orm.migrate()
+    return Author, Book
+
+CSV = """isbn,Title,pages,price,in_print,published,contact,author,ignored
+111,Dune,412,9.5,yes,1965-08-01,a@b.io,1,x
+222,Emma,,,no,,,,x
+333,Emma,not-a-number,,,,,,x
+444,This title is far too long,1,,,,,,x
+555,Bad mail,1,,,,nope,,x
+111,Duplicate isbn,1,,,,,,x
+666,Ulysses,730,,true,,,1,x
+"""
+
+def test_load_csv_coerces_validates_and_reports(orm, tmp_path):
+    Author, Book = register_models(orm)
+    Author(name="Frank").save()
+    path = tmp_path / "books.csv"
+    path.write_text(CSV)
+
+    reports = []
+    report = Book.objects.load_csv(path, batch_size=3, columns={"Title": "title"}, progress=reports.append)
+
+    assert (report.rows_read, report.inserted, report.rejected_count) == (7, 3, 4)
+    assert [r.line for r in report.rejected] == [3, 4, 5, 6]
+    assert report.rejected[0].error.startswith("pages:")
+    assert "title" in report.rejected[1].error
+    assert "UNIQUE" in report.rejected[3].error
+    assert report.batches == 3 and len(reports) == 3 and report.throughput > 0
+
+    dune = Book.objects.get(isbn="111")
+    assert (dune.title, dune.pages, dune.price, dune.in_print) == ("Dune", 412, 9.5, True)
+    assert str(dune.published) == "1965-08-01" and dune.author.name == "Frank"
+    emma = Book.objects.get(isbn="222")
+    assert emma.pages is None and emma.in_print is False
+
+def test_load_jsonl_with_bulk_profile(orm):
+    Author, Book = register_models(orm)
+    lines = [json.dumps({"isbn": str(i), "title": f"T{i}", "pages": i, "in_print": True}) for i in range(250)]
+    lines.insert(10, json.dumps({"isbn": "x"}))  # missing required title
+
+    report = Book.objects.load_jsonl(io.StringIO("\n".join(lines)), batch_size=100, bulk_profile=True)
+    assert report.inserted == 250 and report.rejected_count == 1
+    assert report.rejected[0].line == 11 and "title: required" in report.rejected[0].error
+    assert Book.objects.count() == 250
+
+    # pragmas are restored on pooled connections
+    with orm.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 2
+
+def test_database_failures_abort_instead_of_rejecting_rows(orm):
+    Author, Book = register_models(orm)
+    with orm.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE book")
+
+    inserts = []
+    event.listen(orm.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statement.startswith("INSERT") and inserts.append(statement))
+    with pytest.raises(OperationalError, match="no such table"):
+        Book.objects.load_csv(io.StringIO(CSV), columns={"Title": "title"})
+    assert len(inserts) == 1   # not bisected into per-row "rejections"
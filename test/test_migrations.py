@@ -0,0 +1,150 @@
+# test/test_migrations.py
+from sqlalchemy import event, inspect, text
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+from apexorm.testing import reset_model_state
+
+def define_v1(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+        nickname = models.CharField(max_length=100, nullable=True)
+
+    orm.register_models([Author])
+    return Author
+
+def define_v2(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False, db_index=True)
+        nickname = models.CharField(max_length=100, nullable=False, default="anon")
+        bio = models.TextField(nullable=True)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200, nullable=False)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=True)
+
+    orm.register_models([Author, Book])
+    return Author, Book
+
+def fresh_orm(db_path):
+    reset_model_state()
+    return ApexORM(db=SQLiteDB(db_path))
+
+def count_statements(orm):
+    statements = []
+    event.listen(orm.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def test_unchanged_schema_costs_one_query(orm):
+    define_v1(orm)
+    ops = orm.migrate()
+    assert [str(op) for op in ops] == ["CREATE TABLE author"]
+
+    statements = count_statements(orm)
+    assert orm.migrate() == []
+    assert len(statements) == 1 and "apexorm_migrations" in statements[0]
+
+def test_add_columns_indexes_and_rebuild_keep_data(db_path):
+    orm = fresh_orm(db_path)
+    Author = define_v1(orm)
+    orm.migrate()
+    Author(name="Ada").save()
+    Author(name="Alan", nickname="al").save()
+
+    orm = fresh_orm(db_path)
+    Author, Book = define_v2(orm)
+
+    planned = orm.migrate(dry_run=True)
+    kinds = {op.kind for op in planned}
+    # nickname became NOT NULL -> SQLite needs a table rebuild
+    assert kinds == {"create_table", "rebuild_table"}
+    assert "bio" not in {c["name"] for c in inspect(orm.engine).get_columns("author")}
+
+    orm.migrate()
+    columns = {c["name"]: c for c in inspect(orm.engine).get_columns("author")}
+    assert "bio" in columns and columns["nickname"]["nullable"] is False
+    assert "ix_author_name" in {ix["name"] for ix in inspect(orm.engine).get_indexes("author")}
+
+    rows = Author.objects.order_by("id").values_list("name", "nickname")
+    assert list(rows) == [("Ada", "anon"), ("Alan", "al")]
+    Book(title="Notes", author=Author.objects.get(name="Ada")).save()
+    assert Book.objects.count() == 1
+
+def test_add_nullable_column_uses_alter(db_path):
+    orm = fresh_orm(db_path)
+    define_v1(orm)
+    orm.migrate()
+
+    orm = fresh_orm(db_path)
+
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+        nickname = models.CharField(max_length=100, nullable=True)
+        rating = models.FloatField(nullable=True)
+
+    orm.register_models([Author])
+    assert [str(op) for op in orm.migrate()] == ["ADD COLUMN author.rating"]
+
+def test_allow_drop_removes_undeclared_columns_and_tables(db_path):
+    orm = fresh_orm(db_path)
+    define_v2(orm)
+    orm.migrate()
+
+    orm = fresh_orm(db_path)
+
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False, db_index=True)
+        nickname = models.CharField(max_length=100, nullable=False, default="anon")
+
+    orm.register_models([Author])
+    # without allow_drop nothing destructive is planned
+    assert orm.migrate(dry_run=True) == []
+
+    ops = orm.migrate(allow_drop=True)
+    assert {str(op) for op in ops} == {"REBUILD TABLE author", "DROP TABLE book"}
+    assert "bio" not in {c["name"] for c in inspect(orm.engine).get_columns("author")}
+    with orm.engine.connect() as conn:
+        tables = {r[0] for r in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    assert "book" not in tables and "apexorm_migrations" in tables
+
+def test_rebuild_keeps_undeclared_columns_and_referencing_rows(db_path):
+    def connect(db_path):
+        reset_model_state()
+        orm = ApexORM(db=SQLiteDB(db_path, pragmas={"foreign_keys": "ON"}))
+        # pysqlite's recommended setup: SQLAlchemy's BEGIN opens a real transaction
+        event.listen(orm.engine, "connect", lambda dbapi_connection, record: setattr(dbapi_connection, "isolation_level", None))
+        event.listen(orm.engine, "begin", lambda connection: connection.exec_driver_sql("BEGIN"))
+        return orm
+
+    orm = connect(db_path)
+    Author, Book = define_v2(orm)
+    orm.migrate()
+    with orm.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE author ADD COLUMN legacy VARCHAR(20)"))
+        connection.execute(text("INSERT INTO author (name, nickname, legacy) VALUES ('Ada', 'ada', 'keep me')"))
+    Book(title="Notes", author=Author.objects.get(name="Ada")).save()
+
+    orm = connect(db_path)
+
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=50, nullable=False, db_index=True)   # shorter: rebuild
+        nickname = models.CharField(max_length=100, nullable=False, default="anon")
+        bio = models.TextField(nullable=True)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200, nullable=False)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=True)
+
+    orm.register_models([Author, Book])
+    assert [str(op) for op in orm.migrate()] == ["REBUILD TABLE author"]
+
+    with orm.engine.connect() as connection:
+        assert connection.execute(text("SELECT name, legacy FROM author")).all() == [("Ada", "keep me")]
+        assert connection.execute(text("SELECT title, author_id FROM book")).all() == [("Notes", 1)]
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
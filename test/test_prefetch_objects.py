@@ -0,0 +1,86 @@
+# test/test_prefetch_objects.py
+import pytest
+from sqlalchemy import inspect
+from apexorm import models
+from apexorm.models import Prefetch
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=100, nullable=False)
+        year = models.IntegerField(nullable=False)
+        blurb = models.TextField(nullable=True)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=False)
+
+    class Shelf(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+        books = models.ManyToManyField("Book")
+
+    orm.register_models([Author, Book, Shelf])
+    orm.migrate()
+    return Author, Book, Shelf
+
+def seed(Author, Book, Shelf):
+    shelf = Shelf(name="favourites")
+    shelf.save()
+    for name, years in [("Le Guin", [1968, 1969, 1971, 1974]), ("Herbert", [1965, 1969]), ("Nobody", [])]:
+        author = Author(name=name)
+        author.save()
+        for year in years:
+            book = Book(title=f"{name} {year}", year=year, blurb="...", author=author)
+            book.save()
+            shelf.books.add(book)
+    return shelf
+
+def test_per_parent_limit_with_ordering_and_only(orm):
+    Author, Book, Shelf = register_models(orm)
+    seed(Author, Book, Shelf)
+    orm.session.expunge_all()
+
+    latest = Prefetch("books", queryset=Book.objects.order_by("-year").only("title", "year"),
+                      to_attr="latest_books", limit=3)
+    with orm.capture_queries() as log:
+        authors = Author.objects.order_by("name").prefetch_related(latest).all()
+        got = {a.name: [b.year for b in a.latest_books] for a in authors}
+    assert got == {"Herbert": [1969, 1965], "Le Guin": [1974, 1971, 1969], "Nobody": []}
+    assert len(log) == 2
+    assert "row_number() OVER (PARTITION BY" in log[1].statement
+    assert "blurb" not in log[1].statement
+    assert "blurb" in inspect(authors[0].latest_books[0]).unloaded
+
+def test_filtered_prefetch_into_the_relationship_and_many_to_many(orm):
+    Author, Book, Shelf = register_models(orm)
+    seed(Author, Book, Shelf)
+    orm.session.expunge_all()
+
+    sixties = Book.objects.filter(year__lt=1970).order_by("year")
+    with orm.capture_queries() as log:
+        author = Author.objects.prefetch_related(Prefetch("books", queryset=sixties)).get(name="Le Guin")
+        assert [b.year for b in author.books] == [1968, 1969]
+        shelf = Shelf.objects.prefetch_related(
+            Prefetch("books", queryset=Book.objects.order_by("year"), to_attr="oldest", limit=2)
+        ).first()
+        assert [b.year for b in shelf.oldest] == [1965, 1968]
+    assert len(log) == 5   # + the selectin load every M2M relationship gets
+
+def test_nested_and_scalar_prefetches(orm):
+    Author, Book, Shelf = register_models(orm)
+    seed(Author, Book, Shelf)
+    orm.session.expunge_all()
+
+    with orm.capture_queries() as log:
+        shelves = Shelf.objects.prefetch_related(
+            Prefetch("books__author", queryset=Author.objects.only("name"), to_attr="writer"),
+        ).all()
+        assert sorted({b.writer.name for b in shelves[0].books}) == ["Herbert", "Le Guin"]
+    assert len(log) == 3   # shelves, their books, the authors
+
+    with pytest.raises(ValueError, match="collections"):
+        Book.objects.prefetch_related(Prefetch("author", limit=1)).all()
+    with pytest.raises(ValueError, match="Book queryset"):
+        Author.objects.prefetch_related(Prefetch("books", queryset=Author.objects.all())).all()
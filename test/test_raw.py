@@ -0,0 +1,79 @@
+# test/test_raw.py
+import datetime
+import pytest
+from apexorm import models
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=200, nullable=False)
+        sales = models.IntegerField(nullable=True)
+        published = models.DateTimeField(nullable=True)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=False)
+
+    orm.register_models([Author, Book])
+    orm.migrate()
+    return Author, Book
+
+def seed(Author, Book):
+    a = Author(name="Ann").save()
+    for i, sales in enumerate([30, 10, 20]):
+        Book(title=f"B{i}", sales=sales, author=a, published=datetime.datetime(2024, 1, i + 1)).save()
+    Book._session.expunge_all()
+
+def test_raw_cte_with_window_function(orm):
+    Author, Book = register_models(orm)
+    seed(Author, Book)
+
+    books = Book.objects.raw(
+        "WITH ranked AS (SELECT *, rank() OVER (ORDER BY sales DESC) AS sales_rank FROM book) "
+        "SELECT id, title, published, author_id, sales_rank FROM ranked WHERE sales_rank <= :n ORDER BY sales_rank",
+        {"n": 2},
+    ).all()
+
+    assert [(b.title, b.sales_rank) for b in books] == [("B0", 1), ("B2", 2)]
+    assert isinstance(books[0], Book)
+    assert books[0].published == datetime.datetime(2024, 1, 1)
+    assert books[0].author.name == "Ann"
+    assert books[0] is Book.objects.get(id=books[0].id)
+
+def test_translations_and_deferred_columns(orm):
+    Author, Book = register_models(orm)
+    seed(Author, Book)
+
+    with orm.capture_queries() as log:
+        book = next(iter(Book.objects.raw("SELECT id AS pk, title AS name FROM book WHERE sales = 10",
+                                          translations={"pk": "id", "name": "title"})))
+        assert book.title == "B1"
+    assert len(log) == 1
+
+    with orm.capture_queries() as log:
+        assert book.sales == 10  # not selected: loaded on access
+    assert len(log) == 1
+
+def test_streams_in_chunks_and_requires_pk(orm):
+    Author, Book = register_models(orm)
+    seed(Author, Book)
+
+    rows = Book.objects.raw("SELECT id, title FROM book ORDER BY id", chunk_size=1)
+    it = iter(rows)
+    assert next(it).title == "B0"
+    assert [b.title for b in it] == ["B1", "B2"]
+
+    with pytest.raises(ValueError, match="primary key"):
+        Book.objects.raw("SELECT title FROM book").all()
+
+def test_extra_columns_cannot_shadow_attributes(orm):
+    Author, Book = register_models(orm)
+    seed(Author, Book)
+
+    for column in ("save", "objects"):
+        with pytest.raises(ValueError, match=f"clashes with Book.{column}"):
+            Book.objects.raw(f"SELECT id, 1 AS {column} FROM book").all()
+    # renamed through translations it is fine
+    book = Book.objects.raw("SELECT id, 1 AS save FROM book", translations={"save": "saved"}).all()[0]
+    assert book.saved == 1 and callable(book.save)
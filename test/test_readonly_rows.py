@@ -0,0 +1,56 @@
+# test/test_readonly_rows.py
+import dataclasses
+import pytest
+from apexorm import models
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        title = models.CharField(max_length=100, nullable=False)
+        pages = models.IntegerField(nullable=False)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=False)
+
+    orm.register_models([Author, Book])
+    orm.migrate()
+    author = Author(name="Le Guin")
+    author.save()
+    for i in range(1, 4):
+        Book(title=f"Book {i}", pages=i * 100, author=author).save()
+    orm.session.expunge_all()
+    return Author, Book
+
+def test_rows_have_column_attributes_and_stay_out_of_the_session(orm):
+    Author, Book = register_models(orm)
+    with orm.capture_queries() as log:
+        books = Book.objects.filter(pages__gte=200).select_related("author").order_by("-pages").readonly().all()
+    assert len(log) == 1
+    assert [(b.title, b.pages, b.author_id) for b in books] == [("Book 3", 300, 1), ("Book 2", 200, 1)]
+    assert type(books[0]).__name__ == "BookRow" and type(books[0]).__slots__ == ("id", "title", "pages", "author_id")
+    assert not hasattr(books[0], "__dict__")
+    assert len(orm.session.identity_map) == 0
+
+    with pytest.raises(AttributeError, match="use author_id"):
+        books[0].author
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        books[0].title = "changed"
+    assert books[0].to_dict() == {"id": 3, "title": "Book 3", "pages": 300, "author_id": 1}
+    assert books.values_list("title", flat=True) == ["Book 3", "Book 2"]
+
+def test_first_get_last_and_slicing(orm):
+    Author, Book = register_models(orm)
+    rows = Book.objects.readonly()
+    assert rows.first().title == "Book 1"
+    assert rows.last().title == "Book 3"
+    assert rows.get(pages=200).title == "Book 2"
+    assert [b.id for b in rows.order_by("-id")[:2]] == [3, 2]
+    assert rows[1].title == "Book 2"
+    assert Author.objects.as_rows()[0] == type(Author.objects.readonly().first())(id=1, name="Le Guin")
+    with pytest.raises(ValueError, match="does not exist"):
+        rows.get(pages=1)
+    assert len(orm.session.identity_map) == 0
+
+    assert isinstance(rows.readonly(False).first(), Book)   # back to model instances
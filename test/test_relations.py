@@ -53,3 +53,32 @@ def test_fk_o2o_m2m_and_reverse(orm):
     # simple in-memory filter on m2m manager
     filtered = g.members.filter(name__have="A")
     assert len(filtered) == 1 and filtered[0].name == "A"
+
+def test_m2m_name_does_not_leak_to_other_models(orm):
+    User, Profile, Post, Group = register_models(orm)
+    # Group.members is an M2M; a reverse FK with the same public name elsewhere must stay a plain relationship
+    assert Group.__m2m_private_map__ == {"members": "_members_rel"}
+    assert User.__m2m_private_map__ == {"groups": "_groups_rel"}
+    assert "members" not in Post.__m2m_private_map__
+    assert models.Model.__m2m_private_map__ == {}
+
+def test_fk_and_m2m_columns_follow_the_target_key_type(orm):
+    class Tag(models.Model):
+        id = models.UUIDField(primary_key=True)
+        name = models.CharField(max_length=50, nullable=False)
+
+    class Note(models.Model):
+        id = models.IntegerField(primary_key=True)
+        main_tag = models.ForeignKeyField("Tag", related_name="main_notes", nullable=True)
+        tags = models.ManyToManyField("Tag", related_name="notes")
+
+    orm.register_models([Tag, Note])
+    orm.migrate()
+    assert str(Note.__table__.c.main_tag_id.type) == "VARCHAR(36)"
+    assoc = models.Base.metadata.tables["note_tags"]
+    assert [str(c.type) for c in assoc.columns] == ["INTEGER", "VARCHAR(36)"]
+
+    tag = Tag(name="t").save()
+    note = Note(main_tag=tag).save()
+    note.tags.add(tag)
+    assert note.main_tag is tag and [t.name for t in note.tags.all()] == ["t"]
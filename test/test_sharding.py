@@ -0,0 +1,230 @@
+# test/test_sharding.py
+import pytest
+from sqlalchemy import inspect
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+from apexorm.models import Avg, Count, Max, Min, Sum
+
+SHARDS = ("a", "b", "c")
+
+
+@pytest.fixture
+def sharded_orm(tmp_path):
+    orm = ApexORM(
+        db=SQLiteDB(str(tmp_path / "main.db")),
+        shards={name: SQLiteDB(str(tmp_path / f"{name}.db")) for name in SHARDS},
+    )
+    yield orm
+    orm.close()
+
+def register_models(orm):
+    class Customer(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=50, nullable=False)
+
+    class Order(models.Model):
+        id = models.UUIDField(primary_key=True)
+        tenant_id = models.IntegerField(nullable=False)
+        total = models.FloatField(nullable=False)
+
+        class Meta:
+            shard_key = "tenant_id"
+            shard_by = lambda tenant_id: SHARDS[tenant_id % 3]
+
+    orm.register_models([Customer, Order])
+    orm.migrate()
+    return Customer, Order
+
+def seed(Order):
+    for tenant_id in range(6):
+        for total in (1.0, 2.0, 3.0):
+            Order(tenant_id=tenant_id, total=total + tenant_id * 10).save()
+
+def shard_tenants(orm, name):
+    return sorted({o.tenant_id for o in orm.shards.sessions[name].query(orm.models[1]).all()})
+
+def test_rows_and_tables_go_to_their_shard(sharded_orm):
+    Customer, Order = register_models(sharded_orm)
+    seed(Order)
+    Customer(name="acme").save()
+
+    assert shard_tenants(sharded_orm, "a") == [0, 3]
+    assert shard_tenants(sharded_orm, "b") == [1, 4]
+    assert shard_tenants(sharded_orm, "c") == [2, 5]
+    assert set(inspect(sharded_orm.engine).get_table_names()) >= {"customer"}
+    assert "order" not in inspect(sharded_orm.engine).get_table_names()
+    assert "customer" not in inspect(sharded_orm.shards.engines["a"]).get_table_names()
+    assert Customer.objects.count() == 1
+    assert sharded_orm.migrate() == []
+
+    order = Order.objects.get(tenant_id=4, total=42.0)
+    order.total = 43.0
+    order.save()
+    assert Order.objects.filter(tenant_id=4).aggregate(top=Max("total")) == {"top": 43.0}
+    order.tenant_id = 5
+    with pytest.raises(ValueError, match="move the row"):
+        order.save()
+
+def test_shard_key_filters_target_one_shard(sharded_orm):
+    _Customer, Order = register_models(sharded_orm)
+    seed(Order)
+
+    with sharded_orm.capture_queries() as log:
+        assert Order.objects.filter(tenant_id=3).count() == 3
+    assert len(log) == 1
+
+    with sharded_orm.capture_queries() as log:
+        assert {o.tenant_id for o in Order.objects.filter(tenant_id__in=[1, 4]).all()} == {1, 4}
+    assert len(log) == 1
+
+    with sharded_orm.capture_queries() as log:
+        assert len(Order.objects.filter(total__gt=20).all()) == 12
+    assert len(log) == 3
+
+def test_scatter_gather_merges_order_limit_count_and_aggregates(sharded_orm):
+    _Customer, Order = register_models(sharded_orm)
+    seed(Order)
+
+    everything = sorted(o.total for o in Order.objects.all())
+    assert len(everything) == 18
+    assert Order.objects.count() == 18
+
+    top = Order.objects.order_by("-total")[:4]
+    assert [o.total for o in top] == everything[::-1][:4]
+    assert top.count() == 4
+    page = Order.objects.order_by("tenant_id", "-total")[2:5]
+    assert [(o.tenant_id, o.total) for o in page] == [(0, 1.0), (1, 13.0), (1, 12.0)]
+    assert Order.objects.order_by("total").first().total == 1.0
+    assert [o.total for o in Order.objects.order_by("-total").readonly()[:4]] == everything[::-1][:4]
+
+    stats = Order.objects.filter(total__lt=30).aggregate(
+        n=Count(), total=Sum("total"), low=Min("total"), high=Max("total"), mean=Avg("total"),
+    )
+    below = [t for t in everything if t < 30]
+    assert stats == {"n": len(below), "total": sum(below), "low": min(below), "high": max(below),
+                     "mean": sum(below) / len(below)}
+
+def test_shards_and_the_merge_agree_on_null_order(sharded_orm):
+    from sqlalchemy.dialects import postgresql
+    _Customer, Order = register_models(sharded_orm)
+
+    class Ticket(models.Model):
+        id = models.UUIDField(primary_key=True)
+        tenant_id = models.IntegerField(nullable=False)
+        priority = models.IntegerField(nullable=True)
+
+        class Meta:
+            shard_key = "tenant_id"
+            shard_by = lambda tenant_id: SHARDS[tenant_id % 3]
+
+    sharded_orm.register_models([Ticket])
+    sharded_orm.migrate()
+    for tenant_id, priority in [(0, None), (1, 2), (2, None), (3, 1), (4, 3)]:
+        Ticket(tenant_id=tenant_id, priority=priority).save()
+
+    assert [t.priority for t in Ticket.objects.order_by("priority")[:3]] == [None, None, 1]
+    assert [t.priority for t in Ticket.objects.order_by("-priority")[1:4]] == [2, 1, None]
+    sql = str(Ticket.objects.order_by("priority", "-tenant_id").query.statement.compile(dialect=postgresql.dialect()))
+    assert "priority ASC NULLS FIRST" in sql and "tenant_id DESC NULLS LAST" in sql
+
+def test_sharded_models_need_globally_unique_keys(sharded_orm):
+    _Customer, Order = register_models(sharded_orm)
+    seed(Order)
+    ids = [o.id for o in Order.objects.all()]
+    assert len(set(ids)) == 18
+    assert Order.objects.get(id=ids[7]).id == ids[7]
+
+    class Invoice(models.Model):
+        id = models.IntegerField(primary_key=True)
+        tenant_id = models.IntegerField(nullable=False)
+
+        class Meta:
+            shard_key = "tenant_id"
+
+    with pytest.raises(ValueError, match="globally unique primary keys"):
+        sharded_orm.register_models([Invoice])
+
+def test_writes_are_routed_by_shard_key(sharded_orm, tmp_path):
+    _Customer, Order = register_models(sharded_orm)
+
+    class Account(models.Model):
+        id = models.UUIDField(primary_key=True)
+        tenant_id = models.IntegerField(nullable=False)
+        email = models.CharField(max_length=100, nullable=False, unique=True)
+        plan = models.CharField(max_length=20, nullable=True)
+
+        class Meta:
+            shard_key = "tenant_id"
+            shard_by = lambda tenant_id: SHARDS[tenant_id % 3]
+
+    sharded_orm.register_models([Account])
+    sharded_orm.migrate()
+
+    def on_shard(name):
+        return sorted(a.email for a in sharded_orm.shards.sessions[name].query(Account).all())
+
+    result = Account.objects.bulk_upsert([
+        {"tenant_id": 0, "email": "a@x", "plan": "free"},
+        {"tenant_id": 1, "email": "b@x", "plan": "free"},
+        Account(tenant_id=4, email="c@x", plan="pro"),
+    ], conflict_fields=["email"])
+    assert (result.created, result.updated) == (3, 0)
+    assert (on_shard("a"), on_shard("b"), on_shard("c")) == (["a@x"], ["b@x", "c@x"], [])
+    result = Account.objects.bulk_upsert([{"tenant_id": 1, "email": "b@x", "plan": "pro"}], conflict_fields=["email"])
+    assert (result.created, result.updated) == (0, 1)
+
+    account, created = Account.objects.update_or_create(email="d@x", defaults={"tenant_id": 2, "plan": "pro"})
+    assert created and on_shard("c") == ["d@x"]
+    again, created = Account.objects.get_or_create(tenant_id=2, email="d@x")
+    assert not created and again.id == account.id
+    with pytest.raises(ValueError, match="'tenant_id' value"):
+        Account.objects.get_or_create(email="e@x")
+
+    (tmp_path / "accounts.csv").write_text("tenant_id,email\n3,e@x\n5,f@x\n,g@x\n")
+    report = Account.objects.load_csv(tmp_path / "accounts.csv")
+    assert (report.inserted, report.rejected_count) == (2, 1)
+    assert (on_shard("a"), on_shard("c")) == (["a@x", "e@x"], ["d@x", "f@x"])
+
+    assert [a.email for a in Account.objects.raw("SELECT * FROM account", shard="a")] == ["a@x", "e@x"]
+    with pytest.raises(ValueError, match="needs shard="):
+        Account.objects.raw("SELECT * FROM account")
+
+def test_foreign_keys_between_sharded_models_follow_the_key_type(sharded_orm):
+    _Customer, Order = register_models(sharded_orm)
+
+    class Line(models.Model):
+        id = models.UUIDField(primary_key=True)
+        tenant_id = models.IntegerField(nullable=False)
+        order = models.ForeignKeyField("Order", related_name="lines", nullable=False)
+
+        class Meta:
+            shard_key = "tenant_id"
+            shard_by = lambda tenant_id: SHARDS[tenant_id % 3]
+
+    sharded_orm.register_models([Line])
+    sharded_orm.migrate()
+    columns = {c["name"]: c for c in inspect(sharded_orm.shards.engines["b"]).get_columns("line")}
+    assert str(columns["order_id"]["type"]) == str(Order.__table__.c.id.type) == "VARCHAR(36)"
+
+    order = Order(tenant_id=4, total=1.0).save()
+    Line(tenant_id=4, order=order).save()
+    line = Line.objects.get(tenant_id=4)
+    assert line.order_id == order.id and line.order.total == 1.0
+
+def test_exports_and_explain_cover_every_shard(sharded_orm, tmp_path):
+    _Customer, Order = register_models(sharded_orm)
+    seed(Order)
+
+    assert Order.objects.all().to_csv(tmp_path / "orders.csv", "tenant_id", "total") == 18
+    lines = (tmp_path / "orders.csv").read_text().splitlines()
+    assert lines[0] == "tenant_id,total" and len(lines) == 19
+    assert Order.objects.filter(tenant_id__in=[1, 2]).to_jsonl(tmp_path / "orders.jsonl", "total") == 6
+    cols = Order.objects.all().to_columns("tenant_id", "total", chunk_size=4, numpy=False)
+    assert sorted(cols["tenant_id"].tolist()) == sorted(list(range(6)) * 3)
+
+    top = Order.objects.order_by("-total")[:4].to_columns("total", numpy=False)   # merged, then sliced
+    assert top["total"].tolist() == [53.0, 52.0, 51.0, 43.0]
+
+    plans = Order.objects.filter(total__gt=20).explain()
+    assert set(plans) == set(SHARDS) and all(plan.full_scans == ["order"] for plan in plans.values())
+    assert set(Order.objects.filter(tenant_id=4).explain()) == {"b"}
@@ -0,0 +1,67 @@
+# test/test_sqlite_profiles.py
+import threading
+import pytest
+from sqlalchemy import event
+from apexorm import ApexORM, models
+from apexorm.connection import SQLiteDB
+
+def register_models(orm):
+    class Note(models.Model):
+        id = models.IntegerField(primary_key=True)
+        body = models.CharField(max_length=100, nullable=False)
+
+    orm.register_models([Note])
+    orm.migrate()
+    return Note
+
+def pragma(orm, name):
+    with orm.engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+def test_wal_concurrent_profile_applies_to_every_connection(db_path):
+    db = SQLiteDB(db_path, profile="wal-concurrent", pragmas={"busy_timeout": 1234})
+    orm = ApexORM(db)
+    assert pragma(orm, "journal_mode") == "wal"
+    assert pragma(orm, "synchronous") == 1          # NORMAL
+    assert pragma(orm, "busy_timeout") == 1234      # override wins
+    assert pragma(orm, "temp_store") == 2           # MEMORY
+    assert event.contains(orm.engine, "close", db._optimize)
+    orm.close()
+
+def test_default_profile_changes_nothing(db_path):
+    orm = ApexORM(SQLiteDB(db_path))
+    assert pragma(orm, "journal_mode") == "delete"
+    assert not event.contains(orm.engine, "close", orm.database._optimize)
+
+def test_optimize_runs_when_connections_close(db_path):
+    db = SQLiteDB(db_path, profile="wal-concurrent")
+    ran = []
+    db._optimize = lambda conn, rec: ran.append(conn)  # instance attribute, picked up by configure_engine
+    orm = ApexORM(db)
+    register_models(orm)
+    orm.close()
+    assert ran
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="wal-concurrent"):
+        SQLiteDB("x.db", profile="fast")
+
+def test_shared_cache_memory_database_is_shared_across_threads():
+    orm = ApexORM(SQLiteDB(":memory:", shared_cache=True))
+    Note = register_models(orm)
+    Note(body="hello").save()
+
+    seen = []
+    def reader():
+        session = orm.Session()
+        seen.append(session.query(Note).count())
+        session.close()
+    t = threading.Thread(target=reader)
+    t.start(); t.join()
+    assert seen == [1]
+
+    # a second shared in-memory database is a different database
+    other = ApexORM(SQLiteDB(":memory:", shared_cache=True))
+    with other.engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM sqlite_master WHERE name='note'").scalar() == 0
+    orm.close(); other.close()
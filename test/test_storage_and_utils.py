@@ -22,3 +22,80 @@ def test_generate_uuid_filename_extension_preserved():
     a = generate_uuid_filename("photo.jpeg")
     b = generate_uuid_filename("photo.jpeg")
     assert a.endswith(".jpeg") and b.endswith(".jpeg") and a != b
+
+def test_save_streams_file_objects_and_iterators(tmp_path):
+    import hashlib, io
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+    data = bytes(range(256)) * 5000
+
+    from_buffer = storage.store("docs", "a.bin", io.BytesIO(data))
+    from_chunks = storage.store("docs", "b.bin", (data[i:i + 4096] for i in range(0, len(data), 4096)))
+    for stored in (from_buffer, from_chunks):
+        assert stored.size == len(data)
+        assert stored.checksum == hashlib.sha256(data).hexdigest()
+        with open(storage.url(stored.path), "rb") as f:
+            assert f.read() == data
+
+def test_save_copies_real_files_from_their_current_position(tmp_path):
+    import hashlib
+    source = tmp_path / "upload.bin"
+    source.write_bytes(b"header" + b"x" * 100_000)
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+
+    with open(source, "rb") as f:
+        f.read(6)
+        stored = storage.store("docs", "upload.bin", f)
+        assert f.read() == b""   # consumed, like a read() loop would leave it
+    assert stored.size == 100_000 and stored.checksum == hashlib.sha256(b"x" * 100_000).hexdigest()
+    with open(storage.url(stored.path), "rb") as f:
+        assert f.read() == b"x" * 100_000
+
+def test_kernel_copy_falls_back_when_nothing_is_copied_and_raises_on_short_copies(tmp_path, monkeypatch):
+    import pytest
+    source = tmp_path / "upload.bin"
+    source.write_bytes(b"x" * 100_000)
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+
+    # e.g. FUSE/overlayfs: the in-kernel copies report 0 bytes on the first call
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+    monkeypatch.setattr(os, "sendfile", lambda *args: 0, raising=False)
+    with open(source, "rb") as f:
+        stored = storage.store("docs", "upload.bin", f)
+    with open(storage.url(stored.path), "rb") as f:
+        assert f.read() == b"x" * 100_000
+
+    def stops_early(src, out, count, offset):
+        return 0 if offset else os.write(out, os.pread(src, 1000, offset))
+    monkeypatch.setattr(os, "copy_file_range", stops_early, raising=False)
+    with open(source, "rb") as f, pytest.raises(OSError, match="Short copy: 1000 of 100000"):
+        storage.store("docs", "upload.bin", f)
+    assert os.listdir(tmp_path / "media" / "docs") == [os.path.basename(stored.path)]
+
+def test_failed_upload_leaves_no_partial_file(tmp_path):
+    import pytest
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+
+    def broken_upload():
+        yield b"first chunk"
+        raise ConnectionError("client went away")
+
+    with pytest.raises(ConnectionError):
+        storage.save("docs", "file.txt", broken_upload())
+    assert os.listdir(tmp_path / "media" / "docs") == []
+    with pytest.raises(TypeError):
+        storage.save("docs", "file.txt", iter(["text"]))
+    assert os.listdir(tmp_path / "media" / "docs") == []
+
+def test_streaming_save_keeps_memory_flat(tmp_path):
+    import tracemalloc
+    storage = LocalStorageBackend(base_dir=str(tmp_path / "media"))
+    chunk = b"\0" * (1 << 16)
+
+    tracemalloc.start()
+    try:
+        stored = storage.store("docs", "big.bin", (chunk for _ in range(512)))   # 32 MiB
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert stored.size == 512 * len(chunk)
+    assert peak < 4 * len(chunk)
@@ -0,0 +1,79 @@
+# test/test_upsert.py
+import pytest
+from apexorm import models
+from apexorm.models.validators import ValidationError
+
+def register_models(orm):
+    class Author(models.Model):
+        id = models.IntegerField(primary_key=True)
+        name = models.CharField(max_length=100, nullable=False)
+
+    class Book(models.Model):
+        id = models.IntegerField(primary_key=True)
+        isbn = models.CharField(max_length=13, nullable=False, unique=True)
+        title = models.CharField(max_length=200, nullable=False)
+        stock = models.IntegerField(nullable=True)
+        contact = models.EmailField(nullable=True)
+        author = models.ForeignKeyField("Author", related_name="books", nullable=True)
+
+    orm.register_models([Author, Book])
+    orm.migrate()
+    return Author, Book
+
+def test_update_or_create(orm):
+    Author, Book = register_models(orm)
+    a = Author(name="Ann").save()
+
+    with orm.capture_queries() as log:
+        book, created = Book.objects.update_or_create(isbn="1", defaults={"title": "Dune", "author": a})
+    assert created and book.id and book.author is a
+    assert any("ON CONFLICT" in q.statement for q in log)
+
+    with orm.capture_queries() as log:
+        again, created = Book.objects.update_or_create(isbn="1", defaults={"title": "Dune II", "stock": 3})
+    assert not created and again is book
+    assert (book.title, book.stock) == ("Dune II", 3)
+    assert len(log) == 1  # UPDATE ... RETURNING
+    assert Book.objects.count() == 1
+
+    with pytest.raises(ValidationError):
+        Book.objects.update_or_create(isbn="2", defaults={"title": "X", "contact": "nope"})
+
+def test_bulk_upsert_counts_and_conflict_target(orm):
+    Author, Book = register_models(orm)
+    Book(isbn="1", title="Old", stock=1).save()
+
+    result = Book.objects.bulk_upsert(
+        [{"isbn": "1", "title": "New", "stock": 5}, {"isbn": "2", "title": "Two"}, Book(isbn="3", title="Three")],
+        batch_size=2,
+    )
+    created, updated = result
+    assert (created, updated) == (2, 1)
+
+    Book._session.expunge_all()
+    assert {b.isbn: (b.title, b.stock) for b in Book.objects.all()} == {
+        "1": ("New", 5), "2": ("Two", None), "3": ("Three", None),
+    }
+
+    # only update the listed fields
+    result = Book.objects.bulk_upsert([{"isbn": "1", "title": "Ignored", "stock": 9}], update_fields=["stock"])
+    assert (result.created, result.updated) == (0, 1)
+    Book._session.expunge_all()
+    assert (Book.objects.get(isbn="1").title, Book.objects.get(isbn="1").stock) == ("New", 9)
+
+    # a key repeated in one batch is inserted once, then updated by its later rows
+    result = Book.objects.bulk_upsert([{"isbn": "4", "title": "First"}, {"isbn": "4", "title": "Second"},
+                                       {"isbn": "1", "title": "New", "stock": 9}])
+    assert (result.created, result.updated) == (1, 2)
+    Book._session.expunge_all()
+    assert Book.objects.get(isbn="4").title == "Second" and Book.objects.count() == 4
+
+    # nothing to update: existing keys are unchanged, not updated
+    result = Book.objects.bulk_upsert([{"isbn": "4", "title": "Ignored"}, {"isbn": "5", "title": "Five"}],
+                                      update_fields=[])
+    assert (result.created, result.updated, result.unchanged) == (1, 0, 1)
+    Book._session.expunge_all()
+    assert Book.objects.get(isbn="4").title == "Second"
+
+    with pytest.raises(ValueError, match="conflict"):
+        Book.objects.bulk_upsert([{"title": "no isbn"}])